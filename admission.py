@@ -0,0 +1,214 @@
+# admission.py - Resource-aware admission of conversion jobs
+import os
+import threading
+
+import psutil
+
+# New jobs wait while system-wide CPU use is above this percentage
+ADMISSION_MAX_CPU_PERCENT = float(os.environ.get('ADMISSION_MAX_CPU_PERCENT', 90))
+
+# Seconds over which CPU use is averaged; a background thread measures one
+# window after another and admission reads the latest result
+ADMISSION_CPU_WINDOW = float(os.environ.get('ADMISSION_CPU_WINDOW', 2))
+
+# Memory and disk always left free for the web processes and the OS
+ADMISSION_MEMORY_RESERVE_MB = int(os.environ.get('ADMISSION_MEMORY_RESERVE_MB', 512))
+ADMISSION_DISK_RESERVE_MB = int(os.environ.get('ADMISSION_DISK_RESERVE_MB', 1024))
+
+# Assumed for videos whose details are unknown when the job is queued
+# (downloads are capped at 720p)
+DEFAULT_DURATION = 1800
+DEFAULT_WIDTH, DEFAULT_HEIGHT = 1280, 720
+DEFAULT_FPS = 30
+
+# Rough cost model of one conversion, measured on 720p lecture recordings
+WORKER_BASE_MB = 250       # Python, OpenCV, scikit-image and numpy in a worker process
+FRAME_BUFFERS = 5          # Bytes per pixel of the frame, its grayscale copy and the previous key frame
+SSIM_BUFFERS = 12          # float64 image-sized arrays alive during an SSIM comparison
+SECONDS_PER_SLIDE = 15     # Typical time between slide changes
+PNG_BYTES_PER_PIXEL = 1.0  # Saved key frames (screen content compresses about 3:1)
+BITS_PER_PIXEL = 0.1       # Download bitrate per pixel and frame (~2.5 Mbit/s at 720p30)
+
+
+def estimate_job_resources(duration=None, width=None, height=None, filesize=None, scratch_limit=None):
+    """
+    Estimate the peak memory and disk a conversion needs
+
+    Memory grows with the resolution (frame and SSIM buffers) and with the
+    number of slides, because python-pptx keeps every slide image in memory
+    until the deck is saved. Disk covers the download, the extracted key
+    frames and the finished deck.
+
+    Args:
+        duration: Video length in seconds
+        width, height: Video resolution (capped at 720p like the download)
+        filesize: Download size in bytes, if known
+        scratch_limit: Per-job scratch limit in bytes (caps download and frames)
+
+    Returns:
+        Dict with memory_mb and disk_mb
+    """
+    duration = duration or DEFAULT_DURATION
+    width, height = width or DEFAULT_WIDTH, height or DEFAULT_HEIGHT
+    if height > DEFAULT_HEIGHT:
+        width, height = width * DEFAULT_HEIGHT // height, DEFAULT_HEIGHT
+    pixels = width * height
+
+    slides = max(1, duration / SECONDS_PER_SLIDE)
+    slide_bytes = slides * pixels * PNG_BYTES_PER_PIXEL
+    download_bytes = filesize or duration * DEFAULT_FPS * pixels * BITS_PER_PIXEL / 8
+    frame_bytes = slide_bytes
+    if scratch_limit:
+        download_bytes = min(download_bytes, scratch_limit)
+        frame_bytes = min(frame_bytes, scratch_limit)
+
+    # Slide images are held once in the presentation and again while it is written
+    memory = WORKER_BASE_MB * 1024 * 1024 + pixels * (FRAME_BUFFERS + 8 * SSIM_BUFFERS) + 2 * slide_bytes
+    disk = download_bytes + frame_bytes + slide_bytes
+    return {
+        'memory_mb': int(memory / 1024 / 1024) + 1,
+        'disk_mb': int(disk / 1024 / 1024) + 1,
+    }
+
+
+class AdmissionControl:
+    """
+    Decide whether the machine has room to start another conversion job
+
+    A job is started only if, on top of what the running jobs are expected to
+    use (their estimates, which they may not have reached yet), its estimate
+    fits both into the memory budget (total memory minus a reserve) and into
+    what is available right now, every tracked filesystem keeps its disk
+    reserve, and CPU use is below the limit. When no job is running, CPU
+    and live availability are not checked so the queue always makes
+    progress. A job whose estimate exceeds the machine's total budget is
+    rejected when it is submitted.
+    """
+
+    def __init__(self, paths, max_cpu_percent=None, memory_reserve_mb=None, disk_reserve_mb=None):
+        """
+        Initialize admission control
+
+        Args:
+            paths: Directories whose filesystems receive job data (scratch, outputs)
+            max_cpu_percent: CPU use above which new jobs wait
+            memory_reserve_mb: Memory never handed out to jobs
+            disk_reserve_mb: Disk kept free on every tracked filesystem
+        """
+        self.paths = paths
+        self.max_cpu_percent = ADMISSION_MAX_CPU_PERCENT if max_cpu_percent is None else max_cpu_percent
+        self.memory_reserve_mb = ADMISSION_MEMORY_RESERVE_MB if memory_reserve_mb is None else memory_reserve_mb
+        self.disk_reserve_mb = ADMISSION_DISK_RESERVE_MB if disk_reserve_mb is None else disk_reserve_mb
+        self._cpu_percent = None
+        self._cpu_sampler_pid = None
+        self._cpu_lock = threading.Lock()
+
+    def cpu_percent(self):
+        """
+        Return system-wide CPU use over the last ADMISSION_CPU_WINDOW seconds
+
+        psutil.cpu_percent(interval=None) measures since its previous call
+        anywhere in the process, so its window depends on who else asked.
+        The window here is fixed: a sampler thread (started on first use in
+        each process) measures it back to back. Returns 0 until the first
+        window has passed.
+        """
+        with self._cpu_lock:
+            if self._cpu_sampler_pid != os.getpid():
+                self._cpu_sampler_pid = os.getpid()
+                self._cpu_percent = None
+
+                def run():
+                    while True:
+                        self._cpu_percent = psutil.cpu_percent(interval=ADMISSION_CPU_WINDOW)
+
+                threading.Thread(target=run, daemon=True).start()
+        return self._cpu_percent or 0.0
+
+    def snapshot(self):
+        """Return live CPU, memory and disk figures (sizes in MB)"""
+        memory = psutil.virtual_memory()
+        return {
+            'cpu_percent': self.cpu_percent(),
+            'max_cpu_percent': self.max_cpu_percent,
+            'memory_total_mb': memory.total // (1024 * 1024),
+            'memory_available_mb': memory.available // (1024 * 1024),
+            'memory_budget_mb': self.memory_budget_mb(memory),
+            'disk_free_mb': self._disk_mb(),
+            'disk_reserve_mb': self.disk_reserve_mb,
+        }
+
+    def memory_budget_mb(self, memory=None):
+        """Memory that running jobs may use in total"""
+        memory = memory or psutil.virtual_memory()
+        return memory.total // (1024 * 1024) - self.memory_reserve_mb
+
+    def _disk_mb(self, field='free'):
+        """Free (or, with field='total', total) MB per tracked filesystem, keyed by one of its paths"""
+        free = {}
+        devices = set()
+        for path in self.paths:
+            path = _existing_parent(path)
+            device = os.stat(path).st_dev
+            if device in devices:
+                continue
+            devices.add(device)
+            free[path] = getattr(psutil.disk_usage(path), field) // (1024 * 1024)
+        return free
+
+    def never_fits(self, resources):
+        """
+        Return why a job can never be started on this machine, or None
+
+        Compares against total capacity; space that is only in use for now
+        makes the job wait (see refuse) instead of being rejected.
+        """
+        budget = self.memory_budget_mb()
+        if resources['memory_mb'] > budget:
+            return f"needs ~{resources['memory_mb']} MB of memory, the server has {budget} MB for jobs"
+        for path, total in self._disk_mb('total').items():
+            if resources['disk_mb'] > total - self.disk_reserve_mb:
+                return f"needs ~{resources['disk_mb']} MB of disk, {path} only holds {total} MB"
+        return None
+
+    def refuse(self, resources, committed, running):
+        """
+        Return why a job cannot start now, or None if it may start
+
+        Args:
+            resources: The job's estimate (memory_mb, disk_mb)
+            committed: Summed estimates of the running jobs
+            running: Number of running jobs
+        """
+        if running == 0:
+            return None
+
+        memory = psutil.virtual_memory()
+        needed = committed['memory_mb'] + resources['memory_mb']
+        budget = self.memory_budget_mb(memory)
+        if needed > budget:
+            return f"memory: {needed} MB committed, budget {budget} MB"
+        available = memory.available // (1024 * 1024) - self.memory_reserve_mb
+        if resources['memory_mb'] > available:
+            return f"memory: {resources['memory_mb']} MB needed, {max(0, available)} MB available"
+
+        for path, free in self._disk_mb().items():
+            needed = committed['disk_mb'] + resources['disk_mb']
+            if needed > free - self.disk_reserve_mb:
+                return f"disk: {needed} MB committed, {free} MB free in {path}"
+
+        cpu = self.cpu_percent()
+        if cpu > self.max_cpu_percent:
+            return f"cpu: {cpu:.0f}% busy"
+        return None
+
+
+def _existing_parent(path):
+    """Return path, or its closest existing parent directory"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
@@ -0,0 +1,49 @@
+# gunicorn.conf.py - Multi-process serving: gunicorn -c gunicorn.conf.py simple_web_app:app
+#
+# Web workers only serve requests; conversions run in the job executor's
+# worker processes, either forked from the web workers or, with
+# WEB_RUNS_JOBS=0, in separate `python worker.py` processes on any host.
+# Task state and the job queue live in the shared SQLite database
+# (TASK_DB_PATH) and outputs on the shared outputs/ directory, so any web
+# worker can answer /status or /download for any task.
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Requests are short and I/O bound, so a few threaded workers per core suffice.
+# Each open /events stream holds a thread while it sleeps between checks;
+# SSE_MAX_STREAMS (default 16) caps them per worker so the remaining threads
+# stay free for other requests. Raise both together for more watching tabs.
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() + 1, 8)))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 32))
+timeout = 120
+graceful_timeout = 30
+
+# Full-file downloads are handed to the kernel with sendfile()
+sendfile = True
+
+# Load the app once in the master so startup work runs exactly once
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Runs once in the master, before any worker is forked"""
+    import simple_web_app
+    simple_web_app.startup()
+
+
+def post_fork(server, worker):
+    """Every web worker dispatches queued jobs to its own process pool
+    (unless WEB_RUNS_JOBS is off and worker.py runs them), takes part in
+    output retention (one pass per interval across workers) and sweeps
+    scratch directories left by dead job processes"""
+    import simple_web_app
+    if simple_web_app.WEB_RUNS_JOBS:
+        simple_web_app.job_executor.start()
+    simple_web_app.output_retention.start()
+    simple_web_app.start_sweeper()
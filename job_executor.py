@@ -0,0 +1,734 @@
+# job_executor.py - Bounded process pool for conversion jobs
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from scratch import process_alive
+from task_store import SQLiteDatabase
+
+# Jobs are owned by "<host>:<pid>"; worker limits and resource budgets are per host
+HOST = socket.gethostname()
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its admission limit"""
+
+
+class JobTooLargeError(Exception):
+    """Raised when a job's resource estimate exceeds what the machine can ever provide"""
+
+
+class JobExecutor(SQLiteDatabase):
+    """
+    Run conversion jobs in a bounded set of worker processes
+
+    Jobs wait in a queue stored in SQLite (bounded by ``max_queued``), so
+    every web and worker process sees the same queue. Each process that calls
+    ``start()`` runs a dispatcher thread which claims queued jobs while fewer
+    than ``max_workers`` jobs are running on its host, and executes them in
+    its own process pool. CPU-heavy work never runs inside a web process and a
+    burst of submissions is queued instead of starting unbounded threads.
+
+    A claimed job holds a lease of ``lease_seconds`` that its dispatcher
+    keeps renewing. Any dispatcher puts jobs whose lease ran out (or whose
+    owner process on the same host is gone) back in the queue, so work from
+    a crashed process or node is picked up elsewhere. A job that died or was
+    lost is retried after an increasing delay, up to ``max_attempts`` runs,
+    before ``on_error`` is called.
+
+    Queued jobs are not served strictly in order. Each job kind belongs to a
+    class, and classes take turns in a weighted round robin (with weights
+    single=4, playlist=1, four single-video jobs start for every playlist
+    unit while both are waiting). Within a class, the group (submitting
+    client) and then the task that was served longest ago goes next, so one
+    large playlist cannot hold up everyone else's work.
+
+    With ``admission`` set, jobs also carry a memory and disk estimate and
+    the next job only starts once the admission control finds room for it
+    next to the running jobs; until then the queue waits.
+
+    Kinds listed in ``prefetch_handlers`` are downloaded ahead so worker
+    slots do not idle on the network: the dispatcher fetches the queued jobs
+    that are next in line in threads of its own process, up to
+    ``prefetch_depth`` jobs and ``prefetch_disk_budget_mb`` of downloads per
+    host. A fetched ("staged") job keeps its place in the queue and is only
+    run by the process holding its download, which passes the fetch result
+    to the handler as ``staged``.
+    """
+
+    def __init__(self, db_path, handlers, max_workers=None, max_queued=50, on_error=None, poll_interval=0.5,
+                 job_classes=None, weights=None, admission=None, lease_seconds=60, max_attempts=3,
+                 retry_delay=10, metrics=None, prefetch_handlers=None, prefetch_depth=2,
+                 prefetch_disk_budget_mb=2048, reject_oversized=True):
+        """
+        Initialize the executor (nothing runs until start() is called)
+
+        Args:
+            db_path: SQLite database holding the queue
+            handlers: Dict mapping job kind to a picklable module-level function
+            max_workers: Jobs allowed to run at once on this host (None = CPU count)
+            max_queued: Maximum number of submitted (non-internal) jobs waiting for a worker
+            on_error: Called with (task_id, kind, args, exception) when a job died
+                unexpectedly and will not be retried
+            poll_interval: Seconds between checks for jobs queued by other processes
+            job_classes: Dict mapping job kind to its scheduling class (default: the kind)
+            weights: Dict mapping scheduling class to its share of job starts (default 1)
+            admission: Optional AdmissionControl consulted before a job starts
+            lease_seconds: How long a claimed job stays owned without renewal
+            max_attempts: Runs a job gets before a crash or lost lease is final
+            retry_delay: Seconds before the first retry (doubling with each attempt)
+            metrics: Optional MetricsStore receiving the time jobs waited in the queue
+            prefetch_handlers: Dict mapping job kind to (fetch, discard). fetch(*args)
+                runs in a dispatcher thread and returns a picklable result with a
+                'bytes' key; discard(result) frees a result whose job will not run
+                in this process
+            prefetch_depth: Jobs fetched ahead at once per host (0 = off)
+            prefetch_disk_budget_mb: Disk that fetched jobs may hold per host
+            reject_oversized: Refuse jobs whose estimate can never fit this
+                machine when they are submitted; turn off where jobs run on
+                other hosts (the admission check would measure the wrong machine)
+        """
+        super().__init__(db_path)
+        self.handlers = handlers
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self.on_error = on_error
+        self.poll_interval = poll_interval
+        self.job_classes = job_classes or {}
+        self.weights = weights or {}
+        self.admission = admission
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.metrics = metrics
+        self.prefetch_handlers = prefetch_handlers or {}
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_disk_budget_mb = prefetch_disk_budget_mb
+        self.reject_oversized = reject_oversized
+
+        self._pool = None
+        self._running = {}
+        self._fetching = set()
+        self._staged = {}
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._dispatcher_pid = None
+        self._stopping = False
+        self._waiting_for = None
+        self._create_schema()
+
+    def _create_schema(self):
+        conn = self._connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                args TEXT NOT NULL,
+                state TEXT NOT NULL,
+                owner INTEGER,
+                enqueued_at REAL NOT NULL,
+                started_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_task ON jobs (task_id);
+            CREATE TABLE IF NOT EXISTS scheduler_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        ''')
+
+        # Queues created by older versions lack the scheduling columns
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(jobs)')}
+        for column, definition in (('job_class', "TEXT NOT NULL DEFAULT ''"),
+                                   ('grp', "TEXT NOT NULL DEFAULT ''"),
+                                   ('unit_key', "TEXT"),
+                                   ('internal', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('memory_mb', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('disk_mb', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('lease_until', "REAL"),
+                                   ('attempts', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('available_at', "REAL NOT NULL DEFAULT 0"),
+                                   ('staged_bytes', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('prefetch_tried', "INTEGER NOT NULL DEFAULT 0")):
+            if column not in columns:
+                try:
+                    conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {definition}')
+                except sqlite3.OperationalError:
+                    pass  # Added concurrently by another process
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_class ON jobs (state, job_class)')
+        conn.execute(
+            'CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_unit ON jobs (task_id, unit_key) WHERE unit_key IS NOT NULL'
+        )
+
+    def submit(self, task_id, kind, *args, group='', unit_key=None, internal=False, resources=None):
+        """
+        Queue a job for execution
+
+        Args:
+            task_id: Task the job belongs to (used for queue positions)
+            kind: Key into the handlers dict
+            *args: JSON-serializable arguments for the handler
+            group: Fair-share group (e.g. the submitting client)
+            unit_key: Identifies one unit of work of a task; submitting a unit
+                that is already queued or running does nothing
+            internal: Work split off an admitted job; not subject to max_queued
+            resources: Estimated peak use as {'memory_mb', 'disk_mb'} (None = negligible)
+
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting
+            JobTooLargeError: If the estimate can never fit on this machine
+                (only checked with reject_oversized)
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self.admission and self.reject_oversized and resources:
+            reason = self.admission.never_fits(resources)
+            if reason:
+                raise JobTooLargeError(f"Job is too large for this server ({reason})")
+        resources = resources or {'memory_mb': 0, 'disk_mb': 0}
+
+        conn = self._transaction()
+        try:
+            if not internal:
+                queued = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND internal = 0"
+                ).fetchone()[0]
+                if queued >= self.max_queued:
+                    conn.execute('ROLLBACK')
+                    raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs "
+                "(task_id, kind, args, state, enqueued_at, job_class, grp, unit_key, internal, memory_mb, disk_mb) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(args), time.time(), self.job_classes.get(kind, kind),
+                 group or '', unit_key, int(internal), resources['memory_mb'], resources['disk_mb'])
+            )
+            conn.execute('COMMIT')
+        except QueueFullError:
+            raise
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._wake.set()
+
+    def set_resources(self, task_id, resources):
+        """
+        Replace the resource estimate of a task's jobs (e.g. once its video was probed)
+
+        Returns:
+            Number of the task's jobs that are still waiting to start
+        """
+        conn = self._connection()
+        conn.execute(
+            'UPDATE jobs SET memory_mb = ?, disk_mb = ? WHERE task_id = ?',
+            (resources['memory_mb'], resources['disk_mb'], task_id)
+        )
+        self._wake.set()
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE task_id = ? AND state IN ('queued', 'fetching', 'staged')", (task_id,)
+        ).fetchone()[0]
+
+    def queue_position(self, task_id):
+        """
+        Return the 1-based queue position of a waiting job, 0 if the task has
+        a running job, or None if the task has no job
+
+        Positions count the jobs of the same class queued ahead of the task's
+        first job; with fair scheduling this is an upper bound.
+        """
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM jobs WHERE task_id = ? AND state = 'running'", (task_id,)).fetchone():
+            return 0
+        row = conn.execute(
+            'SELECT id, job_class FROM jobs WHERE task_id = ? ORDER BY id LIMIT 1', (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, job_class = row
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'fetching', 'staged') AND job_class = ? AND id <= ?",
+            (job_class, job_id)
+        ).fetchone()[0]
+
+    def stats(self):
+        """Return worker and queue counters (overall and per scheduling class) and committed resources"""
+        conn = self._connection()
+        rows = conn.execute(
+            'SELECT job_class, state, COUNT(*) FROM jobs GROUP BY job_class, state'
+        ).fetchall()
+        counts = {'running': 0, 'queued': 0}
+        classes = {}
+        for job_class, state, count in rows:
+            counts[state] = counts.get(state, 0) + count
+            classes.setdefault(job_class, {'running': 0, 'queued': 0})[state] = count
+        return {
+            'workers': self.max_workers,
+            'running': counts['running'],
+            'running_on_host': self._host_running(conn),
+            'queued': counts['queued'],
+            'retrying': conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND attempts > 0"
+            ).fetchone()[0],
+            'max_queued': self.max_queued,
+            # Downloaded ahead (or downloading) and waiting for a worker
+            'prefetched': counts.get('fetching', 0) + counts.get('staged', 0),
+            'classes': classes,
+            'weights': self.weights,
+            'committed': self._committed(conn),
+            # As last seen by this process's dispatcher
+            'waiting_for_resources': self._waiting_for,
+        }
+
+    def _host_running(self, conn):
+        """Number of jobs running on this host"""
+        prefix = f'{HOST}:'
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state = 'running' AND substr(owner, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchone()[0]
+
+    def _committed(self, conn):
+        """Summed resource estimates of the jobs running on this host"""
+        prefix = f'{HOST}:'
+        memory_mb, disk_mb = conn.execute(
+            "SELECT COALESCE(SUM(memory_mb), 0), COALESCE(SUM(disk_mb), 0) FROM jobs "
+            "WHERE state = 'running' AND substr(owner, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchone()
+        return {'memory_mb': memory_mb, 'disk_mb': disk_mb}
+
+    def cancel(self, task_id):
+        """
+        Drop the queued jobs of a task
+
+        Running jobs cannot be interrupted from here; they are expected to
+        notice the task's cancellation themselves and return early, which
+        frees their worker slot for the next queued job. Downloads fetched
+        ahead for the dropped jobs are discarded by their dispatcher.
+
+        Returns:
+            Number of queued jobs removed
+        """
+        removed = self._connection().execute(
+            "DELETE FROM jobs WHERE task_id = ? AND state IN ('queued', 'fetching', 'staged')", (task_id,)
+        ).rowcount
+        self._wake.set()
+        return removed
+
+    def reclaim(self):
+        """
+        Take back jobs whose owner is gone
+
+        A running job is reclaimed when its lease expired (its process or
+        node stopped renewing it) or when it is owned by a process on this
+        host that no longer exists (e.g. before a restart). It goes back to
+        the queue if it has attempts left, otherwise it is dropped and
+        ``on_error`` is called. Jobs fetched ahead by such an owner simply
+        go back to the queue.
+
+        Returns:
+            Tuple of (jobs requeued, jobs dropped)
+        """
+        now = time.time()
+        prefix = f'{HOST}:'
+        lost = []
+        conn = self._transaction()
+        try:
+            rows = conn.execute(
+                "SELECT id, task_id, kind, args, owner, lease_until, attempts FROM jobs WHERE state = 'running'"
+            ).fetchall()
+            for job_id, task_id, kind, args, owner, lease_until, attempts in rows:
+                owner = str(owner or '')
+                expired = lease_until is None or lease_until < now
+                dead = owner.startswith(prefix) and not process_alive(int(owner[len(prefix):]))
+                if expired or dead:
+                    lost.append((job_id, task_id, kind, json.loads(args), attempts))
+                    self._finish(conn, job_id, task_id, attempts, retry=True)
+
+            for job_id, owner, lease_until in conn.execute(
+                "SELECT id, owner, lease_until FROM jobs WHERE state IN ('fetching', 'staged')"
+            ).fetchall():
+                owner = str(owner or '')
+                expired = lease_until is None or lease_until < now
+                dead = owner.startswith(prefix) and not process_alive(int(owner[len(prefix):]))
+                if expired or dead:
+                    self._unstage(conn, job_id, prefetch_tried=0)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        requeued = 0
+        for job_id, task_id, kind, args, attempts in lost:
+            if attempts < self.max_attempts:
+                requeued += 1
+                print(f"Job {task_id} ({kind}) lost its worker; retrying (attempt {attempts + 1})")
+            else:
+                print(f"Job {task_id} ({kind}) lost its worker; giving up after {attempts} attempts")
+                if self.on_error:
+                    self.on_error(task_id, kind, args, Exception(f'lost its worker {attempts} times'))
+        if lost:
+            self._wake.set()
+        return requeued, len(lost) - requeued
+
+    def start(self):
+        """Start the dispatcher thread in this process (no-op if already running)"""
+        with self._lock:
+            if self._dispatcher_pid == os.getpid():
+                return
+            # State inherited through a fork belongs to the parent process
+            self._dispatcher_pid = os.getpid()
+            self._pool = None
+            self._running = {}
+            self._fetching = set()
+            self._staged = {}
+            self._stopping = False
+            self._wake = threading.Event()
+            threading.Thread(target=self._dispatch_loop, daemon=True).start()
+
+    def shutdown(self, wait=True):
+        """Stop claiming jobs; with ``wait``, return once the running ones have finished"""
+        with self._lock:
+            self._stopping = True
+            pool, self._pool = self._pool, None
+            staged, self._staged = self._staged, {}
+        self._release_prefetched(staged)
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _release_prefetched(self, staged):
+        """Hand this process's fetched-ahead jobs back to the queue and discard their downloads"""
+        conn = self._transaction()
+        try:
+            for (job_id,) in conn.execute(
+                "SELECT id FROM jobs WHERE state IN ('fetching', 'staged') AND owner = ?", (self._owner(),)
+            ).fetchall():
+                self._unstage(conn, job_id, prefetch_tried=0)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        for kind, result in staged.values():
+            self._discard(kind, result)
+
+    def _unstage(self, conn, job_id, prefetch_tried):
+        """Put a job that was being fetched or was fetched ahead back in the queue"""
+        conn.execute(
+            "UPDATE jobs SET state = 'queued', owner = NULL, lease_until = NULL, staged_bytes = 0, "
+            "prefetch_tried = ? WHERE id = ?",
+            (prefetch_tried, job_id)
+        )
+
+    def _discard(self, kind, result):
+        try:
+            self.prefetch_handlers[kind][1](result)
+        except Exception as e:
+            print(f"Could not discard a prefetched {kind} job: {e}")
+
+    def _owner(self):
+        return f'{HOST}:{os.getpid()}'
+
+    def _dispatch_loop(self):
+        last_maintenance = 0
+        while not self._stopping:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                # Keep our leases alive and take over jobs of dead owners
+                if time.time() - last_maintenance >= self.lease_seconds / 3:
+                    last_maintenance = time.time()
+                    self._renew_leases()
+                    self.reclaim()
+                self._drop_stale_prefetches()
+                while not self._stopping and self._claim_and_run():
+                    pass
+                while not self._stopping and self._claim_prefetch():
+                    pass
+            except Exception as e:
+                print(f"Job dispatcher error: {e}")
+
+        # Leases must outlive the jobs still finishing after a shutdown
+        while self._running:
+            time.sleep(min(self.lease_seconds / 3, 5))
+            try:
+                self._renew_leases()
+            except Exception as e:
+                print(f"Job lease renewal error: {e}")
+
+    def _renew_leases(self):
+        with self._lock:
+            job_ids = list(self._running) + list(self._fetching) + list(self._staged)
+        if not job_ids:
+            return
+        placeholders = ', '.join('?' for _ in job_ids)
+        self._connection().execute(
+            f"UPDATE jobs SET lease_until = ? WHERE state IN ('running', 'fetching', 'staged') AND owner = ? "
+            f"AND id IN ({placeholders})",
+            (time.time() + self.lease_seconds, self._owner(), *job_ids)
+        )
+
+    def _claim_and_run(self):
+        """Claim the next queued job if a worker slot is free; returns True if one was started"""
+        conn = self._transaction()
+        try:
+            running = self._host_running(conn)
+            row = None
+            if running < self.max_workers:
+                row = self._next_job(conn)
+            if row is None:
+                conn.execute('ROLLBACK')
+                return False
+
+            job_id, task_id, kind, args, group, memory_mb, disk_mb, job_class, queued_since = row
+            if self.admission:
+                # The job keeps its place in the queue until there is room for it
+                self._waiting_for = self.admission.refuse(
+                    {'memory_mb': memory_mb, 'disk_mb': disk_mb}, self._committed(conn), running
+                )
+                if self._waiting_for:
+                    conn.execute('ROLLBACK')
+                    return False
+
+            turn = self._advance(conn, 'turn')
+            self._set_state(conn, f'group:{group}', turn)
+            self._set_state(conn, f'task:{task_id}', turn)
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET state = 'running', owner = ?, started_at = ?, lease_until = ?, "
+                "attempts = attempts + 1, staged_bytes = 0 WHERE id = ?",
+                (self._owner(), now, now + self.lease_seconds, job_id)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        # A job fetched ahead by this process runs on its download
+        with self._lock:
+            staged = self._staged.pop(job_id, None)
+
+        if self.metrics:
+            try:
+                self.metrics.observe('queue_wait_seconds', now - queued_since, {'class': job_class})
+            except Exception as e:
+                print(f"Could not record queue wait: {e}")
+        self._run(job_id, task_id, kind, self.handlers[kind], json.loads(args),
+                  {'staged': staged[1]} if staged else {})
+        return True
+
+    def _next_job(self, conn):
+        """Pick the job to start next: class by weighted round robin, then least recently served group and task"""
+        now = time.time()
+        # Queued jobs and the jobs this process fetched ahead
+        runnable = "(j.state = 'queued' OR (j.state = 'staged' AND j.owner = ?)) AND j.available_at <= ?"
+        waiting = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT job_class FROM jobs j WHERE {runnable}", (self._owner(), now)
+        ).fetchall()]
+        if not waiting:
+            return None
+
+        # Each class owns as many consecutive slots of the cycle as its weight;
+        # the class owning the current slot goes first if it has work waiting
+        classes = sorted(set(self.weights) | set(waiting), key=lambda c: (-self.weights.get(c, 1), c))
+        cycle = [c for c in classes for _ in range(max(1, int(self.weights.get(c, 1))))]
+        slot = self._advance(conn, 'cycle') % len(cycle)
+        job_class = cycle[slot] if cycle[slot] in waiting else min(
+            waiting, key=lambda c: (-self.weights.get(c, 1), c)
+        )
+
+        return conn.execute(f'''
+            SELECT j.id, j.task_id, j.kind, j.args, j.grp, j.memory_mb, j.disk_mb, j.job_class,
+                   MAX(j.enqueued_at, j.available_at) FROM jobs j
+            LEFT JOIN scheduler_state g ON g.key = 'group:' || j.grp
+            LEFT JOIN scheduler_state t ON t.key = 'task:' || j.task_id
+            WHERE {runnable} AND j.job_class = ?
+            ORDER BY COALESCE(g.value, 0), COALESCE(t.value, 0), j.id
+            LIMIT 1
+        ''', (self._owner(), now, job_class)).fetchone()
+
+    def _claim_prefetch(self):
+        """Start fetching the next queued job ahead if this host has room; returns True if one was started"""
+        if not self.prefetch_handlers or self.prefetch_depth <= 0:
+            return False
+
+        prefix = f'{HOST}:'
+        kinds = list(self.prefetch_handlers)
+        conn = self._transaction()
+        try:
+            count, staged_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(staged_bytes), 0) FROM jobs "
+                "WHERE state IN ('fetching', 'staged') AND substr(owner, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchone()
+            row = None
+            if count < self.prefetch_depth and staged_bytes < self.prefetch_disk_budget_mb * 1024 * 1024:
+                # The job the scheduler is likely to pick next among those that can be fetched
+                row = conn.execute(f'''
+                    SELECT j.id, j.kind, j.args FROM jobs j
+                    LEFT JOIN scheduler_state g ON g.key = 'group:' || j.grp
+                    LEFT JOIN scheduler_state t ON t.key = 'task:' || j.task_id
+                    WHERE j.state = 'queued' AND j.prefetch_tried = 0 AND j.available_at <= ?
+                      AND j.kind IN ({', '.join('?' for _ in kinds)})
+                    ORDER BY COALESCE(g.value, 0), COALESCE(t.value, 0), j.id
+                    LIMIT 1
+                ''', (time.time(), *kinds)).fetchone()
+            if row is None:
+                conn.execute('ROLLBACK')
+                return False
+
+            job_id, kind, args = row
+            conn.execute(
+                "UPDATE jobs SET state = 'fetching', owner = ?, lease_until = ?, prefetch_tried = 1 WHERE id = ?",
+                (self._owner(), time.time() + self.lease_seconds, job_id)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        with self._lock:
+            self._fetching.add(job_id)
+        threading.Thread(target=self._prefetch, args=(job_id, kind, json.loads(args)), daemon=True).start()
+        return True
+
+    def _prefetch(self, job_id, kind, args):
+        """Fetch one job ahead (runs in its own thread) and mark it staged"""
+        try:
+            result = self.prefetch_handlers[kind][0](*args)
+        except Exception as e:
+            # The job downloads again when it runs and reports the error then
+            print(f"Prefetch of job {job_id} ({kind}) failed: {e}")
+            result = None
+
+        with self._lock:
+            self._fetching.discard(job_id)
+            conn = self._connection()
+            if result is None:
+                conn.execute(
+                    "UPDATE jobs SET state = 'queued', owner = NULL, lease_until = NULL "
+                    "WHERE id = ? AND state = 'fetching' AND owner = ?", (job_id, self._owner())
+                )
+                staged = False
+            else:
+                # The job may have been cancelled, reclaimed or released by a shutdown meanwhile
+                staged = not self._stopping and conn.execute(
+                    "UPDATE jobs SET state = 'staged', staged_bytes = ? WHERE id = ? AND state = 'fetching' AND owner = ?",
+                    (result.get('bytes', 0), job_id, self._owner())
+                ).rowcount > 0
+                if staged:
+                    self._staged[job_id] = (kind, result)
+        if result is not None and not staged:
+            self._discard(kind, result)
+        self._wake.set()
+
+    def _drop_stale_prefetches(self):
+        """Discard downloads whose jobs were cancelled or taken over by another process"""
+        with self._lock:
+            job_ids = list(self._staged)
+        if not job_ids:
+            return
+        placeholders = ', '.join('?' for _ in job_ids)
+        current = {row[0] for row in self._connection().execute(
+            f"SELECT id FROM jobs WHERE state = 'staged' AND owner = ? AND id IN ({placeholders})",
+            (self._owner(), *job_ids)
+        )}
+        for job_id in set(job_ids) - current:
+            with self._lock:
+                staged = self._staged.pop(job_id, None)
+            if staged:
+                self._discard(*staged)
+
+    def _advance(self, conn, key):
+        """Increment a scheduler counter and return its previous value"""
+        row = conn.execute('SELECT value FROM scheduler_state WHERE key = ?', (key,)).fetchone()
+        value = row[0] if row else 0
+        self._set_state(conn, key, value + 1)
+        return value
+
+    def _set_state(self, conn, key, value):
+        conn.execute(
+            'INSERT INTO scheduler_state (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            (key, value)
+        )
+
+    def _run(self, job_id, task_id, kind, fn, args, kwargs):
+        with self._lock:
+            if self._stopping:
+                # shutdown() ran while this job was being claimed; nobody would wait for it here
+                self._requeue(job_id)
+                if kwargs.get('staged'):
+                    self._discard(kind, kwargs['staged'])
+                return
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            try:
+                future = self._pool.submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM kill); start a fresh pool and retry
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                future = self._pool.submit(fn, *args, **kwargs)
+            pool = self._pool
+            self._running[job_id] = future
+        future.add_done_callback(lambda f: self._on_done(job_id, task_id, kind, args, f, pool))
+
+    def _requeue(self, job_id):
+        """Give back a claimed job that was never started, without using up one of its attempts"""
+        self._connection().execute(
+            "UPDATE jobs SET state = 'queued', owner = NULL, started_at = NULL, lease_until = NULL, "
+            "attempts = attempts - 1, prefetch_tried = 0 WHERE id = ? AND owner = ?",
+            (job_id, self._owner())
+        )
+
+    def _on_done(self, job_id, task_id, kind, args, future, pool):
+        error = None if future.cancelled() else future.exception()
+
+        with self._lock:
+            self._running.pop(job_id, None)
+            # _run may already have replaced the broken pool with a working one
+            if isinstance(error, BrokenProcessPool) and self._pool is pool:
+                self._pool = None
+
+        conn = self._transaction()
+        try:
+            # The job may have been reclaimed if this process stalled past its lease
+            row = conn.execute('SELECT attempts FROM jobs WHERE id = ? AND owner = ?', (job_id, self._owner())).fetchone()
+            attempts = row[0] if row else None
+            if row:
+                self._finish(conn, job_id, task_id, attempts, retry=error is not None)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._wake.set()
+
+        if error is None or attempts is None:
+            return
+        if attempts < self.max_attempts:
+            print(f"Job {task_id} ({kind}) died: {error}; retrying (attempt {attempts + 1})")
+            return
+        print(f"Job {task_id} ({kind}) died: {error}")
+        if self.on_error:
+            self.on_error(task_id, kind, args, error)
+
+    def _finish(self, conn, job_id, task_id, attempts, retry):
+        """Requeue a job that has attempts left (if ``retry``), otherwise remove it"""
+        if retry and attempts < self.max_attempts:
+            conn.execute(
+                "UPDATE jobs SET state = 'queued', owner = NULL, started_at = NULL, lease_until = NULL, "
+                "available_at = ? WHERE id = ?",
+                (time.time() + self.retry_delay * 2 ** (attempts - 1), job_id)
+            )
+            return
+
+        group = conn.execute('SELECT grp FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        # Forget round-robin positions of tasks and groups with no work left
+        if not conn.execute('SELECT 1 FROM jobs WHERE task_id = ?', (task_id,)).fetchone():
+            conn.execute('DELETE FROM scheduler_state WHERE key = ?', (f'task:{task_id}',))
+        if group and not conn.execute('SELECT 1 FROM jobs WHERE grp = ?', (group[0],)).fetchone():
+            conn.execute('DELETE FROM scheduler_state WHERE key = ?', (f'group:{group[0]}',))
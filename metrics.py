@@ -0,0 +1,169 @@
+# metrics.py - Prometheus metrics shared by all web and worker processes
+import math
+
+from task_store import SQLiteDatabase
+
+# Prefix of every exported metric name
+METRICS_PREFIX = 'vtp_'
+
+# Histograms: name -> (help text, bucket upper bounds)
+HISTOGRAMS = {
+    'download_seconds': ('Time to download one video', (1, 2, 5, 10, 30, 60, 120, 300, 600, 1800)),
+    'download_bytes': ('Size of one downloaded video',
+                       (1e6, 1e7, 5e7, 1e8, 2.5e8, 5e8, 1e9, 2e9, 4e9)),
+    'frames_decoded': ('Frames decoded while extracting key frames from one video',
+                       (100, 1000, 10000, 30000, 100000, 300000, 1000000)),
+    'ssim_calls': ('SSIM comparisons made for one video', (10, 100, 1000, 3000, 10000, 30000, 100000)),
+    'key_frames': ('Key frames (slides) saved for one video', (1, 5, 10, 25, 50, 100, 250, 500)),
+    'assemble_seconds': ('Time to build and save one presentation', (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120)),
+    'zip_seconds': ('Time to stream one ZIP download', (0.1, 0.5, 1, 5, 10, 30, 60, 300)),
+    'queue_wait_seconds': ('Time a job waited in the queue before it started',
+                           (0.1, 1, 5, 15, 60, 300, 900, 1800, 3600)),
+}
+
+# Counters: name -> help text
+COUNTERS = {
+    'cache_lookups_total': 'Cache lookups by cache and result (hit or miss)',
+}
+
+
+def _format_labels(labels):
+    """Render labels as the inside of a Prometheus label set, sorted by name"""
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in sorted(labels.items())
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsStore(SQLiteDatabase):
+    """
+    Histograms and counters kept in the shared SQLite database
+
+    Conversions run in job processes (possibly on other hosts) and requests
+    are spread over several web workers, so observations are added to rows
+    in the shared database and every process renders the same totals for
+    /metrics. Histogram buckets are stored per bucket and made cumulative
+    when rendered.
+    """
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self._connection().execute('''
+            CREATE TABLE IF NOT EXISTS metric_values (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, labels, key)
+            )
+        ''')
+
+    def observe(self, name, value, labels=None):
+        """Add one observation to a histogram"""
+        self.observe_many({name: value}, labels)
+
+    def observe_many(self, values, labels=None):
+        """
+        Add one observation to each of several histograms in one transaction
+
+        Args:
+            values: Dict of histogram name to observed value; names that are
+                not histograms and None values are ignored
+            labels: Optional dict of labels applied to every observation
+        """
+        label_text = _format_labels(labels)
+        rows = []
+        for name, value in values.items():
+            if name not in HISTOGRAMS or value is None:
+                continue
+            bucket = next((bound for bound in HISTOGRAMS[name][1] if value <= bound), math.inf)
+            rows += [
+                (name, label_text, _format_value(bucket), 1),
+                (name, label_text, 'sum', value),
+                (name, label_text, 'count', 1),
+            ]
+        self._add(rows)
+
+    def inc(self, name, labels=None, amount=1):
+        """Increase a counter"""
+        self.inc_many([(name, labels, amount)])
+
+    def inc_many(self, increments):
+        """
+        Increase several counters in one transaction
+
+        Args:
+            increments: Iterable of (counter name, labels dict, amount)
+        """
+        self._add([(name, _format_labels(labels), 'total', amount) for name, labels, amount in increments if amount])
+
+    def _add(self, rows):
+        if not rows:
+            return
+        conn = self._transaction()
+        try:
+            conn.executemany(
+                'INSERT INTO metric_values (name, labels, key, value) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(name, labels, key) DO UPDATE SET value = value + excluded.value',
+                rows
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def render(self, gauges=()):
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Args:
+            gauges: Live values to include, as (name, help text, samples) with
+                samples a list of (labels dict, value)
+
+        Returns:
+            The exposition text
+        """
+        stored = {}
+        for name, labels, key, value in self._connection().execute(
+            'SELECT name, labels, key, value FROM metric_values ORDER BY name, labels'
+        ):
+            stored.setdefault(name, {}).setdefault(labels, {})[key] = value
+
+        lines = []
+        for name, (help_text, bounds) in HISTOGRAMS.items():
+            metric = METRICS_PREFIX + name
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+            for labels, values in stored.get(name, {}).items():
+                prefix = f'{labels},' if labels else ''
+                cumulative = 0
+                for bound in bounds + (math.inf,):
+                    cumulative += values.get(_format_value(bound), 0)
+                    lines.append(f'{metric}_bucket{{{prefix}le="{_format_value(bound)}"}} {_format_value(cumulative)}')
+                label_set = f'{{{labels}}}' if labels else ''
+                lines.append(f'{metric}_sum{label_set} {_format_value(values.get("sum", 0))}')
+                lines.append(f'{metric}_count{label_set} {_format_value(values.get("count", 0))}')
+
+        for name, help_text in COUNTERS.items():
+            metric = METRICS_PREFIX + name
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            for labels, values in stored.get(name, {}).items():
+                label_set = f'{{{labels}}}' if labels else ''
+                lines.append(f'{metric}{label_set} {_format_value(values.get("total", 0))}')
+
+        for name, help_text, samples in gauges:
+            metric = METRICS_PREFIX + name
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+            for labels, value in samples:
+                label_set = f'{{{_format_labels(labels)}}}' if labels else ''
+                lines.append(f'{metric}{label_set} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
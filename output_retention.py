@@ -0,0 +1,226 @@
+# output_retention.py - Disk quota and age limits for generated presentations
+import os
+import re
+import time
+import shutil
+import threading
+
+from task_store import SQLiteDatabase
+
+# Task outputs inside the output directory: a single deck, a playlist
+# directory (decks, job manifest, checkpoint), a batch directory or a ZIP
+# left by older versions
+OUTPUT_NAME = re.compile(
+    r'^(?:presentation_(?P<single>[^._]+)\.pptx|(?:playlist|batch)_(?P<collection>[^._]+)(?:_all\.zip)?)$'
+)
+
+
+class OutputRetention(SQLiteDatabase):
+    """
+    Keep the output directory within a disk quota and a maximum age
+
+    Outputs are grouped per task and evicted as a whole: first everything not
+    used for ``max_age`` seconds (or whose task no longer exists), then the
+    least recently used tasks until usage is under the quota. Downloads count
+    as use (see ``touch``). Outputs of pending or processing tasks are never
+    touched. Evicted tasks lose their output files and completed ones are
+    marked ``expired``.
+
+    Every process that calls ``start()`` runs a background thread, but a pass
+    is claimed through the shared database so only one process runs it per
+    interval. Usage and eviction counters are shared the same way.
+    """
+
+    def __init__(self, db_path, output_dir, task_store, quota_mb=10240, max_age=7 * 86400, interval=300):
+        """
+        Initialize retention (nothing runs until start() is called)
+
+        Args:
+            db_path: SQLite database for access times and counters
+            output_dir: Directory holding task outputs
+            task_store: TaskStore whose tasks own the outputs
+            quota_mb: Disk quota for all outputs in megabytes
+            max_age: Seconds since last use after which outputs are removed
+            interval: Seconds between retention passes
+        """
+        super().__init__(db_path)
+        self.output_dir = output_dir
+        self.task_store = task_store
+        self.quota_bytes = quota_mb * 1024 * 1024
+        self.max_age = max_age
+        self.interval = interval
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        self._connection().executescript('''
+            CREATE TABLE IF NOT EXISTS output_access (
+                task_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS retention_stats (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+        ''')
+
+    def touch(self, task_id):
+        """Record that a task's outputs were just used"""
+        self._connection().execute(
+            'INSERT INTO output_access (task_id, last_access) VALUES (?, ?) '
+            'ON CONFLICT(task_id) DO UPDATE SET last_access = excluded.last_access',
+            (task_id, time.time())
+        )
+
+    def stats(self):
+        """Return usage and eviction counters from the last passes"""
+        rows = dict(self._connection().execute('SELECT name, value FROM retention_stats').fetchall())
+        return {
+            'usage_bytes': int(rows.get('usage_bytes', 0)),
+            'quota_bytes': self.quota_bytes,
+            'max_age': self.max_age,
+            'evicted_tasks': int(rows.get('evicted_tasks', 0)),
+            'evicted_bytes': int(rows.get('evicted_bytes', 0)),
+            'last_run': rows.get('last_run'),
+        }
+
+    def start(self):
+        """Start the background thread in this process (no-op if already running)"""
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            threading.Thread(target=self._run_loop, daemon=True).start()
+
+    def _run_loop(self):
+        while True:
+            try:
+                self.run_if_due()
+            except Exception as e:
+                print(f"Output retention error: {e}")
+            time.sleep(min(self.interval, 60))
+
+    def run_if_due(self):
+        """Run a pass unless another process ran one within the interval; returns True if one ran"""
+        now = time.time()
+        conn = self._transaction()
+        try:
+            row = conn.execute("SELECT value FROM retention_stats WHERE name = 'last_run'").fetchone()
+            if row and now - row[0] < self.interval:
+                conn.execute('ROLLBACK')
+                return False
+            self._set_stat(conn, 'last_run', now)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self.run_pass()
+        return True
+
+    def _set_stat(self, conn, name, value, add=False):
+        update = 'value + excluded.value' if add else 'excluded.value'
+        conn.execute(
+            f'INSERT INTO retention_stats (name, value) VALUES (?, ?) '
+            f'ON CONFLICT(name) DO UPDATE SET value = {update}',
+            (name, value)
+        )
+
+    def run_pass(self):
+        """Evict expired and least recently used outputs; returns (tasks, bytes) evicted"""
+        outputs = self._scan()
+        active = set(self.task_store.task_ids_with_status('pending', 'processing'))
+        access = dict(self._connection().execute('SELECT task_id, last_access FROM output_access').fetchall())
+
+        now = time.time()
+        usage = sum(entry['size'] for entry in outputs.values())
+        candidates = []
+        for task_id, entry in outputs.items():
+            if task_id in active:
+                continue
+            last_used = max(entry['mtime'], access.get(task_id, 0))
+            candidates.append((last_used, task_id, entry))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        evicted_tasks = 0
+        evicted_bytes = 0
+        for last_used, task_id, entry in candidates:
+            expired = now - last_used > self.max_age
+            if not expired and usage <= self.quota_bytes and self.task_store.get_task(task_id):
+                continue
+            self._evict(task_id, entry)
+            usage -= entry['size']
+            evicted_tasks += 1
+            evicted_bytes += entry['size']
+
+        conn = self._transaction()
+        try:
+            self._set_stat(conn, 'usage_bytes', usage)
+            self._set_stat(conn, 'evicted_tasks', evicted_tasks, add=True)
+            self._set_stat(conn, 'evicted_bytes', evicted_bytes, add=True)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if evicted_tasks:
+            print(f"Output retention: removed outputs of {evicted_tasks} task(s), "
+                  f"{evicted_bytes / 1024 / 1024:.1f} MB; {usage / 1024 / 1024:.1f} MB in use")
+        return evicted_tasks, evicted_bytes
+
+    def _scan(self):
+        """Return {task_id: {'paths', 'size', 'mtime'}} for everything in the output directory"""
+        outputs = {}
+        if not os.path.isdir(self.output_dir):
+            return outputs
+
+        for name in os.listdir(self.output_dir):
+            match = OUTPUT_NAME.match(name)
+            if not match:
+                continue
+            task_id = match.group('single') or match.group('collection')
+            path = os.path.join(self.output_dir, name)
+            size, mtime = _disk_usage(path)
+
+            entry = outputs.setdefault(task_id, {'paths': [], 'size': 0, 'mtime': 0})
+            entry['paths'].append(path)
+            entry['size'] += size
+            entry['mtime'] = max(entry['mtime'], mtime)
+        return outputs
+
+    def _evict(self, task_id, entry):
+        for path in entry['paths']:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+        self._connection().execute('DELETE FROM output_access WHERE task_id = ?', (task_id,))
+
+        task = self.task_store.get_task(task_id)
+        if task:
+            fields = {'output_files': [], 'outputs_evicted_at': time.time()}
+            if task['status'] == 'completed':
+                fields['status'] = 'expired'
+            self.task_store.update_task(task_id, **fields)
+
+
+def _disk_usage(path):
+    """Return (total bytes, newest mtime) of a file or directory tree"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0, 0
+    if not os.path.isdir(path):
+        return stat.st_size, stat.st_mtime
+
+    size, mtime = 0, stat.st_mtime
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                file_stat = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += file_stat.st_size
+            mtime = max(mtime, file_stat.st_mtime)
+    return size, mtime
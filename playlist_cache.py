@@ -0,0 +1,52 @@
+# playlist_cache.py - Enumerated playlists shared by all web and worker processes
+import json
+import time
+
+from task_store import SQLiteDatabase
+from video_to_ppt_converter import PLAYLIST_CACHE_TTL
+
+
+class SharedPlaylistCache(SQLiteDatabase):
+    """
+    Playlist cache kept in the shared SQLite database
+
+    Playlists are enumerated inside job processes while /convert runs in
+    the web processes, so an in-process cache is never seen by the request
+    that could use it. Rows are keyed by playlist ID and expire after
+    ``ttl`` seconds; expired rows are removed whenever a playlist is stored.
+    Pass an instance to VideoToPPTConverter(playlist_cache=...).
+    """
+
+    def __init__(self, db_path, ttl=PLAYLIST_CACHE_TTL):
+        super().__init__(db_path)
+        self.ttl = ttl
+        self._connection().execute('''
+            CREATE TABLE IF NOT EXISTS playlist_cache (
+                playlist_id TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+
+    def get(self, playlist_id):
+        """Return the cached playlist info, or None if not cached or expired"""
+        row = self._connection().execute(
+            'SELECT info FROM playlist_cache WHERE playlist_id = ? AND expires_at > ?', (playlist_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, playlist_id, info):
+        """Store a playlist's info including all of its entries"""
+        now = time.time()
+        conn = self._transaction()
+        try:
+            conn.execute('DELETE FROM playlist_cache WHERE expires_at <= ?', (now,))
+            conn.execute(
+                'INSERT INTO playlist_cache (playlist_id, info, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(playlist_id) DO UPDATE SET info = excluded.info, expires_at = excluded.expires_at',
+                (playlist_id, json.dumps(info), now + self.ttl)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
@@ -0,0 +1,82 @@
+# rate_limit.py - Per-client request rate limits shared by all web processes
+import math
+import time
+
+from task_store import SQLiteDatabase
+
+
+class RateLimiter(SQLiteDatabase):
+    """
+    Token bucket per client
+
+    Every client has a bucket of up to ``burst`` tokens that refills at
+    ``rate_per_minute`` tokens per minute; each request takes one token.
+    Buckets are kept in the shared SQLite database and updated in one
+    transaction, so all web processes enforce a single limit per client.
+    Buckets that have refilled completely carry no information and are
+    deleted every ``cleanup_interval`` seconds.
+    """
+
+    def __init__(self, db_path, rate_per_minute=10, burst=5, cleanup_interval=300):
+        """
+        Initialize the limiter
+
+        Args:
+            db_path: SQLite database holding the buckets
+            rate_per_minute: Sustained requests allowed per client (0 = unlimited)
+            burst: Requests a client may make at once after being idle
+            cleanup_interval: Minimum seconds between removals of full buckets
+        """
+        super().__init__(db_path)
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.cleanup_interval = cleanup_interval
+        self._last_cleanup = 0
+        self._connection().execute('''
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                client TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+
+    def acquire(self, client):
+        """
+        Take a token from a client's bucket
+
+        Returns:
+            0 if the request may proceed, otherwise the whole number of
+            seconds until the client's next token is available
+        """
+        if not self.rate:
+            return 0
+
+        now = time.time()
+        conn = self._transaction()
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM rate_buckets WHERE client = ?', (client,)).fetchone()
+            tokens = self.burst
+            if row:
+                tokens = min(self.burst, row[0] + (now - row[1]) * self.rate)
+
+            if tokens < 1:
+                conn.execute('ROLLBACK')
+                return max(1, math.ceil((1 - tokens) / self.rate))
+
+            conn.execute(
+                'INSERT INTO rate_buckets (client, tokens, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(client) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at',
+                (client, tokens - 1, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        if now - self._last_cleanup >= self.cleanup_interval:
+            self._last_cleanup = now
+            # A bucket idle for this long is full again, same as having no bucket
+            self._connection().execute(
+                'DELETE FROM rate_buckets WHERE updated_at < ?', (now - self.burst / self.rate,)
+            )
+        return 0
@@ -0,0 +1,145 @@
+# scratch.py - Managed scratch space for downloads and extracted frames
+import os
+import re
+import time
+import shutil
+import tempfile
+import threading
+
+# Root for scratch directories. Defaults to the system temp directory.
+SCRATCH_ROOT = os.environ.get('SCRATCH_ROOT') or None
+
+# Root for extracted frames only (default: SCRATCH_ROOT); point it at a tmpfs
+# (e.g. /dev/shm) to keep frame I/O in memory while downloads, which can be
+# as large as SCRATCH_JOB_LIMIT_MB, stay on disk
+SCRATCH_FRAMES_ROOT = os.environ.get('SCRATCH_FRAMES_ROOT') or None
+
+# Disk a job may use per scratch directory (its download, its extracted frames)
+SCRATCH_JOB_LIMIT_MB = int(os.environ.get('SCRATCH_JOB_LIMIT_MB', 4096))
+
+# Directories older than this are removed even if their owner looks alive
+SCRATCH_MAX_AGE = int(os.environ.get('SCRATCH_MAX_AGE', 86400))
+
+# Scratch directories carry the PID of the process that created them:
+# <prefix>_<pid>_<random>. Older versions created <prefix>_<random>.
+SCRATCH_PREFIXES = ('video_frames', 'youtube_download')
+SCRATCH_NAME = re.compile(r'^(?:%s)_(?:(?P<pid>\d+)_)?' % '|'.join(SCRATCH_PREFIXES))
+
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+
+
+class ScratchLimitExceeded(Exception):
+    """Raised when a job writes more than SCRATCH_JOB_LIMIT_MB into a scratch directory"""
+
+
+def scratch_root(prefix=None):
+    """
+    Return the scratch root directory, creating it if needed
+
+    Args:
+        prefix: One of SCRATCH_PREFIXES; 'video_frames' directories go to
+            SCRATCH_FRAMES_ROOT when it is set
+    """
+    root = (prefix == 'video_frames' and SCRATCH_FRAMES_ROOT) or SCRATCH_ROOT or tempfile.gettempdir()
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def scratch_roots():
+    """Return every distinct scratch root directory"""
+    roots = []
+    for prefix in SCRATCH_PREFIXES:
+        root = scratch_root(prefix)
+        if root not in roots:
+            roots.append(root)
+    return roots
+
+
+def job_limit_bytes():
+    """Per-job scratch limit in bytes (None if unlimited)"""
+    return SCRATCH_JOB_LIMIT_MB * 1024 * 1024 if SCRATCH_JOB_LIMIT_MB > 0 else None
+
+
+def make_scratch_dir(prefix):
+    """
+    Create a scratch directory owned by this process
+
+    Args:
+        prefix: One of SCRATCH_PREFIXES
+
+    Returns:
+        Path of the new directory
+    """
+    return tempfile.mkdtemp(prefix=f"{prefix}_{os.getpid()}_", dir=scratch_root(prefix))
+
+
+def process_alive(pid):
+    """Return True if a process with this PID exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_scratch(max_age=None):
+    """
+    Remove scratch directories left behind by jobs that died
+
+    A directory is removed if the process that created it is gone, or if it
+    is older than ``max_age`` seconds (also covers directories from older
+    versions, which carry no PID).
+
+    Returns:
+        Number of directories removed
+    """
+    max_age = SCRATCH_MAX_AGE if max_age is None else max_age
+    now = time.time()
+    removed = 0
+
+    for root in scratch_roots():
+        removed_here = 0
+        for name in os.listdir(root):
+            match = SCRATCH_NAME.match(name)
+            path = os.path.join(root, name)
+            if not match or not os.path.isdir(path):
+                continue
+
+            pid = match.group('pid')
+            try:
+                age = now - os.stat(path).st_mtime
+            except OSError:
+                continue
+            if age <= max_age and (pid is None or process_alive(int(pid))):
+                continue
+
+            shutil.rmtree(path, ignore_errors=True)
+            removed_here += 1
+
+        if removed_here:
+            print(f"Removed {removed_here} orphaned scratch director{'y' if removed_here == 1 else 'ies'} from {root}")
+        removed += removed_here
+    return removed
+
+
+def start_sweeper(interval=600):
+    """Sweep scratch space now and then every ``interval`` seconds in a background thread"""
+    global _sweeper_pid
+
+    with _sweeper_lock:
+        if _sweeper_pid == os.getpid():
+            return
+        _sweeper_pid = os.getpid()
+
+    def run():
+        while True:
+            try:
+                sweep_scratch()
+            except Exception as e:
+                print(f"Scratch sweep error: {e}")
+            time.sleep(interval)
+
+    threading.Thread(target=run, daemon=True).start()
@@ -1,1169 +1,2642 @@
-# simple_web_app.py - Complete web interface with unlimited playlist support
-from flask import Flask, request, jsonify, render_template_string, send_file, send_from_directory
-import os
-import uuid
-import threading
-from video_to_ppt_converter import VideoToPPTConverter
-import time
-import zipfile
-import shutil
-
-app = Flask(__name__)
-
-# In-memory task storage
-tasks = {}
-
-# Complete HTML template with unlimited playlist support
-HTML_TEMPLATE = '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Video to PPT Converter - Unlimited Playlist Support</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        .container { 
-            max-width: 800px; 
-            margin: 0 auto; 
-            background: white; 
-            border-radius: 15px; 
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        .header { 
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            color: white; 
-            padding: 30px; 
-            text-align: center; 
-        }
-        .header h1 { font-size: 2.5rem; margin-bottom: 10px; font-weight: 300; }
-        .header p { opacity: 0.9; font-size: 1.1rem; }
-        .header .subtitle { font-size: 0.9rem; margin-top: 10px; opacity: 0.8; }
-        .tabs {
-            display: flex;
-            background: #f8f9fa;
-            border-bottom: 1px solid #dee2e6;
-        }
-        .tab {
-            flex: 1;
-            padding: 20px;
-            background: none;
-            border: none;
-            cursor: pointer;
-            font-weight: 600;
-            font-size: 16px;
-            transition: all 0.3s;
-            color: #6c757d;
-        }
-        .tab.active {
-            background: white;
-            color: #007bff;
-            border-bottom: 3px solid #007bff;
-            transform: translateY(-2px);
-        }
-        .tab:hover:not(.active) {
-            background: #e9ecef;
-            color: #495057;
-        }
-        .tab-content {
-            display: none;
-            padding: 40px;
-        }
-        .tab-content.active {
-            display: block;
-        }
-        .form-group { margin-bottom: 25px; }
-        label { 
-            display: block; 
-            margin-bottom: 10px; 
-            font-weight: 600; 
-            color: #333;
-            font-size: 16px;
-        }
-        input[type="text"], input[type="number"] { 
-            width: 100%; 
-            padding: 15px; 
-            border: 2px solid #e1e5e9; 
-            border-radius: 10px; 
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        input:focus { 
-            outline: none; 
-            border-color: #4facfe; 
-            box-shadow: 0 0 0 3px rgba(79, 172, 254, 0.1);
-        }
-        .settings { 
-            display: grid; 
-            grid-template-columns: 1fr 1fr 1fr; 
-            gap: 20px; 
-        }
-        button { 
-            width: 100%; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white; 
-            padding: 18px; 
-            border: none; 
-            border-radius: 10px; 
-            font-size: 18px; 
-            font-weight: 600;
-            cursor: pointer; 
-            transition: all 0.3s;
-        }
-        button:hover:not(:disabled) { 
-            transform: translateY(-3px); 
-            box-shadow: 0 10px 25px rgba(102, 126, 234, 0.3);
-        }
-        button:disabled { 
-            opacity: 0.6; 
-            cursor: not-allowed; 
-            transform: none; 
-            box-shadow: none;
-        }
-        .status { 
-            margin-top: 30px; 
-            padding: 25px; 
-            border-radius: 10px; 
-            display: none; 
-        }
-        .status.pending { background: #fff3cd; color: #856404; border: 1px solid #ffeaa7; }
-        .status.processing { background: #cce5ff; color: #004085; border: 1px solid #74b9ff; }
-        .status.completed { background: #d4edda; color: #155724; border: 1px solid #00b894; }
-        .status.failed { background: #f8d7da; color: #721c24; border: 1px solid #e17055; }
-        .progress { 
-            background: #e9ecef; 
-            height: 12px; 
-            border-radius: 6px; 
-            margin: 15px 0; 
-            overflow: hidden;
-            box-shadow: inset 0 2px 4px rgba(0,0,0,0.1);
-        }
-        .progress-bar { 
-            background: linear-gradient(90deg, #00b894, #00cec9); 
-            height: 100%; 
-            transition: width 0.5s ease; 
-            width: 0%;
-            border-radius: 6px;
-        }
-        .download { 
-            display: inline-block; 
-            background: #28a745; 
-            color: white; 
-            padding: 12px 20px; 
-            text-decoration: none; 
-            border-radius: 8px; 
-            margin: 8px 8px 8px 0;
-            font-weight: 600;
-            transition: all 0.3s;
-        }
-        .download:hover {
-            background: #218838;
-            transform: translateY(-2px);
-            text-decoration: none;
-            color: white;
-        }
-        .download.zip { 
-            background: #ff6b35; 
-            font-size: 16px;
-            padding: 15px 25px;
-        }
-        .download.zip:hover { background: #e55a2b; }
-        .help-text { 
-            font-size: 14px; 
-            color: #6c757d; 
-            margin-top: 8px; 
-            line-height: 1.4;
-        }
-        .video-list {
-            background: #f8f9fa;
-            border-radius: 10px;
-            padding: 20px;
-            margin: 20px 0;
-            max-height: 250px;
-            overflow-y: auto;
-            border: 1px solid #dee2e6;
-        }
-        .video-item {
-            padding: 12px;
-            border-bottom: 1px solid #dee2e6;
-            font-size: 14px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .video-item:last-child {
-            border-bottom: none;
-        }
-        .video-title {
-            flex: 1;
-            margin-right: 10px;
-        }
-        .video-status {
-            font-weight: 600;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-        }
-        .video-status.pending { background: #fff3cd; color: #856404; }
-        .video-status.processing { background: #cce5ff; color: #004085; }
-        .video-status.completed { background: #d4edda; color: #155724; }
-        .video-status.failed { background: #f8d7da; color: #721c24; }
-        .playlist-stats {
-            background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%);
-            padding: 20px;
-            border-radius: 10px;
-            margin: 20px 0;
-            border: 1px solid #2196f3;
-        }
-        .playlist-stats h4 {
-            color: #1976d2;
-            margin-bottom: 10px;
-        }
-        .preset-buttons {
-            display: grid;
-            grid-template-columns: 1fr 1fr 1fr;
-            gap: 10px;
-            margin: 15px 0;
-        }
-        .preset-btn {
-            padding: 10px;
-            background: #f8f9fa;
-            border: 1px solid #dee2e6;
-            border-radius: 6px;
-            cursor: pointer;
-            text-align: center;
-            font-size: 14px;
-            transition: all 0.3s;
-        }
-        .preset-btn:hover {
-            background: #e9ecef;
-            border-color: #007bff;
-        }
-        .preset-btn.active {
-            background: #007bff;
-            color: white;
-            border-color: #007bff;
-        }
-        .example-section {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 10px;
-            margin: 20px 0;
-            border-left: 4px solid #007bff;
-        }
-        .example-url {
-            background: white;
-            padding: 12px;
-            border-radius: 6px;
-            font-family: monospace;
-            font-size: 14px;
-            border: 1px solid #dee2e6;
-            cursor: pointer;
-            margin: 8px 0;
-            transition: all 0.3s;
-        }
-        .example-url:hover {
-            background: #e3f2fd;
-            border-color: #2196f3;
-        }
-        @media (max-width: 768px) {
-            .settings { grid-template-columns: 1fr; }
-            .preset-buttons { grid-template-columns: 1fr; }
-            .header h1 { font-size: 2rem; }
-            .tab-content { padding: 20px; }
-            .container { margin: 10px; }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🎥 Video to PowerPoint Converter</h1>
-            <p>Convert YouTube videos or entire playlists to presentation slides</p>
-            <div class="subtitle">✨ Now with unlimited playlist support - process entire channels!</div>
-        </div>
-        
-        <div class="tabs">
-            <button class="tab active" onclick="switchTab('single')">📱 Single Video</button>
-            <button class="tab" onclick="switchTab('playlist')">📋 Full Playlist</button>
-        </div>
-        
-        <!-- Single Video Tab -->
-        <div id="single-tab" class="tab-content active">
-            <form id="singleForm">
-                <div class="form-group">
-                    <label for="singleVideoUrl">🎬 YouTube Video URL</label>
-                    <input type="text" id="singleVideoUrl" placeholder="https://www.youtube.com/watch?v=..." required>
-                    <div class="help-text">Paste any YouTube video URL here for single video conversion</div>
-                </div>
-                
-                <div class="form-group">
-                    <label>⚙️ Quality Presets</label>
-                    <div class="preset-buttons">
-                        <div class="preset-btn active" onclick="setSinglePreset('balanced')">
-                            <strong>Balanced</strong><br>
-                            <small>Good quality & speed</small>
-                        </div>
-                        <div class="preset-btn" onclick="setSinglePreset('detailed')">
-                            <strong>Detailed</strong><br>
-                            <small>More slides</small>
-                        </div>
-                        <div class="preset-btn" onclick="setSinglePreset('fast')">
-                            <strong>Fast</strong><br>
-                            <small>Fewer slides</small>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="settings">
-                    <div class="form-group">
-                        <label for="singleThreshold">Similarity Threshold</label>
-                        <input type="number" id="singleThreshold" min="0.80" max="0.99" step="0.01" value="0.90">
-                        <div class="help-text">Lower = more slides</div>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="singleInterval">Frame Interval</label>
-                        <input type="number" id="singleInterval" min="15" max="120" value="30">
-                        <div class="help-text">Higher = fewer slides</div>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label>Processing Mode</label>
-                        <select id="singleMode" style="width: 100%; padding: 15px; border: 2px solid #e1e5e9; border-radius: 10px; font-size: 16px;">
-                            <option value="standard">Standard Quality</option>
-                            <option value="fast">Fast Processing</option>
-                            <option value="detailed">Detailed Analysis</option>
-                        </select>
-                    </div>
-                </div>
-                
-                <button type="submit" id="singleBtn">🚀 Convert Single Video</button>
-            </form>
-        </div>
-        
-        <!-- Playlist Tab -->
-        <div id="playlist-tab" class="tab-content">
-            <div class="example-section">
-                <h4>📋 Example Playlist (Click to Use)</h4>
-                <div class="example-url" onclick="fillPlaylistUrl('https://www.youtube.com/playlist?list=PLHmPsm34AX4bg-pFUgI1eA5bNvunl_Vmb')">
-                    https://www.youtube.com/playlist?list=PLHmPsm34AX4bg-pFUgI1eA5bNvunl_Vmb
-                </div>
-                <p class="help-text">This is your specified playlist - click above to auto-fill it!</p>
-            </div>
-            
-            <form id="playlistForm">
-                <div class="form-group">
-                    <label for="playlistUrl">📋 YouTube Playlist URL</label>
-                    <input type="text" id="playlistUrl" placeholder="https://www.youtube.com/playlist?list=..." required>
-                    <div class="help-text">
-                        Paste any YouTube playlist URL here. Works with:
-                        <br>• Public playlists • Educational content • Tutorial series • Conference talks
-                    </div>
-                </div>
-                
-                <div class="form-group">
-                    <label>⚙️ Content Type Presets</label>
-                    <div class="preset-buttons">
-                        <div class="preset-btn active" onclick="setPlaylistPreset('educational')">
-                            <strong>📚 Educational</strong><br>
-                            <small>Lectures, Courses</small>
-                        </div>
-                        <div class="preset-btn" onclick="setPlaylistPreset('tutorial')">
-                            <strong>🛠️ Tutorial</strong><br>
-                            <small>How-to, Coding</small>
-                        </div>
-                        <div class="preset-btn" onclick="setPlaylistPreset('presentation')">
-                            <strong>🎤 Presentation</strong><br>
-                            <small>Talks, Slides</small>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="settings">
-                    <div class="form-group">
-                        <label for="playlistThreshold">Similarity Threshold</label>
-                        <input type="number" id="playlistThreshold" min="0.80" max="0.99" step="0.01" value="0.90">
-                        <div class="help-text">Lower = more slides per video</div>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="playlistInterval">Frame Interval</label>
-                        <input type="number" id="playlistInterval" min="15" max="120" value="45">
-                        <div class="help-text">Higher = fewer slides per video</div>
-                    </div>
-                    
-                    <div class="form-group">
-                        <label for="maxVideos">Max Videos (Optional)</label>
-                        <input type="number" id="maxVideos" min="1" max="999" placeholder="Leave empty for ALL videos">
-                        <div class="help-text">
-                            <strong>Leave empty to process ALL videos in playlist!</strong><br>
-                            Or set a limit if you want to test with fewer videos first.
-                        </div>
-                    </div>
-                </div>
-                
-                <button type="submit" id="playlistBtn">🎬 Convert Entire Playlist</button>
-            </form>
-            
-            <div id="playlistInfo" style="display: none;"></div>
-        </div>
-        
-        <div id="status" class="status">
-            <h4 id="statusTitle">Processing...</h4>
-            <p id="statusText">Starting conversion...</p>
-            <div class="progress">
-                <div class="progress-bar" id="progressBar"></div>
-            </div>
-            <div id="videoProgress" class="video-list" style="display: none;"></div>
-            <div id="downloadSection"></div>
-        </div>
-    </div>
-
-    <script>
-        let currentTaskId = null;
-        let statusInterval = null;
-        let activeTab = 'single';
-        
-        function switchTab(tab) {
-            activeTab = tab;
-            
-            // Update tab buttons
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            document.querySelector(`[onclick="switchTab('${tab}')"]`).classList.add('active');
-            
-            // Update tab content
-            document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-            document.getElementById(`${tab}-tab`).classList.add('active');
-            
-            // Hide status if switching tabs
-            document.getElementById('status').style.display = 'none';
-        }
-        
-        function fillPlaylistUrl(url) {
-            document.getElementById('playlistUrl').value = url;
-            // Auto-focus the field to show it's filled
-            document.getElementById('playlistUrl').focus();
-            document.getElementById('playlistUrl').style.background = '#e3f2fd';
-            setTimeout(() => {
-                document.getElementById('playlistUrl').style.background = '';
-            }, 2000);
-        }
-        
-        function setSinglePreset(type) {
-            // Update button states
-            document.querySelectorAll('#single-tab .preset-btn').forEach(btn => btn.classList.remove('active'));
-            event.target.closest('.preset-btn').classList.add('active');
-            
-            const threshold = document.getElementById('singleThreshold');
-            const interval = document.getElementById('singleInterval');
-            
-            switch(type) {
-                case 'detailed':
-                    threshold.value = 0.85;
-                    interval.value = 20;
-                    break;
-                case 'fast':
-                    threshold.value = 0.95;
-                    interval.value = 60;
-                    break;
-                default: // balanced
-                    threshold.value = 0.90;
-                    interval.value = 30;
-            }
-        }
-        
-        function setPlaylistPreset(type) {
-            // Update button states
-            document.querySelectorAll('#playlist-tab .preset-btn').forEach(btn => btn.classList.remove('active'));
-            event.target.closest('.preset-btn').classList.add('active');
-            
-            const threshold = document.getElementById('playlistThreshold');
-            const interval = document.getElementById('playlistInterval');
-            
-            switch(type) {
-                case 'tutorial':
-                    threshold.value = 0.88;
-                    interval.value = 20;
-                    break;
-                case 'presentation':
-                    threshold.value = 0.95;
-                    interval.value = 60;
-                    break;
-                default: // educational
-                    threshold.value = 0.92;
-                    interval.value = 45;
-            }
-        }
-        
-        document.getElementById('singleForm').onsubmit = async function(e) {
-            e.preventDefault();
-            
-            const videoUrl = document.getElementById('singleVideoUrl').value.trim();
-            const threshold = parseFloat(document.getElementById('singleThreshold').value);
-            const interval = parseInt(document.getElementById('singleInterval').value);
-            const mode = document.getElementById('singleMode').value;
-            
-            if (!videoUrl) {
-                alert('Please enter a YouTube video URL');
-                return;
-            }
-            
-            await startConversion({
-                type: 'single',
-                video_url: videoUrl,
-                threshold: threshold,
-                interval: interval,
-                mode: mode
-            }, 'singleBtn');
-        };
-        
-        document.getElementById('playlistForm').onsubmit = async function(e) {
-            e.preventDefault();
-            
-            const playlistUrl = document.getElementById('playlistUrl').value.trim();
-            const threshold = parseFloat(document.getElementById('playlistThreshold').value);
-            const interval = parseInt(document.getElementById('playlistInterval').value);
-            const maxVideosInput = document.getElementById('maxVideos').value.trim();
-            const maxVideos = maxVideosInput ? parseInt(maxVideosInput) : null;
-            
-            if (!playlistUrl) {
-                alert('Please enter a YouTube playlist URL');
-                return;
-            }
-            
-            if (!playlistUrl.includes('playlist') && !playlistUrl.includes('list=')) {
-                alert('Please enter a valid YouTube playlist URL\\n\\nExample: https://www.youtube.com/playlist?list=...');
-                return;
-            }
-            
-            // Confirm if processing all videos
-            if (!maxVideos) {
-                const confirm = window.confirm(
-                    'You are about to process ALL videos in this playlist.\\n\\n' +
-                    'This could take several hours depending on playlist size.\\n\\n' +
-                    'Continue with unlimited processing?'
-                );
-                if (!confirm) return;
-            }
-            
-            await startConversion({
-                type: 'playlist',
-                playlist_url: playlistUrl,
-                threshold: threshold,
-                interval: interval,
-                max_videos: maxVideos
-            }, 'playlistBtn');
-        };
-        
-        async function startConversion(data, buttonId) {
-            try {
-                // Disable form
-                const btn = document.getElementById(buttonId);
-                btn.disabled = true;
-                btn.textContent = 'Starting...';
-                
-                // Show status
-                const statusDiv = document.getElementById('status');
-                statusDiv.style.display = 'block';
-                statusDiv.className = 'status processing';
-                document.getElementById('statusTitle').textContent = 'Starting Conversion';
-                document.getElementById('statusText').textContent = 'Initializing...';
-                
-                // Start conversion
-                const response = await fetch('/convert', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(data)
-                });
-                
-                if (!response.ok) {
-                    const error = await response.json();
-                    throw new Error(error.error || 'Conversion failed');
-                }
-                
-                const result = await response.json();
-                currentTaskId = result.task_id;
-                
-                // Show playlist info if available
-                if (result.playlist_info) {
-                    showPlaylistInfo(result.playlist_info);
-                }
-                
-                // Start status checking
-                checkStatus();
-                statusInterval = setInterval(checkStatus, 3000);
-                
-            } catch (error) {
-                showError('Failed to start conversion: ' + error.message);
-                resetForm(buttonId);
-            }
-        }
-        
-        function showPlaylistInfo(info) {
-            const infoDiv = document.getElementById('playlistInfo');
-            infoDiv.style.display = 'block';
-            infoDiv.innerHTML = `
-                <div class="playlist-stats">
-                    <h4>📋 ${info.title}</h4>
-                    <p><strong>👤 Channel:</strong> ${info.uploader}</p>
-                    <p><strong>📹 Total Videos:</strong> ${info.video_count}</p>
-                    <p><strong>🚀 Processing:</strong> ${info.video_count} videos (unlimited mode)</p>
-                    <p><strong>⏱️ Estimated Time:</strong> ${Math.round(info.video_count * 4)} - ${Math.round(info.video_count * 8)} minutes</p>
-                </div>
-            `;
-        }
-        
-        async function checkStatus() {
-            if (!currentTaskId) return;
-            
-            try {
-                const response = await fetch(`/status/${currentTaskId}`);
-                if (!response.ok) throw new Error('Status check failed');
-                
-                const task = await response.json();
-                updateStatusDisplay(task);
-                
-                if (task.status === 'completed') {
-                    clearInterval(statusInterval);
-                    showSuccess(task);
-                    resetForm();
-                } else if (task.status === 'failed') {
-                    clearInterval(statusInterval);
-                    showError(task.error || 'Conversion failed');
-                    resetForm();
-                }
-                
-            } catch (error) {
-                console.error('Status check error:', error);
-            }
-        }
-        
-        function updateStatusDisplay(task) {
-            const statusDiv = document.getElementById('status');
-            const titleEl = document.getElementById('statusTitle');
-            const textEl = document.getElementById('statusText');
-            const progressBar = document.getElementById('progressBar');
-            
-            statusDiv.className = `status ${task.status}`;
-            
-            switch(task.status) {
-                case 'pending':
-                    titleEl.textContent = '⏳ Queued';
-                    textEl.textContent = 'Waiting to start...';
-                    break;
-                case 'processing':
-                    if (task.type === 'playlist') {
-                        titleEl.textContent = '🎬 Converting Playlist (Unlimited Mode)';
-                        const current = task.current_video || 0;
-                        const total = task.total_videos || '?';
-                        textEl.textContent = `Processing video ${current}/${total} - ${Math.round((current/total)*100) || 0}% complete`;
-                        
-                        // Show video progress if available
-                        if (task.video_progress) {
-                            showVideoProgress(task.video_progress);
-                        }
-                    } else {
-                        titleEl.textContent = '🎥 Converting Single Video';
-                        textEl.textContent = 'Extracting frames and creating slides...';
-                    }
-                    break;
-                case 'completed':
-                    titleEl.textContent = '✅ Conversion Complete!';
-                    if (task.type === 'playlist') {
-                        const count = task.output_files?.length || 0;
-                        textEl.textContent = `Successfully processed ${count} videos from playlist!`;
-                    } else {
-                        textEl.textContent = 'Your PowerPoint presentation is ready for download.';
-                    }
-                    break;
-                case 'failed':
-                    titleEl.textContent = '❌ Conversion Failed';
-                    textEl.textContent = task.error || 'An error occurred during processing';
-                    break;
-            }
-            
-            const progress = task.progress || 0;
-            progressBar.style.width = progress + '%';
-        }
-        
-        function showVideoProgress(videoProgress) {
-            const progressDiv = document.getElementById('videoProgress');
-            progressDiv.style.display = 'block';
-            progressDiv.innerHTML = '<h5>📹 Video Processing Status:</h5>';
-            
-            videoProgress.forEach((video, index) => {
-                const videoItem = document.createElement('div');
-                videoItem.className = 'video-item';
-                videoItem.innerHTML = `
-                    <div class="video-title">${index + 1}. ${video.title}</div>
-                    <div class="video-status ${video.status}">${video.status.toUpperCase()}</div>
-                `;
-                progressDiv.appendChild(videoItem);
-            });
-        }
-        
-        function showSuccess(task) {
-            const downloadSection = document.getElementById('downloadSection');
-            
-            if (task.type === 'playlist' && task.output_files && task.output_files.length > 0) {
-                let downloadHtml = `
-                    <h4>🎉 Playlist Conversion Complete!</h4>
-                    <p><strong>✅ Successfully processed:</strong> ${task.output_files.length - 1} videos</p>
-                    <br>
-                    <a href="/download/${task.id}/all" class="download zip">📦 Download All Presentations (ZIP)</a>
-                    <br><br>
-                    <h5>📄 Individual Files:</h5>
-                `;
-                
-                // Show first 15 individual files
-                const individualFiles = task.output_files.filter(f => !f.endsWith('.zip')).slice(0, 15);
-                individualFiles.forEach((file, index) => {
-                    downloadHtml += `
-                        <a href="/download/${task.id}/${file}" class="download">📄 ${index + 1}. ${file.replace('.pptx', '')}</a>
-                    `;
-                });
-                
-                if (task.output_files.length > 16) {
-                    downloadHtml += `
-                        <p class="help-text">
-                            <strong>📦 Download the ZIP file above to get all ${task.output_files.length - 1} presentations!</strong>
-                        </p>
-                    `;
-                }
-                
-                downloadSection.innerHTML = downloadHtml;
-            } else {
-                downloadSection.innerHTML = `
-                    <h4>🎉 Video Conversion Complete!</h4>
-                    <a href="/download/${task.id}" class="download">📥 Download PowerPoint Presentation</a>
-                    <div class="help-text" style="margin-top: 15px;">
-                        <strong>Task ID:</strong> ${task.id}<br>
-                        Right-click download link and "Save As" if needed
-                    </div>
-                `;
-            }
-        }
-        
-        function showError(message) {
-            const statusDiv = document.getElementById('status');
-            statusDiv.style.display = 'block';
-            statusDiv.className = 'status failed';
-            document.getElementById('statusTitle').textContent = '❌ Error';
-            document.getElementById('statusText').textContent = message;
-        }
-        
-        function resetForm(buttonId = null) {
-            if (buttonId) {
-                const btn = document.getElementById(buttonId);
-                btn.disabled = false;
-                if (buttonId === 'singleBtn') {
-                    btn.textContent = '🚀 Convert Single Video';
-                } else {
-                    btn.textContent = '🎬 Convert Entire Playlist';
-                }
-            } else {
-                // Reset all buttons
-                document.getElementById('singleBtn').disabled = false;
-                document.getElementById('singleBtn').textContent = '🚀 Convert Single Video';
-                document.getElementById('playlistBtn').disabled = false;
-                document.getElementById('playlistBtn').textContent = '🎬 Convert Entire Playlist';
-            }
-        }
-        
-        // Auto-fill the example playlist on page load
-        window.onload = function() {
-            document.getElementById('playlistUrl').value = 'https://www.youtube.com/playlist?list=PLHmPsm34AX4bg-pFUgI1eA5bNvunl_Vmb';
-        };
-    </script>
-</body>
-</html>
-'''
-
-class SimpleTaskManager:
-    def __init__(self):
-        self.tasks = {}
-    
-    def create_task(self, task_id, task_type, **kwargs):
-        self.tasks[task_id] = {
-            'id': task_id,
-            'type': task_type,
-            'status': 'pending',
-            'progress': 0,
-            'output_files': [],
-            'error': None,
-            'current_video': 0,
-            'total_videos': 0,
-            'video_progress': [],
-            **kwargs
-        }
-        return task_id
-    
-    def update_task(self, task_id, **kwargs):
-        if task_id in self.tasks:
-            self.tasks[task_id].update(kwargs)
-    
-    def get_task(self, task_id):
-        return self.tasks.get(task_id)
-
-task_manager = SimpleTaskManager()
-
-def process_single_video_background(task_id, video_url, threshold, interval, mode='standard'):
-    """Background single video processing with enhanced options"""
-    try:
-        print(f"Starting single video task {task_id}: {video_url} (mode: {mode})")
-        task_manager.update_task(task_id, status='processing', progress=10)
-        
-        # Adjust settings based on mode
-        if mode == 'fast':
-            threshold = min(threshold + 0.03, 0.98)
-            interval = max(interval + 15, 45)
-        elif mode == 'detailed':
-            threshold = max(threshold - 0.03, 0.82)
-            interval = max(interval - 10, 15)
-        
-        converter = VideoToPPTConverter(
-            similarity_threshold=threshold,
-            min_frame_interval=interval
-        )
-        
-        task_manager.update_task(task_id, progress=25)
-        
-        output_filename = f"presentation_{task_id}.pptx"
-        output_path = os.path.join('outputs', output_filename)
-        
-        task_manager.update_task(task_id, progress=50)
-        
-        result = converter.process_video(
-            video_url,
-            output_ppt=output_path,
-            cleanup_temp=True
-        )
-        
-        if result and os.path.exists(output_path):
-            task_manager.update_task(
-                task_id,
-                status='completed',
-                progress=100,
-                output_files=[output_filename]
-            )
-            print(f"Single video task {task_id}: Completed successfully")
-        else:
-            raise Exception("Failed to create PowerPoint file")
-        
-    except Exception as e:
-        error_msg = str(e)
-        print(f"Single video task {task_id}: Failed with error: {error_msg}")
-        task_manager.update_task(task_id, status='failed', error=error_msg)
-
-def process_playlist_background(task_id, playlist_url, threshold, interval, max_videos=None):
-    """Background playlist processing with unlimited support"""
-    try:
-        print(f"Starting playlist task {task_id}: {playlist_url} (max_videos: {max_videos or 'UNLIMITED'})")
-        task_manager.update_task(task_id, status='processing', progress=5)
-        
-        converter = VideoToPPTConverter(
-            similarity_threshold=threshold,
-            min_frame_interval=interval
-        )
-        
-        # Create playlist output directory
-        playlist_output_dir = os.path.join('outputs', f"playlist_{task_id}")
-        os.makedirs(playlist_output_dir, exist_ok=True)
-        
-        task_manager.update_task(task_id, progress=10)
-        
-        # Process playlist with unlimited videos if max_videos is None
-        results = converter.process_playlist(
-            playlist_url=playlist_url,
-            output_dir=playlist_output_dir,
-            max_videos=max_videos,  # None means unlimited
-            cleanup_temp=True
-        )
-        
-        # Track video progress
-        video_progress = []
-        output_files = []
-        
-        if results['processed_videos']:
-            for i, video in enumerate(results['processed_videos']):
-                filename = os.path.basename(video['output_path'])
-                output_files.append(filename)
-                
-                video_progress.append({
-                    'title': video['title'][:50] + '...' if len(video['title']) > 50 else video['title'],
-                    'status': 'completed'
-                })
-                
-                # Update progress during processing
-                current_video = len(output_files)
-                total_videos = results['total_videos']
-                progress = 10 + (current_video / total_videos) * 80
-                
-                task_manager.update_task(
-                    task_id, 
-                    current_video=current_video,
-                    total_videos=total_videos,
-                    progress=min(90, progress),
-                    video_progress=video_progress
-                )
-                
-                print(f"Playlist {task_id}: Completed video {current_video}/{total_videos}")
-        
-        # Add failed videos to progress
-        if results['failed_videos']:
-            for video in results['failed_videos']:
-                video_progress.append({
-                    'title': video['title'][:50] + '...' if len(video['title']) > 50 else video['title'],
-                    'status': 'failed'
-                })
-        
-        # Create ZIP file of all presentations
-        if output_files:
-            zip_filename = f"playlist_{task_id}_all.zip"
-            zip_path = os.path.join('outputs', zip_filename)
-            
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for filename in output_files:
-                    file_path = os.path.join(playlist_output_dir, filename)
-                    if os.path.exists(file_path):
-                        # Use a clean filename in the ZIP
-                        clean_name = filename.replace(f'_{task_id}', '').replace('presentation_', '')
-                        zipf.write(file_path, clean_name)
-            
-            output_files.append(zip_filename)
-        
-        task_manager.update_task(
-            task_id,
-            status='completed',
-            progress=100,
-            output_files=output_files,
-            processed_count=len(results['processed_videos']),
-            failed_count=len(results['failed_videos']),
-            video_progress=video_progress
-        )
-        
-        print(f"Playlist task {task_id}: Completed successfully")
-        print(f"Results: {len(results['processed_videos'])} successful, {len(results['failed_videos'])} failed")
-        
-    except Exception as e:
-        error_msg = str(e)
-        print(f"Playlist task {task_id}: Failed with error: {error_msg}")
-        task_manager.update_task(task_id, status='failed', error=error_msg)
-
-@app.route('/')
-def index():
-    return render_template_string(HTML_TEMPLATE)
-
-@app.route('/convert', methods=['POST'])
-def convert():
-    try:
-        data = request.get_json()
-        conversion_type = data.get('type', 'single')
-        
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())[:8]
-        
-        if conversion_type == 'playlist':
-            playlist_url = data.get('playlist_url', '').strip()
-            threshold = float(data.get('threshold', 0.90))
-            interval = int(data.get('interval', 45))
-            max_videos = data.get('max_videos')  # Can be None for unlimited
-            
-            if not playlist_url:
-                return jsonify({'error': 'No playlist URL provided'}), 400
-            
-            if not ('playlist' in playlist_url or 'list=' in playlist_url):
-                return jsonify({'error': 'Please provide a valid YouTube playlist URL'}), 400
-            
-            # Get playlist info first
-            try:
-                converter = VideoToPPTConverter()
-                playlist_info = converter.get_playlist_info(playlist_url)
-                
-                # Update video count if limited
-                if max_videos and max_videos < playlist_info['video_count']:
-                    playlist_info['video_count'] = max_videos
-                
-                print(f"Playlist info: {playlist_info['title']} - {playlist_info['video_count']} videos")
-                
-            except Exception as e:
-                return jsonify({'error': f'Failed to get playlist info: {str(e)}'}), 400
-            
-            # Create playlist task
-            task_manager.create_task(
-                task_id, 
-                'playlist',
-                playlist_url=playlist_url,
-                threshold=threshold,
-                interval=interval,
-                max_videos=max_videos,
-                total_videos=playlist_info['video_count']
-            )
-            
-            # Start background processing
-            thread = threading.Thread(
-                target=process_playlist_background,
-                args=(task_id, playlist_url, threshold, interval, max_videos),
-                daemon=True
-            )
-            thread.start()
-            
-            return jsonify({
-                'task_id': task_id,
-                'status': 'started',
-                'type': 'playlist',
-                'playlist_info': playlist_info
-            })
-            
-        else:  # Single video
-            video_url = data.get('video_url', '').strip()
-            threshold = float(data.get('threshold', 0.90))
-            interval = int(data.get('interval', 30))
-            mode = data.get('mode', 'standard')
-            
-            if not video_url:
-                return jsonify({'error': 'No video URL provided'}), 400
-            
-            if not ('youtube.com' in video_url or 'youtu.be' in video_url):
-                return jsonify({'error': 'Please provide a valid YouTube URL'}), 400
-            
-            # Create single video task
-            task_manager.create_task(
-                task_id,
-                'single',
-                video_url=video_url,
-                threshold=threshold,
-                interval=interval,
-                mode=mode
-            )
-            
-            # Start background processing
-            thread = threading.Thread(
-                target=process_single_video_background,
-                args=(task_id, video_url, threshold, interval, mode),
-                daemon=True
-            )
-            thread.start()
-            
-            return jsonify({
-                'task_id': task_id,
-                'status': 'started',
-                'type': 'single'
-            })
-        
-    except Exception as e:
-        print(f"Convert endpoint error: {e}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/status/<task_id>')
-def status(task_id):
-    task = task_manager.get_task(task_id)
-    if not task:
-        return jsonify({'error': 'Task not found'}), 404
-    return jsonify(task)
-
-@app.route('/download/<task_id>')
-@app.route('/download/<task_id>/<filename>')
-def download(task_id, filename=None):
-    task = task_manager.get_task(task_id)
-    if not task:
-        return jsonify({'error': 'Task not found'}), 404
-    
-    if task['status'] != 'completed':
-        return jsonify({'error': 'Conversion not completed yet'}), 400
-    
-    if task['type'] == 'playlist':
-        if filename == 'all':
-            # Download ZIP file
-            zip_filename = f"playlist_{task_id}_all.zip"
-            zip_path = os.path.join('outputs', zip_filename)
-            if os.path.exists(zip_path):
-                return send_file(
-                    zip_path, 
-                    as_attachment=True, 
-                    download_name=f"playlist_presentations_{task_id}.zip"
-                )
-            else:
-                return jsonify({'error': 'ZIP file not found'}), 404
-        elif filename:
-            # Download specific file
-            if filename in task['output_files']:
-                if filename.endswith('.zip'):
-                    file_path = os.path.join('outputs', filename)
-                else:
-                    file_path = os.path.join('outputs', f"playlist_{task_id}", filename)
-                
-                if os.path.exists(file_path):
-                    return send_file(file_path, as_attachment=True)
-                else:
-                    return jsonify({'error': 'File not found'}), 404
-            else:
-                return jsonify({'error': 'File not in task output'}), 404
-        else:
-            return jsonify({'error': 'No filename specified for playlist download'}), 400
-    else:
-        # Single video download
-        if not task['output_files']:
-            return jsonify({'error': 'No output file available'}), 404
-        
-        file_path = os.path.join('outputs', task['output_files'][0])
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'Output file not found'}), 404
-        
-        return send_file(
-            file_path, 
-            as_attachment=True,
-            download_name=f"video_presentation_{task_id}.pptx"
-        )
-
-@app.route('/health')
-def health():
-    active_tasks = len([t for t in task_manager.tasks.values() if t['status'] == 'processing'])
-    total_tasks = len(task_manager.tasks)
-    
-    return jsonify({
-        'status': 'healthy', 
-        'active_tasks': active_tasks,
-        'total_tasks': total_tasks,
-        'features': ['single_video', 'unlimited_playlist', 'batch_download'],
-        'version': '2.0-unlimited'
-    })
-
-if __name__ == '__main__':
-    # Create necessary directories
-    os.makedirs('outputs', exist_ok=True)
-    os.makedirs('temp', exist_ok=True)
-    
-    # Get port from environment (Railway provides PORT variable)
-    port = int(os.environ.get('PORT', 8000))
-    
-    print(f"🚀 Starting Video to PowerPoint Converter v2.0")
-    print(f"📡 Server starting on port {port}")
-    print(f"🌐 Environment: {'Railway' if 'RAILWAY_' in str(os.environ) else 'Local'}")
-    print(f"✨ Features:")
-    print(f"   📱 Single video conversion")
-    print(f"   📋 UNLIMITED playlist conversion")
-    print(f"   📦 Batch ZIP downloads")
-    print(f"   🎯 Smart quality presets")
-    print(f"   📊 Real-time progress tracking")
-    
-    try:
-        # Run the Flask app with Railway-optimized settings
-        app.run(
-            host='0.0.0.0', 
-            port=port, 
-            debug=False,
-            threaded=True,
-            use_reloader=False
-        )
-    except Exception as e:
-        print(f"❌ Server failed to start: {e}")
-        print("🔧 Check logs for more details")
-        raise
+# simple_web_app.py - Complete web interface with unlimited playlist support
+from flask import (
+    Flask, Response, g, has_request_context, request, jsonify, render_template_string, send_file, send_from_directory,
+    stream_with_context
+)
+import os
+import uuid
+from video_to_ppt_converter import (
+    PREFETCH_DEPTH, PREFETCH_DISK_BUDGET_MB, JobCancelled, VideoToPPTConverter, numbered_output_name
+)
+from job_executor import JobExecutor, JobTooLargeError, QueueFullError
+from task_store import FINISHED_STATUSES, TaskStore
+from output_retention import OutputRetention
+from scratch import job_limit_bytes, scratch_roots, start_sweeper, sweep_scratch
+from admission import AdmissionControl, estimate_job_resources
+from rate_limit import RateLimiter
+from metrics import MetricsStore
+from playlist_cache import SharedPlaylistCache
+import time
+import zipfile
+import shutil
+import json
+import glob
+import hashlib
+import secrets
+import socket
+import ipaddress
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+app = Flask(__name__)
+
+# Reverse proxies in front of the app (e.g. 1 on Railway or Render). Only
+# that many X-Forwarded-For entries are trusted; the client sets the rest,
+# so with 0 the peer address identifies the client.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# Let a front proxy (nginx X-Accel / Apache X-Sendfile) transmit downloads
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# Server-Sent Events: how often a stream checks its task, how often it sends a
+# keep-alive comment, and how long before the browser is asked to reconnect
+SSE_POLL_INTERVAL = float(os.environ.get('SSE_POLL_INTERVAL', 0.5))
+SSE_KEEPALIVE_SECONDS = 15
+SSE_MAX_SECONDS = int(os.environ.get('SSE_MAX_SECONDS', 300))
+
+# Each open stream holds a server thread, so cap them per process to keep
+# threads free for /status, /convert and /health; streams above the cap get
+# 503 and the page falls back to polling
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', 16))
+_sse_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+# A processing task with no progress for this long is reported as stalled
+STALL_SECONDS = int(os.environ.get('STALL_SECONDS', 120))
+
+# Playlist videos report a heartbeat at most this often per stage; each one
+# rewrites the task, so it only needs to be well inside STALL_SECONDS
+PLAYLIST_HEARTBEAT_SECONDS = STALL_SECONDS / 4
+
+# Per-client limits on /convert: sustained requests per minute (token bucket
+# with RATE_LIMIT_BURST tokens) and conversions pending or running at once.
+# 0 disables a limit.
+RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', 10))
+RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 5))
+MAX_ACTIVE_JOBS_PER_CLIENT = int(os.environ.get('MAX_ACTIVE_JOBS_PER_CLIENT', 3))
+
+# Retry-After sent to a client at its concurrency cap (when one of its jobs
+# will finish is unknown)
+ACTIVE_JOBS_RETRY_AFTER = 30
+
+# Batch submissions: most items per request, and the directory local paths
+# must be inside (local paths are refused when unset)
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 100))
+BATCH_LOCAL_ROOT = os.environ.get('BATCH_LOCAL_ROOT')
+
+# Batch URLs are fetched by the server, so they must resolve to public
+# addresses only. yt-dlp then follows redirects and embedded URLs that this
+# check never sees, so URLs other than YouTube are only accepted on these
+# trusted hosts (or their subdomains); unset, batches accept YouTube URLs only
+BATCH_ALLOWED_HOSTS = [host.strip().lower() for host in os.environ.get('BATCH_ALLOWED_HOSTS', '').split(',')
+                       if host.strip()]
+
+# Videos a client may have in unfinished batch tasks (a batch counts as many
+# conversions, unlike MAX_ACTIVE_JOBS_PER_CLIENT which counts it once); 0 = unlimited
+MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT = int(os.environ.get('MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT', 100))
+
+# Whether web processes also run conversion jobs. Turn off when jobs are run
+# by separate worker processes (python worker.py) sharing the database
+WEB_RUNS_JOBS = os.environ.get('WEB_RUNS_JOBS', '1').lower() in ('1', 'true', 'yes')
+
+# Clients sending one of these keys in X-API-Key are limited per key instead
+# of per IP address
+API_KEYS = {key.strip() for key in os.environ.get('API_KEYS', '').split(',') if key.strip()}
+
+# Complete HTML template with unlimited playlist support
+HTML_TEMPLATE = '''
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Video to PPT Converter - Unlimited Playlist Support</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { 
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            padding: 20px;
+        }
+        .container { 
+            max-width: 800px; 
+            margin: 0 auto; 
+            background: white; 
+            border-radius: 15px; 
+            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
+            overflow: hidden;
+        }
+        .header { 
+            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
+            color: white; 
+            padding: 30px; 
+            text-align: center; 
+        }
+        .header h1 { font-size: 2.5rem; margin-bottom: 10px; font-weight: 300; }
+        .header p { opacity: 0.9; font-size: 1.1rem; }
+        .header .subtitle { font-size: 0.9rem; margin-top: 10px; opacity: 0.8; }
+        .tabs {
+            display: flex;
+            background: #f8f9fa;
+            border-bottom: 1px solid #dee2e6;
+        }
+        .tab {
+            flex: 1;
+            padding: 20px;
+            background: none;
+            border: none;
+            cursor: pointer;
+            font-weight: 600;
+            font-size: 16px;
+            transition: all 0.3s;
+            color: #6c757d;
+        }
+        .tab.active {
+            background: white;
+            color: #007bff;
+            border-bottom: 3px solid #007bff;
+            transform: translateY(-2px);
+        }
+        .tab:hover:not(.active) {
+            background: #e9ecef;
+            color: #495057;
+        }
+        .tab-content {
+            display: none;
+            padding: 40px;
+        }
+        .tab-content.active {
+            display: block;
+        }
+        .form-group { margin-bottom: 25px; }
+        label { 
+            display: block; 
+            margin-bottom: 10px; 
+            font-weight: 600; 
+            color: #333;
+            font-size: 16px;
+        }
+        input[type="text"], input[type="number"] { 
+            width: 100%; 
+            padding: 15px; 
+            border: 2px solid #e1e5e9; 
+            border-radius: 10px; 
+            font-size: 16px;
+            transition: all 0.3s;
+        }
+        input:focus { 
+            outline: none; 
+            border-color: #4facfe; 
+            box-shadow: 0 0 0 3px rgba(79, 172, 254, 0.1);
+        }
+        .settings { 
+            display: grid; 
+            grid-template-columns: 1fr 1fr 1fr; 
+            gap: 20px; 
+        }
+        button { 
+            width: 100%; 
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white; 
+            padding: 18px; 
+            border: none; 
+            border-radius: 10px; 
+            font-size: 18px; 
+            font-weight: 600;
+            cursor: pointer; 
+            transition: all 0.3s;
+        }
+        button:hover:not(:disabled) { 
+            transform: translateY(-3px); 
+            box-shadow: 0 10px 25px rgba(102, 126, 234, 0.3);
+        }
+        button:disabled { 
+            opacity: 0.6; 
+            cursor: not-allowed; 
+            transform: none; 
+            box-shadow: none;
+        }
+        .status { 
+            margin-top: 30px; 
+            padding: 25px; 
+            border-radius: 10px; 
+            display: none; 
+        }
+        .status.pending { background: #fff3cd; color: #856404; border: 1px solid #ffeaa7; }
+        .status.processing { background: #cce5ff; color: #004085; border: 1px solid #74b9ff; }
+        .status.completed { background: #d4edda; color: #155724; border: 1px solid #00b894; }
+        .status.failed { background: #f8d7da; color: #721c24; border: 1px solid #e17055; }
+        .status.expired { background: #e2e3e5; color: #383d41; border: 1px solid #b2bec3; }
+        .status.cancelled { background: #e2e3e5; color: #383d41; border: 1px solid #b2bec3; }
+        button.cancel { 
+            width: auto; 
+            background: #dc3545; 
+            padding: 10px 20px; 
+            font-size: 14px; 
+            margin-top: 10px;
+        }
+        .progress { 
+            background: #e9ecef; 
+            height: 12px; 
+            border-radius: 6px; 
+            margin: 15px 0; 
+            overflow: hidden;
+            box-shadow: inset 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .progress-bar { 
+            background: linear-gradient(90deg, #00b894, #00cec9); 
+            height: 100%; 
+            transition: width 0.5s ease; 
+            width: 0%;
+            border-radius: 6px;
+        }
+        .download { 
+            display: inline-block; 
+            background: #28a745; 
+            color: white; 
+            padding: 12px 20px; 
+            text-decoration: none; 
+            border-radius: 8px; 
+            margin: 8px 8px 8px 0;
+            font-weight: 600;
+            transition: all 0.3s;
+        }
+        .download:hover {
+            background: #218838;
+            transform: translateY(-2px);
+            text-decoration: none;
+            color: white;
+        }
+        .download.zip { 
+            background: #ff6b35; 
+            font-size: 16px;
+            padding: 15px 25px;
+        }
+        .download.zip:hover { background: #e55a2b; }
+        .help-text { 
+            font-size: 14px; 
+            color: #6c757d; 
+            margin-top: 8px; 
+            line-height: 1.4;
+        }
+        .video-list {
+            background: #f8f9fa;
+            border-radius: 10px;
+            padding: 20px;
+            margin: 20px 0;
+            max-height: 250px;
+            overflow-y: auto;
+            border: 1px solid #dee2e6;
+        }
+        .video-item {
+            padding: 12px;
+            border-bottom: 1px solid #dee2e6;
+            font-size: 14px;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        .video-item:last-child {
+            border-bottom: none;
+        }
+        .video-title {
+            flex: 1;
+            margin-right: 10px;
+        }
+        .video-status {
+            font-weight: 600;
+            padding: 4px 8px;
+            border-radius: 4px;
+            font-size: 12px;
+        }
+        .video-status.pending { background: #fff3cd; color: #856404; }
+        .video-status.processing { background: #cce5ff; color: #004085; }
+        .video-status.completed { background: #d4edda; color: #155724; }
+        .video-status.failed { background: #f8d7da; color: #721c24; }
+        .video-status.cancelled { background: #e2e3e5; color: #383d41; }
+        .playlist-stats {
+            background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%);
+            padding: 20px;
+            border-radius: 10px;
+            margin: 20px 0;
+            border: 1px solid #2196f3;
+        }
+        .playlist-stats h4 {
+            color: #1976d2;
+            margin-bottom: 10px;
+        }
+        .preset-buttons {
+            display: grid;
+            grid-template-columns: 1fr 1fr 1fr;
+            gap: 10px;
+            margin: 15px 0;
+        }
+        .preset-btn {
+            padding: 10px;
+            background: #f8f9fa;
+            border: 1px solid #dee2e6;
+            border-radius: 6px;
+            cursor: pointer;
+            text-align: center;
+            font-size: 14px;
+            transition: all 0.3s;
+        }
+        .preset-btn:hover {
+            background: #e9ecef;
+            border-color: #007bff;
+        }
+        .preset-btn.active {
+            background: #007bff;
+            color: white;
+            border-color: #007bff;
+        }
+        .example-section {
+            background: #f8f9fa;
+            padding: 20px;
+            border-radius: 10px;
+            margin: 20px 0;
+            border-left: 4px solid #007bff;
+        }
+        .example-url {
+            background: white;
+            padding: 12px;
+            border-radius: 6px;
+            font-family: monospace;
+            font-size: 14px;
+            border: 1px solid #dee2e6;
+            cursor: pointer;
+            margin: 8px 0;
+            transition: all 0.3s;
+        }
+        .example-url:hover {
+            background: #e3f2fd;
+            border-color: #2196f3;
+        }
+        @media (max-width: 768px) {
+            .settings { grid-template-columns: 1fr; }
+            .preset-buttons { grid-template-columns: 1fr; }
+            .header h1 { font-size: 2rem; }
+            .tab-content { padding: 20px; }
+            .container { margin: 10px; }
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🎥 Video to PowerPoint Converter</h1>
+            <p>Convert YouTube videos or entire playlists to presentation slides</p>
+            <div class="subtitle">✨ Now with unlimited playlist support - process entire channels!</div>
+        </div>
+        
+        <div class="tabs">
+            <button class="tab active" onclick="switchTab('single')">📱 Single Video</button>
+            <button class="tab" onclick="switchTab('playlist')">📋 Full Playlist</button>
+        </div>
+        
+        <!-- Single Video Tab -->
+        <div id="single-tab" class="tab-content active">
+            <form id="singleForm">
+                <div class="form-group">
+                    <label for="singleVideoUrl">🎬 YouTube Video URL</label>
+                    <input type="text" id="singleVideoUrl" placeholder="https://www.youtube.com/watch?v=..." required>
+                    <div class="help-text">Paste any YouTube video URL here for single video conversion</div>
+                </div>
+                
+                <div class="form-group">
+                    <label>⚙️ Quality Presets</label>
+                    <div class="preset-buttons">
+                        <div class="preset-btn active" onclick="setSinglePreset('balanced')">
+                            <strong>Balanced</strong><br>
+                            <small>Good quality & speed</small>
+                        </div>
+                        <div class="preset-btn" onclick="setSinglePreset('detailed')">
+                            <strong>Detailed</strong><br>
+                            <small>More slides</small>
+                        </div>
+                        <div class="preset-btn" onclick="setSinglePreset('fast')">
+                            <strong>Fast</strong><br>
+                            <small>Fewer slides</small>
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="settings">
+                    <div class="form-group">
+                        <label for="singleThreshold">Similarity Threshold</label>
+                        <input type="number" id="singleThreshold" min="0.80" max="0.99" step="0.01" value="0.90">
+                        <div class="help-text">Lower = more slides</div>
+                    </div>
+                    
+                    <div class="form-group">
+                        <label for="singleInterval">Frame Interval</label>
+                        <input type="number" id="singleInterval" min="15" max="120" value="30">
+                        <div class="help-text">Higher = fewer slides</div>
+                    </div>
+                    
+                    <div class="form-group">
+                        <label>Processing Mode</label>
+                        <select id="singleMode" style="width: 100%; padding: 15px; border: 2px solid #e1e5e9; border-radius: 10px; font-size: 16px;">
+                            <option value="standard">Standard Quality</option>
+                            <option value="fast">Fast Processing</option>
+                            <option value="detailed">Detailed Analysis</option>
+                        </select>
+                    </div>
+                </div>
+                
+                <button type="submit" id="singleBtn">🚀 Convert Single Video</button>
+            </form>
+        </div>
+        
+        <!-- Playlist Tab -->
+        <div id="playlist-tab" class="tab-content">
+            <div class="example-section">
+                <h4>📋 Example Playlist (Click to Use)</h4>
+                <div class="example-url" onclick="fillPlaylistUrl('https://www.youtube.com/playlist?list=PLHmPsm34AX4bg-pFUgI1eA5bNvunl_Vmb')">
+                    https://www.youtube.com/playlist?list=PLHmPsm34AX4bg-pFUgI1eA5bNvunl_Vmb
+                </div>
+                <p class="help-text">This is your specified playlist - click above to auto-fill it!</p>
+            </div>
+            
+            <form id="playlistForm">
+                <div class="form-group">
+                    <label for="playlistUrl">📋 YouTube Playlist URL</label>
+                    <input type="text" id="playlistUrl" placeholder="https://www.youtube.com/playlist?list=..." required>
+                    <div class="help-text">
+                        Paste any YouTube playlist URL here. Works with:
+                        <br>• Public playlists • Educational content • Tutorial series • Conference talks
+                    </div>
+                </div>
+                
+                <div class="form-group">
+                    <label>⚙️ Content Type Presets</label>
+                    <div class="preset-buttons">
+                        <div class="preset-btn active" onclick="setPlaylistPreset('educational')">
+                            <strong>📚 Educational</strong><br>
+                            <small>Lectures, Courses</small>
+                        </div>
+                        <div class="preset-btn" onclick="setPlaylistPreset('tutorial')">
+                            <strong>🛠️ Tutorial</strong><br>
+                            <small>How-to, Coding</small>
+                        </div>
+                        <div class="preset-btn" onclick="setPlaylistPreset('presentation')">
+                            <strong>🎤 Presentation</strong><br>
+                            <small>Talks, Slides</small>
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="settings">
+                    <div class="form-group">
+                        <label for="playlistThreshold">Similarity Threshold</label>
+                        <input type="number" id="playlistThreshold" min="0.80" max="0.99" step="0.01" value="0.90">
+                        <div class="help-text">Lower = more slides per video</div>
+                    </div>
+                    
+                    <div class="form-group">
+                        <label for="playlistInterval">Frame Interval</label>
+                        <input type="number" id="playlistInterval" min="15" max="120" value="45">
+                        <div class="help-text">Higher = fewer slides per video</div>
+                    </div>
+                    
+                    <div class="form-group">
+                        <label for="maxVideos">Max Videos (Optional)</label>
+                        <input type="number" id="maxVideos" min="1" max="999" placeholder="Leave empty for ALL videos">
+                        <div class="help-text">
+                            <strong>Leave empty to process ALL videos in playlist!</strong><br>
+                            Or set a limit if you want to test with fewer videos first.
+                        </div>
+                    </div>
+                </div>
+                
+                <button type="submit" id="playlistBtn">🎬 Convert Entire Playlist</button>
+            </form>
+            
+            <div id="playlistInfo" style="display: none;"></div>
+        </div>
+        
+        <div id="status" class="status">
+            <h4 id="statusTitle">Processing...</h4>
+            <p id="statusText">Starting conversion...</p>
+            <div class="progress">
+                <div class="progress-bar" id="progressBar"></div>
+            </div>
+            <div id="videoProgress" class="video-list" style="display: none;"></div>
+            <div id="downloadSection"></div>
+            <button type="button" id="cancelBtn" class="cancel" style="display: none;" onclick="cancelTask()">🛑 Cancel Conversion</button>
+        </div>
+    </div>
+
+    <script>
+        let currentTaskId = null;
+        let currentRequesterToken = null;
+        let statusInterval = null;
+        let eventSource = null;
+        let currentTask = {};
+        let activeTab = 'single';
+        let playlistInfoShown = false;
+        
+        function switchTab(tab) {
+            activeTab = tab;
+            
+            // Update tab buttons
+            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+            document.querySelector(`[onclick="switchTab('${tab}')"]`).classList.add('active');
+            
+            // Update tab content
+            document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
+            document.getElementById(`${tab}-tab`).classList.add('active');
+            
+            // Hide status if switching tabs
+            document.getElementById('status').style.display = 'none';
+        }
+        
+        function fillPlaylistUrl(url) {
+            document.getElementById('playlistUrl').value = url;
+            // Auto-focus the field to show it's filled
+            document.getElementById('playlistUrl').focus();
+            document.getElementById('playlistUrl').style.background = '#e3f2fd';
+            setTimeout(() => {
+                document.getElementById('playlistUrl').style.background = '';
+            }, 2000);
+        }
+        
+        function setSinglePreset(type) {
+            // Update button states
+            document.querySelectorAll('#single-tab .preset-btn').forEach(btn => btn.classList.remove('active'));
+            event.target.closest('.preset-btn').classList.add('active');
+            
+            const threshold = document.getElementById('singleThreshold');
+            const interval = document.getElementById('singleInterval');
+            
+            switch(type) {
+                case 'detailed':
+                    threshold.value = 0.85;
+                    interval.value = 20;
+                    break;
+                case 'fast':
+                    threshold.value = 0.95;
+                    interval.value = 60;
+                    break;
+                default: // balanced
+                    threshold.value = 0.90;
+                    interval.value = 30;
+            }
+        }
+        
+        function setPlaylistPreset(type) {
+            // Update button states
+            document.querySelectorAll('#playlist-tab .preset-btn').forEach(btn => btn.classList.remove('active'));
+            event.target.closest('.preset-btn').classList.add('active');
+            
+            const threshold = document.getElementById('playlistThreshold');
+            const interval = document.getElementById('playlistInterval');
+            
+            switch(type) {
+                case 'tutorial':
+                    threshold.value = 0.88;
+                    interval.value = 20;
+                    break;
+                case 'presentation':
+                    threshold.value = 0.95;
+                    interval.value = 60;
+                    break;
+                default: // educational
+                    threshold.value = 0.92;
+                    interval.value = 45;
+            }
+        }
+        
+        document.getElementById('singleForm').onsubmit = async function(e) {
+            e.preventDefault();
+            
+            const videoUrl = document.getElementById('singleVideoUrl').value.trim();
+            const threshold = parseFloat(document.getElementById('singleThreshold').value);
+            const interval = parseInt(document.getElementById('singleInterval').value);
+            const mode = document.getElementById('singleMode').value;
+            
+            if (!videoUrl) {
+                alert('Please enter a YouTube video URL');
+                return;
+            }
+            
+            await startConversion({
+                type: 'single',
+                video_url: videoUrl,
+                threshold: threshold,
+                interval: interval,
+                mode: mode
+            }, 'singleBtn');
+        };
+        
+        document.getElementById('playlistForm').onsubmit = async function(e) {
+            e.preventDefault();
+            
+            const playlistUrl = document.getElementById('playlistUrl').value.trim();
+            const threshold = parseFloat(document.getElementById('playlistThreshold').value);
+            const interval = parseInt(document.getElementById('playlistInterval').value);
+            const maxVideosInput = document.getElementById('maxVideos').value.trim();
+            const maxVideos = maxVideosInput ? parseInt(maxVideosInput) : null;
+            
+            if (!playlistUrl) {
+                alert('Please enter a YouTube playlist URL');
+                return;
+            }
+            
+            if (!playlistUrl.includes('playlist') && !playlistUrl.includes('list=')) {
+                alert('Please enter a valid YouTube playlist URL\\n\\nExample: https://www.youtube.com/playlist?list=...');
+                return;
+            }
+            
+            // Confirm if processing all videos
+            if (!maxVideos) {
+                const confirm = window.confirm(
+                    'You are about to process ALL videos in this playlist.\\n\\n' +
+                    'This could take several hours depending on playlist size.\\n\\n' +
+                    'Continue with unlimited processing?'
+                );
+                if (!confirm) return;
+            }
+            
+            await startConversion({
+                type: 'playlist',
+                playlist_url: playlistUrl,
+                threshold: threshold,
+                interval: interval,
+                max_videos: maxVideos
+            }, 'playlistBtn');
+        };
+        
+        async function startConversion(data, buttonId) {
+            try {
+                // Disable form
+                const btn = document.getElementById(buttonId);
+                btn.disabled = true;
+                btn.textContent = 'Starting...';
+                
+                // Show status
+                const statusDiv = document.getElementById('status');
+                statusDiv.style.display = 'block';
+                statusDiv.className = 'status processing';
+                document.getElementById('statusTitle').textContent = 'Starting Conversion';
+                document.getElementById('statusText').textContent = 'Initializing...';
+                
+                // Start conversion
+                const response = await fetch('/convert', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(data)
+                });
+                
+                if (!response.ok) {
+                    const error = await response.json();
+                    throw new Error(error.error || 'Conversion failed');
+                }
+                
+                const result = await response.json();
+                currentTaskId = result.task_id;
+                currentRequesterToken = result.requester_token;
+                playlistInfoShown = false;
+                
+                // Show playlist info if available
+                if (result.playlist_info) {
+                    showPlaylistInfo(result.playlist_info);
+                }
+                
+                // Start receiving progress updates
+                watchTask();
+                
+            } catch (error) {
+                showError('Failed to start conversion: ' + error.message);
+                resetForm(buttonId);
+            }
+        }
+        
+        function showPlaylistInfo(info) {
+            playlistInfoShown = true;
+            const infoDiv = document.getElementById('playlistInfo');
+            infoDiv.style.display = 'block';
+            infoDiv.innerHTML = `
+                <div class="playlist-stats">
+                    <h4>📋 ${info.title}</h4>
+                    <p><strong>👤 Channel:</strong> ${info.uploader}</p>
+                    <p><strong>📹 Total Videos:</strong> ${info.video_count || 'counting...'}</p>
+                    <p><strong>🚀 Processing:</strong> ${info.video_count || 'all'} videos (unlimited mode)</p>
+                    ${info.video_count ? `<p><strong>⏱️ Estimated Time:</strong> ${Math.round(info.video_count * 4)} - ${Math.round(info.video_count * 8)} minutes</p>` : ''}
+                </div>
+            `;
+        }
+        
+        function watchTask() {
+            stopWatching();
+            currentTask = {};
+            
+            // Server-Sent Events push only the fields that changed; fall back
+            // to polling if the browser or a proxy does not support them
+            if (!window.EventSource) {
+                startPolling();
+                return;
+            }
+            
+            const taskId = currentTaskId;
+            let received = false;
+            eventSource = new EventSource(`/events/${taskId}`);
+            
+            eventSource.onopen = function() {
+                received = false;
+            };
+            
+            eventSource.onmessage = function(e) {
+                received = true;
+                applyTaskChanges(JSON.parse(e.data));
+            };
+            
+            eventSource.onerror = function() {
+                // The browser reconnects on its own once a stream has worked;
+                // switch to polling if this connection delivered nothing or the
+                // browser gave up reconnecting (e.g. a 503 when streams are full)
+                if ((!received || this.readyState === EventSource.CLOSED) && taskId === currentTaskId) {
+                    stopWatching();
+                    startPolling();
+                }
+            };
+        }
+        
+        function applyTaskChanges(changes) {
+            if (changes.video_progress_updates) {
+                const list = currentTask.video_progress || [];
+                for (const [index, video] of Object.entries(changes.video_progress_updates)) {
+                    list[parseInt(index)] = video;
+                }
+                delete changes.video_progress_updates;
+                currentTask.video_progress = list;
+            }
+            Object.assign(currentTask, changes);
+            // Deltas leave out a playlist's output_files; rebuild them from its videos
+            if (currentTask.video_progress && currentTask.video_progress.length) {
+                currentTask.output_files = currentTask.video_progress
+                    .filter(video => video && video.output_file)
+                    .map(video => video.output_file);
+            }
+            handleTaskUpdate(currentTask);
+        }
+        
+        function startPolling() {
+            checkStatus();
+            statusInterval = setInterval(checkStatus, 3000);
+        }
+        
+        function stopWatching() {
+            if (eventSource) {
+                eventSource.close();
+                eventSource = null;
+            }
+            if (statusInterval) {
+                clearInterval(statusInterval);
+                statusInterval = null;
+            }
+        }
+        
+        async function checkStatus() {
+            if (!currentTaskId) return;
+            
+            try {
+                // After the first poll only ask for what changed
+                const since = currentTask.version ? `?since=${currentTask.version}` : '';
+                const response = await fetch(`/status/${currentTaskId}${since}`);
+                if (!response.ok) throw new Error('Status check failed');
+                
+                applyTaskChanges(await response.json());
+                
+            } catch (error) {
+                console.error('Status check error:', error);
+            }
+        }
+        
+        function handleTaskUpdate(task) {
+            updateStatusDisplay(task);
+            
+            if (task.status === 'completed') {
+                stopWatching();
+                showSuccess(task);
+                resetForm();
+            } else if (task.status === 'failed') {
+                stopWatching();
+                showError(task.error || 'Conversion failed');
+                resetForm();
+            } else if (task.status === 'expired') {
+                stopWatching();
+                resetForm();
+            } else if (task.status === 'cancelled') {
+                stopWatching();
+                showPartialDownload(task);
+                resetForm();
+            }
+        }
+        
+        async function cancelTask() {
+            if (!currentTaskId) return;
+            
+            const btn = document.getElementById('cancelBtn');
+            btn.disabled = true;
+            try {
+                const response = await fetch(`/tasks/${currentTaskId}`, {
+                    method: 'DELETE',
+                    headers: { 'X-Requester-Token': currentRequesterToken || '' }
+                });
+                const result = await response.json();
+                if (!response.ok) throw new Error(result.error || 'Cancel failed');
+                
+                if (result.status === 'cancelled') {
+                    applyTaskChanges({ status: 'cancelled' });
+                } else {
+                    // Identical requests from others share this task; it keeps running for them
+                    stopWatching();
+                    btn.style.display = 'none';
+                    document.getElementById('statusText').textContent = 'Stopped following this conversion (others are still waiting for it).';
+                    resetForm();
+                }
+            } catch (error) {
+                console.error('Cancel error:', error);
+            } finally {
+                btn.disabled = false;
+            }
+        }
+        
+        function describeStage(stage) {
+            if (!stage) {
+                return 'Starting...';
+            }
+            switch(stage.stage) {
+                case 'download':
+                    const mb = bytes => (bytes / 1048576).toFixed(1);
+                    return `Downloading video... ${mb(stage.downloaded_bytes)}/${mb(stage.total_bytes)} MB`;
+                case 'extract':
+                    return `Scanning frames... ${stage.frames_scanned}/${stage.total_frames} (${stage.slides_found} slides found)`;
+                case 'assemble':
+                    return `Writing slides... ${stage.slides_written}/${stage.total_slides}`;
+            }
+            return 'Processing...';
+        }
+        
+        function formatDuration(seconds) {
+            return seconds < 60 ? `${seconds}s` : `${Math.round(seconds / 60)} min`;
+        }
+        
+        function updateStatusDisplay(task) {
+            const statusDiv = document.getElementById('status');
+            const titleEl = document.getElementById('statusTitle');
+            const textEl = document.getElementById('statusText');
+            const progressBar = document.getElementById('progressBar');
+            
+            statusDiv.className = `status ${task.status}`;
+            document.getElementById('cancelBtn').style.display =
+                task.status === 'pending' || task.status === 'processing' ? 'inline-block' : 'none';
+            
+            switch(task.status) {
+                case 'pending':
+                    titleEl.textContent = '⏳ Queued';
+                    textEl.textContent = task.queue_position
+                        ? `Waiting to start... (position ${task.queue_position} in queue)`
+                        : 'Waiting to start...';
+                    break;
+                case 'processing':
+                    if (task.type === 'playlist') {
+                        titleEl.textContent = '🎬 Converting Playlist (Unlimited Mode)';
+                        if (task.playlist_info && !playlistInfoShown) {
+                            showPlaylistInfo(task.playlist_info);
+                        }
+                        const current = task.current_video || 0;
+                        const total = task.total_videos || '?';
+                        textEl.textContent = `Processing video ${current}/${total} - ${Math.round((current/total)*100) || 0}% complete`;
+                        
+                        // Show video progress if available
+                        if (task.video_progress) {
+                            showVideoProgress(task.video_progress, task.id);
+                        }
+                        showPartialDownload(task);
+                    } else {
+                        titleEl.textContent = '🎥 Converting Single Video';
+                        textEl.textContent = describeStage(task.stage_progress);
+                        if (task.eta_seconds) {
+                            textEl.textContent += ` - about ${formatDuration(task.eta_seconds)} left`;
+                        }
+                    }
+                    if (task.stalled) {
+                        textEl.textContent += ' (no progress for a while...)';
+                    }
+                    break;
+                case 'completed':
+                    titleEl.textContent = '✅ Conversion Complete!';
+                    if (task.type === 'playlist') {
+                        const count = task.output_files?.length || 0;
+                        textEl.textContent = `Successfully processed ${count} videos from playlist!`;
+                    } else {
+                        textEl.textContent = 'Your PowerPoint presentation is ready for download.';
+                    }
+                    break;
+                case 'failed':
+                    titleEl.textContent = '❌ Conversion Failed';
+                    textEl.textContent = task.error || 'An error occurred during processing';
+                    break;
+                case 'expired':
+                    titleEl.textContent = '⌛ Files Expired';
+                    textEl.textContent = 'This conversion finished, but its files have since been removed. Please convert again.';
+                    break;
+                case 'cancelled':
+                    titleEl.textContent = '🛑 Conversion Cancelled';
+                    const finished = task.output_files?.length || 0;
+                    textEl.textContent = finished
+                        ? `Stopped after ${finished} video${finished === 1 ? '' : 's'}; finished presentations can still be downloaded.`
+                        : 'The conversion was stopped.';
+                    if (task.video_progress) {
+                        showVideoProgress(task.video_progress, task.id);
+                    }
+                    break;
+            }
+            
+            const progress = task.progress || 0;
+            progressBar.style.width = progress + '%';
+        }
+        
+        function showVideoProgress(videoProgress, taskId) {
+            const progressDiv = document.getElementById('videoProgress');
+            progressDiv.style.display = 'block';
+            progressDiv.innerHTML = '<h5>📹 Video Processing Status:</h5>';
+            
+            videoProgress.forEach((video, index) => {
+                const videoItem = document.createElement('div');
+                videoItem.className = 'video-item';
+                const status = video.output_file
+                    ? `<a href="/download/${taskId}/${video.output_file}">${video.status.toUpperCase()} 📥</a>`
+                    : video.status.toUpperCase();
+                videoItem.innerHTML = `
+                    <div class="video-title">${index + 1}. ${video.title}</div>
+                    <div class="video-status ${video.status}">${status}</div>
+                `;
+                progressDiv.appendChild(videoItem);
+            });
+        }
+        
+        function showPartialDownload(task) {
+            const downloadSection = document.getElementById('downloadSection');
+            const count = task.output_files ? task.output_files.length : 0;
+            if (count === 0) {
+                downloadSection.innerHTML = '';
+                return;
+            }
+            downloadSection.innerHTML = `
+                <a href="/download/${task.id}/all" class="download zip">📦 Download ${count} finished presentation${count === 1 ? '' : 's'} so far (ZIP)</a>
+            `;
+        }
+        
+        function showSuccess(task) {
+            const downloadSection = document.getElementById('downloadSection');
+            
+            if (task.type === 'playlist' && task.output_files && task.output_files.length > 0) {
+                let downloadHtml = `
+                    <h4>🎉 Playlist Conversion Complete!</h4>
+                    <p><strong>✅ Successfully processed:</strong> ${task.output_files.length} videos</p>
+                    <br>
+                    <a href="/download/${task.id}/all" class="download zip">📦 Download All Presentations (ZIP)</a>
+                    <br><br>
+                    <h5>📄 Individual Files:</h5>
+                `;
+                
+                // Show first 15 individual files
+                const individualFiles = task.output_files.slice(0, 15);
+                individualFiles.forEach((file, index) => {
+                    downloadHtml += `
+                        <a href="/download/${task.id}/${file}" class="download">📄 ${index + 1}. ${file.replace('.pptx', '')}</a>
+                    `;
+                });
+                
+                if (task.output_files.length > 15) {
+                    downloadHtml += `
+                        <p class="help-text">
+                            <strong>📦 Download the ZIP file above to get all ${task.output_files.length} presentations!</strong>
+                        </p>
+                    `;
+                }
+                
+                downloadSection.innerHTML = downloadHtml;
+            } else {
+                downloadSection.innerHTML = `
+                    <h4>🎉 Video Conversion Complete!</h4>
+                    <a href="/download/${task.id}" class="download">📥 Download PowerPoint Presentation</a>
+                    <div class="help-text" style="margin-top: 15px;">
+                        <strong>Task ID:</strong> ${task.id}<br>
+                        Right-click download link and "Save As" if needed
+                    </div>
+                `;
+            }
+        }
+        
+        function showError(message) {
+            const statusDiv = document.getElementById('status');
+            statusDiv.style.display = 'block';
+            statusDiv.className = 'status failed';
+            document.getElementById('statusTitle').textContent = '❌ Error';
+            document.getElementById('statusText').textContent = message;
+        }
+        
+        function resetForm(buttonId = null) {
+            if (buttonId) {
+                const btn = document.getElementById(buttonId);
+                btn.disabled = false;
+                if (buttonId === 'singleBtn') {
+                    btn.textContent = '🚀 Convert Single Video';
+                } else {
+                    btn.textContent = '🎬 Convert Entire Playlist';
+                }
+            } else {
+                // Reset all buttons
+                document.getElementById('singleBtn').disabled = false;
+                document.getElementById('singleBtn').textContent = '🚀 Convert Single Video';
+                document.getElementById('playlistBtn').disabled = false;
+                document.getElementById('playlistBtn').textContent = '🎬 Convert Entire Playlist';
+            }
+        }
+        
+        // Auto-fill the example playlist on page load
+        window.onload = function() {
+            document.getElementById('playlistUrl').value = 'https://www.youtube.com/playlist?list=PLHmPsm34AX4bg-pFUgI1eA5bNvunl_Vmb';
+        };
+    </script>
+</body>
+</html>
+'''
+
+# Task state lives in SQLite so job workers (and restarts) share it
+task_manager = TaskStore(
+    os.environ.get('TASK_DB_PATH', os.path.join('outputs', 'tasks.db')),
+    ttl=int(os.environ.get('TASK_TTL_SECONDS', 86400))
+)
+
+# Request rate buckets share the task database, so limits hold across web processes
+rate_limiter = RateLimiter(task_manager.db_path, rate_per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST)
+
+# Playlists are listed in job processes; /convert in any web process reuses the listing
+playlist_cache = SharedPlaylistCache(task_manager.db_path)
+
+# Histograms and counters for /metrics, added to by web and job processes alike
+metrics = MetricsStore(task_manager.db_path)
+
+# Generated decks are kept within a disk quota and removed once unused for a while
+output_retention = OutputRetention(
+    task_manager.db_path,
+    'outputs',
+    task_manager,
+    quota_mb=int(os.environ.get('OUTPUT_QUOTA_MB', 10240)),
+    max_age=int(os.environ.get('OUTPUT_MAX_AGE_SECONDS', 7 * 86400)),
+    interval=int(os.environ.get('OUTPUT_RETENTION_INTERVAL', 300))
+)
+
+def on_job_error(task_id, kind, args, error):
+    if kind in ('playlist_video', 'batch_video'):
+        # Only this video is lost; the rest of the playlist or batch carries on
+        _, index, title = args[:3]
+        task = record_playlist_video(task_id, index, title, 'failed', error=f"Worker process died: {error}")
+        if task and task['status'] == 'completed':
+            finish_playlist(task_id)
+        return
+    task_manager.update_task(task_id, status='failed', error=f"Worker process died: {error}")
+
+def client_id():
+    """Identify the client making the current request (for fair scheduling and limits)
+    
+    Requests with a known API key are identified by (a hash of) the key,
+    all others by their IP address as seen through TRUSTED_PROXY_HOPS proxies.
+    """
+    api_key = request.headers.get('X-API-Key')
+    if api_key and api_key in API_KEYS:
+        return 'key:' + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return request.remote_addr or ''
+
+def too_many_requests(message, retry_after):
+    """429 response telling the client when to try again"""
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def check_client_limits(client):
+    """Return a 429 response if the client is over its limits, else None"""
+    retry_after = rate_limiter.acquire(client)
+    if retry_after:
+        return too_many_requests(
+            f'Too many conversion requests, please try again in {retry_after} seconds', retry_after
+        )
+    
+    if MAX_ACTIVE_JOBS_PER_CLIENT and task_manager.count_active(client) >= MAX_ACTIVE_JOBS_PER_CLIENT:
+        return too_many_requests(
+            f'You already have {MAX_ACTIVE_JOBS_PER_CLIENT} conversions in progress; '
+            f'please wait for one to finish', ACTIVE_JOBS_RETRY_AFTER
+        )
+    return None
+
+def submit_job(task_id, kind, *args, resources=None):
+    """Queue a background job for a task that was just created
+    
+    The job is scheduled in the fair-share group of the task's client.
+    Raises QueueFullError or JobTooLargeError (after discarding the task) if
+    the queue is full or the job's resource estimate can never fit.
+    """
+    task = task_manager.get_task(task_id) or {}
+    try:
+        job_executor.submit(task_id, kind, *args, group=task.get('client', ''), resources=resources)
+    except (QueueFullError, JobTooLargeError):
+        task_manager.delete_task(task_id)
+        raise
+
+def estimate_video_resources(video_url):
+    """Memory and disk estimate for converting one video (defaults if it cannot be probed)"""
+    try:
+        details = VideoToPPTConverter().probe_video(video_url)
+    except Exception as e:
+        print(f"Could not probe {video_url} for a resource estimate: {e}")
+        details = {}
+    return estimate_job_resources(scratch_limit=job_limit_bytes(), **details)
+
+# Probes for resource estimates run off the request threads, a few at a time per process
+PROBE_WORKERS = 4
+_probe_pool = None
+_probe_pool_pid = None
+_probe_pool_lock = threading.Lock()
+
+def refine_resources_later(task_id, video_url):
+    """Probe a queued single video in the background and replace its default estimate
+    
+    A video that turns out never to fit on this server fails its task if
+    its job has not started yet (only judged where this host runs jobs,
+    see JobExecutor's reject_oversized).
+    """
+    global _probe_pool, _probe_pool_pid
+    
+    def refine():
+        resources = estimate_video_resources(video_url)
+        reason = admission.never_fits(resources) if job_executor.reject_oversized else None
+        if reason and job_executor.cancel(task_id):
+            task_manager.update_task(task_id, status='failed', error=f"Video is too large for this server ({reason})")
+            print(f"Task {task_id}: Rejected after probing ({reason})")
+        elif not reason:
+            job_executor.set_resources(task_id, resources)
+    
+    def run():
+        try:
+            refine()
+        except Exception as e:
+            print(f"Could not refine the resource estimate of task {task_id}: {e}")
+    
+    with _probe_pool_lock:
+        # Threads do not survive a fork, so each process starts its own pool
+        if _probe_pool_pid != os.getpid():
+            _probe_pool = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix='probe')
+            _probe_pool_pid = os.getpid()
+        _probe_pool.submit(run)
+
+# Overall progress range (in percent) covered by each converter stage
+PROGRESS_STAGES = {
+    'download': (5, 30),
+    'extract': (30, 90),
+    'assemble': (90, 99),
+}
+
+def stage_fraction(event):
+    """Fraction (0-1) of its stage that a converter progress event has covered"""
+    done, total = {
+        'download': ('downloaded_bytes', 'total_bytes'),
+        'extract': ('frames_scanned', 'total_frames'),
+        'assemble': ('slides_written', 'total_slides'),
+    }[event['stage']]
+    if not event.get(total):
+        return 0
+    return min(1, event.get(done, 0) / event[total])
+
+def make_progress_reporter(task_id):
+    """Return a converter progress callback that records progress in the task
+    
+    Besides the overall percentage this stores the raw stage counters, the
+    time of the last update (to spot stalled jobs) and a rough ETA.
+    """
+    started_at = time.time()
+    
+    def on_progress(event):
+        start, end = PROGRESS_STAGES[event['stage']]
+        progress = start + (end - start) * stage_fraction(event)
+        now = time.time()
+        
+        # Extrapolate from the progress made since the job started
+        eta_seconds = None
+        if progress > PROGRESS_STAGES['download'][0]:
+            elapsed = now - started_at
+            eta_seconds = round(elapsed * (100 - progress) / progress)
+        
+        task_manager.update_task(
+            task_id,
+            progress=round(progress, 1),
+            stage=event['stage'],
+            stage_progress=event,
+            last_progress_at=now,
+            eta_seconds=eta_seconds
+        )
+    
+    return on_progress
+
+def record_conversion(converter):
+    """Add the measurements of a conversion (finished or not) to the metrics"""
+    try:
+        metrics.observe_many(converter.stats)
+    except Exception as e:
+        print(f"Could not record conversion metrics: {e}")
+
+def record_cache_lookup(cache, hit):
+    """Count a hit or miss of one of the caches in the metrics
+    
+    While serving a request the counts are kept in memory and written once
+    when the request ends (see flush_cache_lookups).
+    """
+    key = (cache, 'hit' if hit else 'miss')
+    if has_request_context():
+        lookups = g.setdefault('cache_lookups', {})
+        lookups[key] = lookups.get(key, 0) + 1
+        return
+    try:
+        metrics.inc('cache_lookups_total', {'cache': key[0], 'result': key[1]})
+    except Exception as e:
+        print(f"Could not record cache metrics: {e}")
+
+@app.teardown_request
+def flush_cache_lookups(error=None):
+    """Write the cache lookups counted during a request in one transaction"""
+    lookups = g.pop('cache_lookups', None)
+    if not lookups:
+        return
+    try:
+        metrics.inc_many(
+            ('cache_lookups_total', {'cache': cache, 'result': result}, count)
+            for (cache, result), count in lookups.items()
+        )
+    except Exception as e:
+        print(f"Could not record cache metrics: {e}")
+
+def report_playlist_heartbeat(task_id, index, event):
+    """Record that a playlist video is still making progress (runs in extraction processes)"""
+    task_manager.update_task(task_id, last_progress_at=time.time())
+
+def cancel_requested(task_id):
+    """Cancel check for converters: True once the task was cancelled (or deleted)"""
+    return task_manager.get_status(task_id) in (None, 'cancelled')
+
+def new_requester_token():
+    """Token returned to each request that starts or joins a task; it lets that request cancel"""
+    return secrets.token_urlsafe(16)
+
+def requester_key(token):
+    """What the task store keeps of a requester token"""
+    return hashlib.sha256((token or '').encode()).hexdigest()
+
+def cancel_task(task_id, requester_token):
+    """Cancel a task on behalf of one of its requesters
+    
+    A task shared by coalesced requests keeps running for the others: each
+    requester (identified by the requester_token it was given) can detach
+    once, and the task is only cancelled when no requester is left. Then
+    the task is marked cancelled, its queued jobs are dropped and running
+    jobs stop at their next cancellation check, removing their scratch files
+    as they unwind. Finished playlist videos stay downloadable.
+    
+    Returns:
+        Tuple of (updated task or None if it does not exist, False if the
+        token does not belong to a requester still attached to the task)
+    """
+    def apply(task, remaining):
+        if task['status'] in FINISHED_STATUSES:
+            return {}
+        if remaining:
+            return {'attached_requests': remaining}
+        
+        fields = {'status': 'cancelled', 'cancelled_at': time.time()}
+        if task.get('video_progress'):
+            fields['video_progress'] = [
+                {**video, 'status': 'cancelled'} if video['status'] in ('pending', 'processing') else video
+                for video in task['video_progress']
+            ]
+        return fields
+    
+    task, detached = task_manager.detach_requester(task_id, requester_key(requester_token), apply)
+    if task and detached and task['status'] == 'cancelled':
+        removed = job_executor.cancel(task_id)
+        if load_job_manifest(task_id):
+            # A cancelled playlist is not resumed after a restart, only via
+            # /resume by the request that cancelled it
+            save_job_manifest(task_id, status='cancelled', cancelled_by=requester_key(requester_token))
+        print(f"Task {task_id}: Cancelled ({removed} queued job(s) dropped)")
+    return task, detached
+
+def effective_settings(threshold, interval, mode):
+    """Return the (threshold, interval) actually used for a single video in the given mode"""
+    if mode == 'fast':
+        threshold = min(threshold + 0.03, 0.98)
+        interval = max(interval + 15, 45)
+    elif mode == 'detailed':
+        threshold = max(threshold - 0.03, 0.82)
+        interval = max(interval - 10, 15)
+    return threshold, interval
+
+def process_single_video_background(task_id, video_url, threshold, interval, mode='standard'):
+    """Background single video processing with enhanced options"""
+    try:
+        print(f"Starting single video task {task_id}: {video_url} (mode: {mode})")
+        task_manager.update_task(task_id, status='processing', progress=5, last_progress_at=time.time())
+        
+        threshold, interval = effective_settings(threshold, interval, mode)
+        
+        converter = VideoToPPTConverter(
+            similarity_threshold=threshold,
+            min_frame_interval=interval,
+            progress_callback=make_progress_reporter(task_id),
+            cancel_check=partial(cancel_requested, task_id),
+            profile_name=task_id
+        )
+        
+        output_filename = f"presentation_{task_id}.pptx"
+        output_path = os.path.join('outputs', output_filename)
+        
+        try:
+            result = converter.process_video(
+                video_url,
+                output_ppt=output_path,
+                cleanup_temp=True
+            )
+        finally:
+            record_conversion(converter)
+            task_manager.set_timeline(task_id, 0, converter.timeline)
+        
+        if result and os.path.exists(output_path):
+            task_manager.update_task(
+                task_id,
+                status='completed',
+                progress=100,
+                output_files=[output_filename]
+            )
+            print(f"Single video task {task_id}: Completed successfully")
+        else:
+            raise Exception("Failed to create PowerPoint file")
+        
+    except JobCancelled:
+        print(f"Single video task {task_id}: Cancelled")
+        
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Single video task {task_id}: Failed with error: {error_msg}")
+        task_manager.update_task(task_id, status='failed', error=error_msg)
+
+def job_manifest_path(task_id):
+    """Path of the on-disk manifest describing a playlist job"""
+    return os.path.join('outputs', f"playlist_{task_id}", 'job.json')
+
+def load_job_manifest(task_id):
+    manifest_path = job_manifest_path(task_id)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Unreadable job manifest {manifest_path}: {e}")
+        return None
+
+def save_job_manifest(task_id, **fields):
+    """Create or update a playlist job manifest (written atomically)"""
+    manifest = load_job_manifest(task_id) or {'task_id': task_id, 'created_at': time.time()}
+    manifest.update(fields, updated_at=time.time())
+    
+    manifest_path = job_manifest_path(task_id)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, manifest_path)
+
+def playlist_dedup_key(playlist_url, threshold, interval, max_videos):
+    """Key shared by requests for the same playlist with the same settings"""
+    playlist_id = VideoToPPTConverter().extract_playlist_id(playlist_url)
+    return f"playlist:{playlist_id}:{threshold}:{interval}:{max_videos}"
+
+def start_playlist_resume(task_id, manifest, requester=None, client=None):
+    """Recreate a playlist task from its manifest and queue it to continue
+    
+    The task keeps the client it was created for unless ``client`` (who
+    asked to resume it) is given. If an identical playlist is already
+    running, that task is joined instead and this one is not queued.
+    
+    Returns:
+        The ID of the task that continues the work
+    
+    Raises QueueFullError if the job queue is full.
+    """
+    client = client if client is not None else manifest.get('client', '')
+    joined_id, created = task_manager.create_or_join_task(
+        task_id,
+        'playlist',
+        playlist_dedup_key(manifest['playlist_url'], manifest['threshold'], manifest['interval'],
+                           manifest.get('max_videos')),
+        requester=requester,
+        playlist_url=manifest['playlist_url'],
+        threshold=manifest['threshold'],
+        interval=manifest['interval'],
+        max_videos=manifest.get('max_videos'),
+        client=client,
+        resumed=True
+    )
+    if not created:
+        print(f"Playlist {task_id}: Joined identical running task {joined_id} instead of resuming")
+        save_job_manifest(task_id, status='joined', joined_task=joined_id)
+        return joined_id
+    
+    submit_job(
+        task_id,
+        'playlist',
+        task_id, manifest['playlist_url'], manifest['threshold'], manifest['interval'], manifest.get('max_videos')
+    )
+    return task_id
+
+def resume_interrupted_jobs():
+    """Restart jobs that were still running when the server stopped
+    
+    Jobs owned by processes of this host that are gone, or whose lease ran
+    out, go back to the queue (or fail once out of attempts); jobs of
+    worker processes that are still alive are left alone. Queued jobs
+    simply stay in the queue.
+    """
+    requeued, dropped = job_executor.reclaim()
+    if requeued or dropped:
+        print(f"Found {requeued + dropped} job(s) interrupted by a restart, {requeued} will be retried")
+    
+    resumed = []
+    for manifest_path in glob.glob(os.path.join('outputs', 'playlist_*', 'job.json')):
+        task_id = os.path.basename(os.path.dirname(manifest_path))[len('playlist_'):]
+        manifest = load_job_manifest(task_id)
+        if not manifest or manifest.get('status') not in ('pending', 'processing'):
+            continue
+        if job_executor.queue_position(task_id) is not None:
+            continue
+        
+        print(f"Resuming interrupted playlist task {task_id}")
+        try:
+            if start_playlist_resume(task_id, manifest) != task_id:
+                continue
+        except QueueFullError:
+            print("Job queue full; remaining interrupted jobs can be resumed via /resume")
+            break
+        resumed.append(task_id)
+    
+    for task_id in task_manager.task_ids_with_status('pending', 'processing'):
+        if task_id not in resumed and job_executor.queue_position(task_id) is None:
+            task_manager.update_task(task_id, status='failed', error='Interrupted by a server restart')
+    
+    return resumed
+
+def playlist_checkpoint_path(task_id):
+    return os.path.join('outputs', f"playlist_{task_id}", 'checkpoint.json')
+
+def record_playlist_video(task_id, index, title, status, output_path=None, error=None, timeline=None,
+                          pipeline=None):
+    """Set the state of one video of a playlist or batch and recompute the task's totals
+    
+    Runs atomically, so work units finishing in different processes never
+    lose each other's updates. The update that leaves no video unfinished
+    (once the whole playlist has been listed) completes the task. A
+    finished video's ``pipeline`` figures are added to the task's
+    pipeline_metrics; its ``timeline`` is stored apart from the task
+    (see /status?include=timeline).
+    
+    Returns:
+        The updated task, or None if it no longer exists
+    """
+    if timeline:
+        # Stored before the task can complete, so a finished task has all of its timelines
+        task_manager.set_timeline(task_id, index, timeline)
+    
+    def apply(task):
+        videos = list(task.get('video_progress') or [])
+        while len(videos) <= index:
+            videos.append({'title': '', 'status': 'pending'})
+        entry = {'title': title[:50] + '...' if len(title) > 50 else title, 'status': status}
+        if output_path:
+            # Finished decks can be downloaded while the rest are still converting
+            entry['output_file'] = os.path.basename(output_path)
+        if error:
+            entry['error'] = error
+        videos[index] = entry
+        fields = playlist_totals(task, videos)
+        if pipeline:
+            fields['pipeline_metrics'] = add_pipeline_metrics(task.get('pipeline_metrics'), pipeline)
+        return fields
+    
+    task = task_manager.mutate_task(task_id, apply)
+    if task and status in ('completed', 'failed'):
+        print(f"{task['type'].capitalize()} {task_id}: Video {index + 1} {status} "
+              f"({task['current_video']}/{task['total_videos']} done)")
+    return task
+
+def add_pipeline_metrics(totals, pipeline):
+    """Add one video's download and conversion figures to a task's pipeline_metrics
+    
+    worker_download_seconds is the part of the downloads that kept a worker
+    slot busy, i.e. of videos that were not prefetched while queued.
+    """
+    totals = dict(totals or {})
+    totals['videos'] = totals.get('videos', 0) + 1
+    totals['prefetched_videos'] = totals.get('prefetched_videos', 0) + int(pipeline['prefetched'])
+    for key in ('download_seconds', 'worker_download_seconds', 'convert_seconds', 'bytes_downloaded'):
+        totals[key] = round(totals.get(key, 0) + pipeline[key], 2)
+    return totals
+
+def playlist_totals(task, videos):
+    """Fields derived from the per-video states of a playlist task"""
+    completed = sum(1 for video in videos if video['status'] == 'completed')
+    failed = sum(1 for video in videos if video['status'] == 'failed')
+    finished = completed + failed
+    planned = task.get('planned_videos')
+    total_videos = planned if planned is not None else max(len(videos), task.get('total_videos') or 0)
+    
+    fields = {
+        'video_progress': videos,
+        'output_files': [video['output_file'] for video in videos if video.get('output_file')],
+        'current_video': finished,
+        'total_videos': total_videos,
+        'processed_count': completed,
+        'failed_count': failed,
+        'progress': min(90, 10 + (finished / total_videos) * 80) if total_videos else 10,
+        'last_progress_at': time.time(),
+    }
+    if planned is not None and finished >= planned and task['status'] == 'processing':
+        fields.update(status='completed', progress=100)
+    return fields
+
+def process_playlist_background(task_id, playlist_url, threshold, interval, max_videos=None):
+    """Enumerate a playlist and queue one work unit per video
+    
+    The units are scheduled like any other job, interleaved with other users'
+    work, and the last one to finish completes the task. Videos already in
+    the checkpoint are not converted again. Running this again for the same
+    task (after a restart) only queues the videos that are still missing.
+    """
+    try:
+        print(f"Starting playlist task {task_id}: {playlist_url} (max_videos: {max_videos or 'UNLIMITED'})")
+        # planned_videos is only known again once the playlist has been listed
+        task_manager.update_task(
+            task_id, status='processing', progress=5, last_progress_at=time.time(), planned_videos=None
+        )
+        
+        group = (task_manager.get_task(task_id) or {}).get('client', '')
+        
+        # Record the job on disk so it can be resumed after a restart
+        save_job_manifest(
+            task_id,
+            type='playlist',
+            status='processing',
+            playlist_url=playlist_url,
+            threshold=threshold,
+            interval=interval,
+            max_videos=max_videos,
+            client=group
+        )
+        
+        converter = VideoToPPTConverter(
+            similarity_threshold=threshold,
+            min_frame_interval=interval,
+            playlist_cache=playlist_cache
+        )
+        
+        playlist_output_dir = os.path.join('outputs', f"playlist_{task_id}")
+        checkpoint = converter.open_checkpoint(playlist_checkpoint_path(task_id))
+        if checkpoint.completed:
+            print(f"Playlist {task_id}: {len(checkpoint.completed)} videos already done (checkpoint)")
+        
+        def on_playlist_info(info):
+            """Publish playlist details as soon as the first page is listed"""
+            video_count = info.get('video_count') or 0
+            if max_videos and (not video_count or max_videos < video_count):
+                video_count = max_videos
+            playlist_info = {
+                'title': info.get('title'),
+                'uploader': info.get('uploader'),
+                'video_count': video_count
+            }
+            task_manager.update_task(task_id, playlist_info=playlist_info, total_videos=video_count)
+            record_cache_lookup('playlist', info.get('from_cache'))
+        
+        planned = 0
+        for job in converter.plan_playlist(playlist_url, playlist_output_dir, max_videos, checkpoint,
+                                           on_playlist_info):
+            if cancel_requested(task_id):
+                print(f"Playlist {task_id}: Cancelled while listing videos")
+                return
+            planned += 1
+            if job.get('resumed'):
+                record_playlist_video(task_id, job['index'], job['title'], 'completed', job['output_path'])
+                continue
+            
+            record_playlist_video(task_id, job['index'], job['title'], 'pending')
+            try:
+                job_executor.submit(
+                    task_id, 'playlist_video',
+                    task_id, job['index'], job['title'], job['input'], job['output_path'], threshold, interval,
+                    group=group,
+                    unit_key=str(job['index']),
+                    internal=True,
+                    resources=estimate_job_resources(duration=job['duration'], scratch_limit=job_limit_bytes())
+                )
+            except JobTooLargeError as e:
+                record_playlist_video(task_id, job['index'], job['title'], 'failed', error=str(e))
+        
+        # Now that the size is known, completion can be detected (and may already be due)
+        def set_planned(task):
+            task = {**task, 'planned_videos': planned}
+            return {**playlist_totals(task, task.get('video_progress') or []), 'planned_videos': planned}
+        
+        task = task_manager.mutate_task(task_id, set_planned)
+        if task and task['status'] == 'completed':
+            finish_playlist(task_id)
+        print(f"Playlist {task_id}: queued {planned} video(s) for conversion")
+        
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Playlist task {task_id}: Failed with error: {error_msg}")
+        task_manager.update_task(task_id, status='failed', error=error_msg)
+        if load_job_manifest(task_id):
+            save_job_manifest(task_id, status='failed', error=error_msg)
+
+def prefetch_playlist_video(task_id, index, title, video_url, output_path, threshold, interval):
+    """Download a queued playlist or batch video ahead of its work unit (runs in a dispatcher thread)"""
+    converter = VideoToPPTConverter(cancel_check=partial(cancel_requested, task_id), measure_memory=False)
+    return converter.download_ahead(video_url)
+
+def discard_prefetched_video(downloaded):
+    """Remove a download fetched ahead for a work unit that will not use it"""
+    if downloaded.get('download_dir'):
+        shutil.rmtree(downloaded['download_dir'], ignore_errors=True)
+
+def prefetch_batch_video(task_id, index, title, video_input, *args):
+    """Download a queued batch video ahead of its work unit, if its URL may still be fetched"""
+    refused = VideoToPPTConverter().is_remote_url(video_input) and batch_url_refused(video_input)
+    if refused:
+        raise Exception(refused)
+    return prefetch_playlist_video(task_id, index, title, video_input, *args)
+
+def process_batch_video_background(task_id, index, title, video_input, output_path, threshold, interval,
+                                   staged=None):
+    """Work unit: convert one video of a batch task, if its URL may still be fetched"""
+    refused = VideoToPPTConverter().is_remote_url(video_input) and batch_url_refused(video_input)
+    if refused:
+        if staged:
+            discard_prefetched_video(staged)
+        print(f"Batch {task_id}: Video {index + 1} refused: {refused}")
+        task = record_playlist_video(task_id, index, title, 'failed', error=refused)
+        if task and task['status'] == 'completed':
+            finish_playlist(task_id)
+        return
+    process_playlist_video_background(task_id, index, title, video_input, output_path, threshold, interval,
+                                      staged=staged)
+
+def process_playlist_video_background(task_id, index, title, video_url, output_path, threshold, interval,
+                                      staged=None):
+    """Work unit: convert one video of a playlist or batch task
+    
+    ``staged`` is the prefetch_playlist_video() result if the video was
+    downloaded while the unit was queued.
+    """
+    task = task_manager.get_task(task_id)
+    if not task or task['status'] in FINISHED_STATUSES:
+        if staged:
+            discard_prefetched_video(staged)
+        return
+    label = task['type'].capitalize()
+    
+    record_playlist_video(task_id, index, title, 'processing')
+    converter = VideoToPPTConverter(
+        similarity_threshold=threshold,
+        min_frame_interval=interval,
+        progress_callback=partial(report_playlist_heartbeat, task_id, index),
+        progress_interval=PLAYLIST_HEARTBEAT_SECONDS,
+        cancel_check=partial(cancel_requested, task_id),
+        profile_name=f"{task_id}_{index + 1:03d}"
+    )
+    
+    started_at = time.time()
+    
+    def pipeline():
+        """This video's figures for the task's pipeline_metrics"""
+        download_seconds = converter.stats.get('download_seconds', 0)
+        worker_download_seconds = 0 if staged else download_seconds
+        return {
+            'prefetched': bool(staged),
+            'download_seconds': download_seconds,
+            'worker_download_seconds': worker_download_seconds,
+            'convert_seconds': time.time() - started_at - worker_download_seconds,
+            'bytes_downloaded': converter.stats.get('download_bytes', 0),
+        }
+    
+    try:
+        try:
+            converter.process_video(video_url, output_ppt=output_path, cleanup_temp=True, downloaded=staged)
+        finally:
+            record_conversion(converter)
+        if task['type'] == 'playlist':
+            converter.open_checkpoint(playlist_checkpoint_path(task_id)).mark_completed(
+                video_url, index, title, output_path
+            )
+    except JobCancelled:
+        print(f"{label} {task_id}: Video {index + 1} cancelled")
+        record_playlist_video(task_id, index, title, 'cancelled', timeline=converter.timeline)
+        return
+    except Exception as e:
+        print(f"{label} {task_id}: Video {index + 1} failed: {e}")
+        task = record_playlist_video(task_id, index, title, 'failed', error=str(e), timeline=converter.timeline,
+                                     pipeline=pipeline())
+    else:
+        task = record_playlist_video(task_id, index, title, 'completed', output_path, timeline=converter.timeline,
+                                     pipeline=pipeline())
+    
+    if task and task['status'] == 'completed':
+        finish_playlist(task_id)
+
+def finish_playlist(task_id):
+    """Bookkeeping once the last video of a playlist or batch task is done"""
+    if load_job_manifest(task_id):
+        save_job_manifest(task_id, status='completed')
+    task = task_manager.get_task(task_id)
+    print(f"{task['type'].capitalize()} task {task_id}: Completed successfully")
+    print(f"Results: {task.get('processed_count', 0)} successful, {task.get('failed_count', 0)} failed")
+
+def batch_output_dir(task_id):
+    return os.path.join('outputs', f"batch_{task_id}")
+
+def process_batch_background(task_id, items):
+    """Queue one work unit per item of a batch task
+    
+    Units go through the same scheduler and admission control as playlist
+    videos. Each item is probed first (duration, resolution) for its
+    resource estimate. Running this again for the same task (after a
+    restart) skips items that already completed.
+    """
+    try:
+        print(f"Starting batch task {task_id}: {len(items)} video(s)")
+        task = task_manager.get_task(task_id)
+        task_manager.update_task(task_id, status='processing', progress=5, last_progress_at=time.time())
+        os.makedirs(batch_output_dir(task_id), exist_ok=True)
+        
+        done = {
+            index for index, video in enumerate(task.get('video_progress') or [])
+            if video['status'] == 'completed'
+        }
+        converter = VideoToPPTConverter()
+        for index, item in enumerate(items):
+            if cancel_requested(task_id):
+                print(f"Batch {task_id}: Cancelled while queueing videos")
+                return
+            if index in done:
+                continue
+            
+            try:
+                # Checked again when fetched: the host may resolve differently by now
+                refused = converter.is_remote_url(item['input']) and batch_url_refused(item['input'])
+                if refused:
+                    raise Exception(refused)
+                details = converter.probe_video(item['input'])
+            except Exception as e:
+                print(f"Batch {task_id}: Could not probe video {index + 1} for a resource estimate: {e}")
+                details = {}
+            
+            output_path = os.path.join(batch_output_dir(task_id), numbered_output_name(index, item['title']))
+            record_playlist_video(task_id, index, item['title'], 'pending')
+            try:
+                job_executor.submit(
+                    task_id, 'batch_video',
+                    task_id, index, item['title'], item['input'], output_path, item['threshold'], item['interval'],
+                    group=task.get('client', ''),
+                    unit_key=str(index),
+                    internal=True,
+                    resources=estimate_job_resources(scratch_limit=job_limit_bytes(), **details)
+                )
+            except JobTooLargeError as e:
+                task = record_playlist_video(task_id, index, item['title'], 'failed', error=str(e))
+                if task and task['status'] == 'completed':
+                    finish_playlist(task_id)
+        
+        print(f"Batch {task_id}: queued {len(items) - len(done)} video(s) for conversion")
+        
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Batch task {task_id}: Failed with error: {error_msg}")
+        task_manager.update_task(task_id, status='failed', error=error_msg)
+
+# Conversions run in a bounded set of worker processes; extra jobs wait in a
+# queue shared by all web processes so they stay responsive under load
+def parse_weights(spec):
+    """Parse scheduler weights given as 'class=weight,class=weight'"""
+    weights = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, weight = item.split('=', 1)
+            weights[name.strip()] = max(1, int(weight))
+    return weights
+
+# Jobs only start when the machine has CPU, memory and disk headroom for them
+admission = AdmissionControl(scratch_roots() + ['outputs'])
+
+job_executor = JobExecutor(
+    task_manager.db_path,
+    handlers={
+        'single': process_single_video_background,
+        'playlist': process_playlist_background,
+        'playlist_video': process_playlist_video_background,
+        'batch': process_batch_background,
+        'batch_video': process_batch_video_background,
+    },
+    max_workers=int(os.environ.get('JOB_WORKERS', 0)) or None,
+    max_queued=int(os.environ.get('JOB_QUEUE_LIMIT', 50)),
+    on_error=on_job_error,
+    # A job whose worker stops renewing its lease is retried elsewhere
+    lease_seconds=int(os.environ.get('JOB_LEASE_SECONDS', 60)),
+    max_attempts=int(os.environ.get('JOB_MAX_ATTEMPTS', 3)),
+    # Playlists and batches are split into per-video units that share the
+    # 'playlist' class; single videos get more turns so their latency stays low
+    job_classes={'playlist_video': 'playlist', 'batch': 'playlist', 'batch_video': 'playlist'},
+    weights=parse_weights(os.environ.get('SCHEDULER_WEIGHTS', 'single=4,playlist=1')),
+    admission=admission,
+    # Web processes of a split setup measure their own machine, not the workers'
+    reject_oversized=WEB_RUNS_JOBS,
+    metrics=metrics,
+    # Playlist and batch videos are downloaded while they wait, so worker
+    # slots go straight to extraction
+    prefetch_handlers={
+        'playlist_video': (prefetch_playlist_video, discard_prefetched_video),
+        'batch_video': (prefetch_batch_video, discard_prefetched_video),
+    },
+    prefetch_depth=PREFETCH_DEPTH,
+    prefetch_disk_budget_mb=PREFETCH_DISK_BUDGET_MB
+)
+
+def startup():
+    """One-time startup work, run before any process starts dispatching jobs"""
+    # Create necessary directories
+    os.makedirs('outputs', exist_ok=True)
+    os.makedirs('temp', exist_ok=True)
+    
+    # Scratch directories of jobs killed before the restart are never cleaned up otherwise
+    sweep_scratch()
+    
+    # Pick up playlist jobs interrupted by a restart
+    resumed = resume_interrupted_jobs()
+    if resumed:
+        print(f"♻️ Resumed {len(resumed)} interrupted playlist job(s)")
+
+@app.route('/')
+def index():
+    return render_template_string(HTML_TEMPLATE)
+
+def admit_client():
+    """Identify the client of a conversion request and apply its limits
+    
+    Returns:
+        Tuple of (client ID, None), or (None, error response) if the
+        request must be refused
+    """
+    api_key = request.headers.get('X-API-Key')
+    if api_key and api_key not in API_KEYS:
+        return None, (jsonify({'error': 'Invalid API key'}), 401)
+    
+    client = client_id()
+    return client, check_client_limits(client)
+
+@app.route('/convert', methods=['POST'])
+def convert():
+    # Checked before any playlist lookup or job is started on the client's behalf
+    client, refused = admit_client()
+    if refused:
+        return refused
+    
+    try:
+        data = request.get_json()
+        conversion_type = data.get('type', 'single')
+        
+        # Generate unique task ID
+        task_id = str(uuid.uuid4())[:8]
+        
+        if conversion_type == 'playlist':
+            playlist_url = data.get('playlist_url', '').strip()
+            threshold = float(data.get('threshold', 0.90))
+            interval = int(data.get('interval', 45))
+            max_videos = data.get('max_videos')  # Can be None for unlimited
+            
+            if not playlist_url:
+                return jsonify({'error': 'No playlist URL provided'}), 400
+            
+            if not ('playlist' in playlist_url or 'list=' in playlist_url):
+                return jsonify({'error': 'Please provide a valid YouTube playlist URL'}), 400
+            
+            # Use cached playlist info if we have it; otherwise the background
+            # task enumerates the playlist so this request returns immediately.
+            # Not counted in the cache metrics: the job looks up the playlist
+            # again and records whether it had to be listed.
+            playlist_info = VideoToPPTConverter(playlist_cache=playlist_cache).get_cached_playlist_info(playlist_url)
+            if playlist_info:
+                playlist_info.pop('entries', None)
+                
+                # Update video count if limited
+                if max_videos and max_videos < playlist_info['video_count']:
+                    playlist_info['video_count'] = max_videos
+                
+                print(f"Playlist info (cached): {playlist_info['title']} - {playlist_info['video_count']} videos")
+            
+            # Create the playlist task, or join an identical one already in progress
+            requester_token = new_requester_token()
+            task_id, created = task_manager.create_or_join_task(
+                task_id,
+                'playlist',
+                playlist_dedup_key(playlist_url, threshold, interval, max_videos),
+                requester=requester_key(requester_token),
+                playlist_url=playlist_url,
+                threshold=threshold,
+                interval=interval,
+                max_videos=max_videos,
+                total_videos=playlist_info['video_count'] if playlist_info else 0,
+                playlist_info=playlist_info,
+                client=client
+            )
+            
+            # Queue background processing
+            if created:
+                try:
+                    submit_job(task_id, 'playlist', task_id, playlist_url, threshold, interval, max_videos)
+                except QueueFullError as e:
+                    return jsonify({'error': f'Server is busy, please try again later ({e})'}), 503
+            
+            return jsonify({
+                'task_id': task_id,
+                'status': 'started' if created else 'joined',
+                'type': 'playlist',
+                'playlist_info': playlist_info,
+                'requester_token': requester_token
+            })
+            
+        else:  # Single video
+            video_url = data.get('video_url', '').strip()
+            threshold = float(data.get('threshold', 0.90))
+            interval = int(data.get('interval', 30))
+            mode = data.get('mode', 'standard')
+            
+            if not video_url:
+                return jsonify({'error': 'No video URL provided'}), 400
+            
+            if not ('youtube.com' in video_url or 'youtu.be' in video_url):
+                return jsonify({'error': 'Please provide a valid YouTube URL'}), 400
+            
+            # Requests for the same video with the same effective settings
+            # share one task (progress and output) while it is in flight
+            video_id = VideoToPPTConverter().extract_video_id(video_url)
+            if video_id == 'unknown_video':
+                video_id = video_url
+            requester_token = new_requester_token()
+            task_id, created = task_manager.create_or_join_task(
+                task_id,
+                'single',
+                "single:{}:{}:{}".format(video_id, *effective_settings(threshold, interval, mode)),
+                requester=requester_key(requester_token),
+                video_url=video_url,
+                threshold=threshold,
+                interval=interval,
+                mode=mode,
+                client=client
+            )
+            
+            # Queue background processing with a default estimate; the video
+            # is probed in the background and the job starts once the server
+            # has memory and disk for a video of its length and resolution
+            if created:
+                try:
+                    submit_job(task_id, 'single', task_id, video_url, threshold, interval, mode,
+                               resources=estimate_job_resources(scratch_limit=job_limit_bytes()))
+                except QueueFullError as e:
+                    return jsonify({'error': f'Server is busy, please try again later ({e})'}), 503
+                except JobTooLargeError as e:
+                    return jsonify({'error': str(e)}), 413
+                refine_resources_later(task_id, video_url)
+            
+            return jsonify({
+                'task_id': task_id,
+                'status': 'started' if created else 'joined',
+                'type': 'single',
+                'requester_token': requester_token
+            })
+        
+    except Exception as e:
+        print(f"Convert endpoint error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# Hosts of YouTube video URLs (recognised by host, not by pattern)
+YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'youtu.be', 'www.youtu.be')
+
+def batch_url_refused(url):
+    """Return why the server must not fetch a batch URL, or None
+    
+    Refuses hosts other than YouTube outside BATCH_ALLOWED_HOSTS and hosts
+    resolving to loopback, private, link-local or otherwise non-public
+    addresses, so batches cannot reach internal services or cloud metadata
+    endpoints.
+    """
+    host = urlparse(url if '://' in url else 'https://' + url).hostname
+    if not host:
+        return f'URL has no host: {url}'
+    if host not in YOUTUBE_HOSTS:
+        if not BATCH_ALLOWED_HOSTS:
+            return f'only YouTube URLs are accepted on this server: {host}'
+        if not any(host == allowed or host.endswith('.' + allowed) for allowed in BATCH_ALLOWED_HOSTS):
+            return f'host is not allowed: {host}'
+    
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except socket.gaierror:
+        return f'host cannot be resolved: {host}'
+    for address in addresses:
+        address = ipaddress.ip_address(address.split('%')[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            return f'host resolves to a non-public address: {host}'
+    return None
+
+def parse_batch_item(item, defaults):
+    """Validate one entry of a batch request
+    
+    Args:
+        item: A URL or local path, or a dict with 'input' and optional
+            'title', 'threshold', 'interval' and 'mode'
+        defaults: Request-level threshold, interval and mode
+        
+    Returns:
+        Tuple of (item dict with input, title, threshold and interval, None)
+        or (None, error message)
+    """
+    if isinstance(item, str):
+        item = {'input': item}
+    if not isinstance(item, dict) or not isinstance(item.get('input'), str) or not item['input'].strip():
+        return None, 'each item must be a URL, a path, or an object with an "input"'
+    
+    video_input = item['input'].strip()
+    converter = VideoToPPTConverter()
+    if converter.is_remote_url(video_input):
+        refused = batch_url_refused(video_input)
+        if refused:
+            return None, refused
+        if converter.is_youtube_url(video_input):
+            default_title = converter.extract_video_id(video_input)
+        else:
+            default_title = os.path.basename(urlparse(video_input).path) or video_input
+    else:
+        # Local files must live under BATCH_LOCAL_ROOT (e.g. a mounted LMS share)
+        if not BATCH_LOCAL_ROOT:
+            return None, f'local paths are not enabled on this server: {video_input}'
+        root = os.path.realpath(BATCH_LOCAL_ROOT)
+        video_input = os.path.realpath(os.path.join(root, video_input))
+        if os.path.commonpath([root, video_input]) != root:
+            return None, f'path is outside the allowed directory: {item["input"]}'
+        if not os.path.isfile(video_input):
+            return None, f'file not found: {item["input"]}'
+        default_title = os.path.basename(video_input)
+    
+    try:
+        threshold, interval = effective_settings(
+            float(item.get('threshold', defaults['threshold'])),
+            int(item.get('interval', defaults['interval'])),
+            item.get('mode', defaults['mode'])
+        )
+    except (TypeError, ValueError):
+        return None, f'invalid settings for {item["input"]}'
+    
+    return {
+        'input': video_input,
+        'title': str(item.get('title') or os.path.splitext(default_title)[0]),
+        'threshold': threshold,
+        'interval': interval,
+    }, None
+
+@app.route('/convert/batch', methods=['POST'])
+def convert_batch():
+    """Convert many videos (YouTube URLs, URLs on BATCH_ALLOWED_HOSTS, or local paths) as one task
+    
+    Body: {"items": [...], "threshold": 0.9, "interval": 30, "mode": "standard"}
+    where each item is a URL/path string or an object overriding the
+    request-level settings (see parse_batch_item). The task's decks can be
+    downloaded one by one as they finish, or together from /download/<id>/all.
+    """
+    client, refused = admit_client()
+    if refused:
+        return refused
+    
+    data = request.get_json(silent=True) or {}
+    raw_items = data.get('items')
+    if not isinstance(raw_items, list) or not raw_items:
+        return jsonify({'error': 'Provide a non-empty "items" list'}), 400
+    if len(raw_items) > BATCH_MAX_ITEMS:
+        return jsonify({'error': f'A batch may contain at most {BATCH_MAX_ITEMS} items'}), 400
+    
+    # Every item is a conversion of its own, so batches have their own cap
+    if MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT:
+        if len(raw_items) > MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT:
+            return jsonify({
+                'error': f'A batch may contain at most {MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT} items on this server'
+            }), 400
+        active = task_manager.count_unfinished_videos(client, 'batch')
+        if active + len(raw_items) > MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT:
+            return too_many_requests(
+                f'Your unfinished batches still hold {active} videos and at most '
+                f'{MAX_ACTIVE_BATCH_VIDEOS_PER_CLIENT} are allowed; please wait for some to finish',
+                ACTIVE_JOBS_RETRY_AFTER
+            )
+    
+    defaults = {
+        'threshold': data.get('threshold', 0.90),
+        'interval': data.get('interval', 30),
+        'mode': data.get('mode', 'standard'),
+    }
+    items = []
+    for position, raw_item in enumerate(raw_items, 1):
+        item, error = parse_batch_item(raw_item, defaults)
+        if error:
+            return jsonify({'error': f'Item {position}: {error}'}), 400
+        items.append(item)
+    
+    task_id = str(uuid.uuid4())[:8]
+    requester_token = new_requester_token()
+    task_manager.create_task(
+        task_id,
+        'batch',
+        requester=requester_key(requester_token),
+        total_videos=len(items),
+        planned_videos=len(items),
+        client=client
+    )
+    try:
+        submit_job(task_id, 'batch', task_id, items)
+    except QueueFullError as e:
+        return jsonify({'error': f'Server is busy, please try again later ({e})'}), 503
+    
+    return jsonify({
+        'task_id': task_id,
+        'status': 'started',
+        'type': 'batch',
+        'total_videos': len(items),
+        'requester_token': requester_token
+    })
+
+def request_requester_token():
+    """Requester token sent with the current request (X-Requester-Token header or "token" in a JSON body)"""
+    return request.headers.get('X-Requester-Token') or (request.get_json(silent=True) or {}).get('token')
+
+@app.route('/resume/<task_id>', methods=['POST'])
+def resume(task_id):
+    """Continue an interrupted playlist job as a new request of the caller
+    
+    The caller's limits apply as for /convert. A playlist that was
+    cancelled can only be resumed with the requester_token of the request
+    that cancelled it.
+    """
+    client, refused = admit_client()
+    if refused:
+        return refused
+    
+    task = task_manager.get_task(task_id)
+    if task and task['status'] in ('pending', 'processing'):
+        return jsonify({'error': 'Task is still running'}), 400
+    
+    manifest = load_job_manifest(task_id)
+    if not manifest:
+        return jsonify({'error': 'No resumable job found for this task'}), 404
+    
+    if manifest.get('status') == 'completed' and task:
+        return jsonify({'error': 'Task already completed'}), 400
+    
+    if manifest.get('status') == 'cancelled' or (task and task['status'] == 'cancelled'):
+        token = request_requester_token()
+        if not token or requester_key(token) != manifest.get('cancelled_by'):
+            return jsonify({'error': 'Only the request that cancelled this task can resume it '
+                                     '(send its requester_token)'}), 403
+    
+    requester_token = new_requester_token()
+    try:
+        resumed_id = start_playlist_resume(task_id, manifest, requester=requester_key(requester_token), client=client)
+    except QueueFullError as e:
+        return jsonify({'error': f'Server is busy, please try again later ({e})'}), 503
+    
+    return jsonify({
+        'task_id': resumed_id,
+        'status': 'resumed' if resumed_id == task_id else 'joined',
+        'type': 'playlist',
+        'requester_token': requester_token
+    })
+
+@app.route('/tasks/<task_id>', methods=['DELETE'])
+def cancel(task_id):
+    """Cancel a pending or processing task (see cancel_task)
+    
+    The requester_token returned by the request that started or joined the
+    task goes in the X-Requester-Token header (or "token" in a JSON body).
+    """
+    task = task_manager.get_task(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    if task['status'] in FINISHED_STATUSES:
+        return jsonify({'error': f"Task already {task['status']}"}), 409
+    
+    task, detached = cancel_task(task_id, request_requester_token())
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    if not detached:
+        return jsonify({'error': 'Not a requester of this task, or already detached (send its requester_token)'}), 403
+    return jsonify({
+        'task_id': task_id,
+        'status': task['status'],
+        'attached_requests': task.get('attached_requests', 1)
+    })
+
+def paginate_videos(task, offset, limit):
+    """Restrict a task (or delta) to a window of its per-video entries"""
+    end = offset + limit if limit is not None else None
+    if 'video_progress' in task:
+        videos = task['video_progress']
+        task['video_progress'] = videos[offset:end]
+        task['video_progress_total'] = len(videos)
+    if 'video_progress_updates' in task:
+        task['video_progress_updates'] = {
+            index: video for index, video in task['video_progress_updates'].items()
+            if index >= offset and (end is None or index < end)
+        }
+    task['video_progress_offset'] = offset
+    return task
+
+@app.route('/status/<task_id>')
+def status(task_id):
+    """Task status
+    
+    Query parameters:
+        since: Version the client already has; only fields changed after it
+            are returned (changed per-video entries as video_progress_updates)
+        offset, limit: Window of per-video entries to include
+        include: "timeline" adds the stage timelines of finished conversions,
+            as ``timeline`` for single videos and ``timelines`` ({index:
+            timeline}, within the window) for playlists and batches
+    """
+    since = request.args.get('since', type=int)
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = request.args.get('limit', type=int)
+    
+    if since:
+        task = task_manager.get_task_delta(task_id, since)
+    else:
+        task = task_manager.get_task(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    # Derived fields are not versioned, so they are always sent
+    if task['status'] == 'pending':
+        task['queue_position'] = job_executor.queue_position(task_id)
+    elif task['status'] == 'processing':
+        last_progress_at = task.get('last_progress_at') or task_manager.get_task(task_id).get('last_progress_at')
+        if last_progress_at:
+            task['stalled'] = time.time() - last_progress_at > STALL_SECONDS
+    
+    if offset or limit is not None:
+        task = paginate_videos(task, offset, limit)
+    if 'timeline' in request.args.get('include', '').split(','):
+        timelines = task_manager.get_timelines(task_id, offset, limit)
+        if (task.get('type') or task_manager.get_task(task_id)['type']) == 'single':
+            task['timeline'] = timelines.get(0)
+        else:
+            task['timelines'] = timelines
+    return jsonify(task)
+
+@app.route('/events/<task_id>')
+def events(task_id):
+    """Server-Sent Events stream of task changes
+    
+    The first event carries the whole task, later ones only the changed
+    fields. The stream ends when the task finishes or after SSE_MAX_SECONDS
+    (the browser then reconnects and receives a fresh full snapshot). With
+    SSE_MAX_STREAMS streams already open in this process the request gets
+    503 and the page polls /status instead.
+    """
+    if not task_manager.get_task(task_id):
+        return jsonify({'error': 'Task not found'}), 404
+    
+    if not _sse_slots.acquire(blocking=False):
+        response = jsonify({'error': 'Too many open event streams, poll /status instead'})
+        response.headers['Retry-After'] = str(SSE_MAX_SECONDS)
+        return response, 503
+    
+    def stream():
+        version = 0
+        status = None
+        queue_position = None
+        last_write = time.time()
+        deadline = last_write + SSE_MAX_SECONDS
+        
+        yield 'retry: 3000\n\n'
+        
+        while time.time() < deadline:
+            changes = task_manager.get_task_delta(task_id, version)
+            if changes is None:
+                return
+            version = changes['version']
+            status_changed = changes['status'] != status
+            status = changes['status']
+            
+            # Queue position can change without the task changing
+            if status == 'pending':
+                position = job_executor.queue_position(task_id)
+                if position != queue_position:
+                    changes['queue_position'] = queue_position = position
+            
+            if status_changed or changes.keys() - {'id', 'version', 'status'}:
+                yield f"data: {json.dumps(changes)}\n\n"
+                last_write = time.time()
+            
+            if status in FINISHED_STATUSES:
+                return
+            
+            if time.time() - last_write >= SSE_KEEPALIVE_SECONDS:
+                yield ': keep-alive\n\n'
+                last_write = time.time()
+            
+            time.sleep(SSE_POLL_INTERVAL)
+    
+    response = Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Freed when the server closes the response, even if the stream never started
+    response.call_on_close(_sse_slots.release)
+    return response
+
+# Strong ETags are content hashes; decks never change once written, so each
+# is hashed once per process and cached by path, size and mtime
+_etag_cache = {}
+_etag_cache_lock = threading.Lock()
+ETAG_CACHE_SIZE = 4096
+
+def file_etag(path):
+    """Return a strong ETag (SHA-256 of the content) for a file"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _etag_cache_lock:
+        etag = _etag_cache.get(key)
+    record_cache_lookup('etag', etag)
+    if etag:
+        return etag
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    etag = digest.hexdigest()[:32]
+    
+    with _etag_cache_lock:
+        if len(_etag_cache) >= ETAG_CACHE_SIZE:
+            _etag_cache.clear()
+        _etag_cache[key] = etag
+    return etag
+
+def send_output_file(file_path, download_name=None):
+    """Send a finished deck with a content ETag, conditional GET and byte ranges
+    
+    Full responses go through the server's file wrapper, which gunicorn
+    transmits with sendfile (or the front proxy when USE_X_SENDFILE is set).
+    """
+    response = send_file(
+        os.path.abspath(file_path),
+        as_attachment=True,
+        download_name=download_name,
+        etag=file_etag(file_path),
+        conditional=True
+    )
+    response.accept_ranges = 'bytes'
+    return response
+
+class StreamBuffer:
+    """Write-only file object that collects what ZipFile writes so it can be yielded"""
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_zip_size(entries):
+    """Exact size of the archive stream_zip builds, or None if it needs ZIP64
+    
+    Every entry is a local header, the stored data, a data descriptor (the
+    output is not seekable) and a central directory record, followed by the
+    end-of-central-directory record.
+    """
+    total = 22
+    for path, arcname in entries:
+        name_length = len(zipfile.ZipInfo(arcname).filename.encode('utf-8'))
+        total += (30 + name_length) + os.path.getsize(path) + 16 + (46 + name_length)
+    if total > zipfile.ZIP64_LIMIT or len(entries) >= 0xFFFF:
+        return None
+    return total
+
+def stream_zip(entries, chunk_size=1024 * 1024, timing=None):
+    """Yield a ZIP archive of (path, arcname) entries while it is being built
+    
+    Entries are STORED: .pptx files are already compressed, so deflating them
+    again only costs CPU. Nothing is written to disk.
+    
+    The time spent streaming is recorded in zip_seconds however the stream
+    ends, labelled with ``timing['result']`` ('full' or 'range', which the
+    caller may set once the response status is known), or 'aborted' when a
+    full download stops early.
+    """
+    timing = timing if timing is not None else {'result': 'full'}
+    started_at = time.time()
+    finished = False
+    buffer = StreamBuffer()
+    try:
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+            for path, arcname in entries:
+                zinfo = zipfile.ZipInfo.from_file(path, arcname)
+                zinfo.compress_type = zipfile.ZIP_STORED
+                with open(path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        yield buffer.drain()
+                yield buffer.drain()
+        # Closing the archive writes the central directory
+        yield buffer.drain()
+        finished = True
+    finally:
+        # Range responses stop reading once their bytes are sent
+        result = timing['result']
+        if result == 'full' and not finished:
+            result = 'aborted'
+        try:
+            metrics.observe('zip_seconds', time.time() - started_at, {'result': result})
+        except Exception as e:
+            print(f"Could not record ZIP metrics: {e}")
+
+@app.route('/download/<task_id>')
+@app.route('/download/<task_id>/<filename>')
+def download(task_id, filename=None):
+    task = task_manager.get_task(task_id)
+    if not task:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    if task.get('outputs_evicted_at'):
+        return jsonify({'error': 'Output files have expired and were removed'}), 410
+    
+    # Playlist decks are listed in output_files as each one finishes, so
+    # anything listed can be downloaded even while the task is running
+    if not task['output_files']:
+        return jsonify({'error': 'Conversion not completed yet'}), 400
+    
+    output_retention.touch(task_id)
+    
+    if task['type'] in ('playlist', 'batch'):
+        playlist_dir = os.path.join('outputs', f"{task['type']}_{task_id}")
+        if filename == 'all':
+            # Stream a ZIP of every presentation finished so far, built as it is sent
+            entries = [
+                (os.path.join(playlist_dir, name), name) for name in task['output_files']
+                if os.path.exists(os.path.join(playlist_dir, name))
+            ]
+            if not entries:
+                return jsonify({'error': 'No presentations available'}), 404
+            
+            # The archive is deterministic for a given set of decks, so its
+            # ETag comes from theirs and byte ranges can be served by
+            # regenerating the stream and skipping to the requested offset
+            archive_etag = hashlib.sha256(
+                json.dumps([(name, file_etag(path)) for path, name in entries]).encode()
+            ).hexdigest()[:32]
+            archive_size = stream_zip_size(entries)
+            
+            timing = {'result': 'full'}
+            response = Response(
+                stream_zip(entries, timing=timing),
+                mimetype='application/zip',
+                headers={'Content-Disposition': f'attachment; filename="{task["type"]}_presentations_{task_id}.zip"'}
+            )
+            response.set_etag(archive_etag)
+            if archive_size is not None:
+                response.content_length = archive_size
+                response.accept_ranges = 'bytes'
+            response = response.make_conditional(
+                request,
+                accept_ranges=archive_size is not None,
+                complete_length=archive_size
+            )
+            if response.status_code == 206:
+                timing['result'] = 'range'
+            return response
+        elif filename:
+            # Download specific file
+            if filename in task['output_files']:
+                file_path = os.path.join(playlist_dir, filename)
+                
+                if os.path.exists(file_path):
+                    return send_output_file(file_path)
+                else:
+                    return jsonify({'error': 'File not found'}), 404
+            else:
+                return jsonify({'error': 'File not in task output'}), 404
+        else:
+            return jsonify({'error': f"No filename specified for {task['type']} download"}), 400
+    else:
+        # Single video download
+        file_path = os.path.join('outputs', task['output_files'][0])
+        if not os.path.exists(file_path):
+            return jsonify({'error': 'Output file not found'}), 404
+        
+        return send_output_file(file_path, download_name=f"video_presentation_{task_id}.pptx")
+
+@app.route('/health')
+def health():
+    task_counts = task_manager.count_by_status()
+    active_tasks = task_counts.get('processing', 0)
+    total_tasks = sum(task_counts.values())
+    
+    return jsonify({
+        'status': 'healthy', 
+        'active_tasks': active_tasks,
+        'total_tasks': total_tasks,
+        'task_counts': task_counts,
+        'job_queue': job_executor.stats(),
+        'outputs': output_retention.stats(),
+        'resources': admission.snapshot(),
+        'features': ['single_video', 'unlimited_playlist', 'batch_download'],
+        'version': '2.0-unlimited'
+    })
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint: stored histograms and counters plus live queue and task gauges"""
+    queue = job_executor.stats()
+    gauges = [
+        ('jobs', 'Jobs in the queue by class and state', [
+            ({'class': job_class, 'state': state}, count)
+            for job_class, states in sorted(queue['classes'].items())
+            for state, count in sorted(states.items())
+        ]),
+        ('jobs_retrying', 'Queued jobs waiting to be retried', [({}, queue['retrying'])]),
+        ('tasks', 'Tasks by status', [
+            ({'status': status}, count) for status, count in sorted(task_manager.count_by_status().items())
+        ]),
+        ('output_bytes', 'Disk used by generated presentations', [({}, output_retention.stats()['usage_bytes'])]),
+    ]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+if __name__ == '__main__':
+    # Development server; see gunicorn.conf.py for multi-process serving
+    startup()
+    if WEB_RUNS_JOBS:
+        job_executor.start()
+    output_retention.start()
+    start_sweeper()
+    
+    # Get port from environment (Railway provides PORT variable)
+    port = int(os.environ.get('PORT', 8000))
+    
+    print(f"🚀 Starting Video to PowerPoint Converter v2.0")
+    print(f"📡 Server starting on port {port}")
+    print(f"🌐 Environment: {'Railway' if 'RAILWAY_' in str(os.environ) else 'Local'}")
+    print(f"✨ Features:")
+    print(f"   📱 Single video conversion")
+    print(f"   📋 UNLIMITED playlist conversion")
+    print(f"   📦 Batch ZIP downloads")
+    print(f"   🎯 Smart quality presets")
+    print(f"   📊 Real-time progress tracking")
+    
+    try:
+        # Run the Flask app with Railway-optimized settings
+        app.run(
+            host='0.0.0.0', 
+            port=port, 
+            debug=False,
+            threaded=True,
+            use_reloader=False
+        )
+    except Exception as e:
+        print(f"❌ Server failed to start: {e}")
+        print("🔧 Check logs for more details")
+        raise
@@ -0,0 +1,518 @@
+# task_store.py - Persistent task storage shared by threads and processes
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# WAL lets readers run alongside the writer but needs shared memory, so all
+# processes must be on one host; use DELETE when the database is on a network
+# filesystem shared by web and worker hosts
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+
+# 'expired' tasks completed but their outputs were removed by retention;
+# 'cancelled' tasks were stopped on request and never change status again
+FINISHED_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+
+
+class SQLiteDatabase:
+    """
+    Base for stores kept in a shared SQLite file
+
+    Opens the database in WAL mode (SQLITE_JOURNAL_MODE) so readers never
+    block the writer, with one connection per thread, reopened after a fork.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+
+    def _connection(self):
+        # Connections cannot cross threads or forked processes, so keep one per
+        # thread and reopen it if this is a different process than before
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute(f'PRAGMA journal_mode={SQLITE_JOURNAL_MODE}')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        return conn
+
+
+class TaskStore(SQLiteDatabase):
+    """
+    SQLite-backed task storage
+
+    Every update is a single transaction and any thread or process (job
+    workers, other web workers) sees the same tasks. Lookups go through the
+    primary key or the status index, and per-status counts are kept in a small
+    counter table so /health never has to scan tasks. Finished tasks are
+    evicted once they are older than ``ttl`` seconds.
+
+    Each task has a version that grows with every change. The version at
+    which each field (and each ``video_progress`` entry) last changed is
+    kept alongside the task, so clients can ask for only what changed since
+    the version they already have.
+    """
+
+    def __init__(self, db_path, ttl=86400, evict_interval=300):
+        """
+        Open (and create if needed) the task database
+
+        Args:
+            db_path: Path of the SQLite database file
+            ttl: Seconds a completed/failed task is kept
+            evict_interval: Minimum seconds between eviction passes
+        """
+        super().__init__(db_path)
+        self.ttl = ttl
+        self.evict_interval = evict_interval
+        self._last_eviction = 0
+        self._create_schema()
+
+    def _create_schema(self):
+        conn = self._connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+            CREATE INDEX IF NOT EXISTS idx_tasks_finished_at ON tasks (finished_at);
+            CREATE TABLE IF NOT EXISTS task_counts (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS task_timelines (
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                timeline TEXT NOT NULL,
+                PRIMARY KEY (task_id, idx)
+            );
+        ''')
+
+        # Databases created by older versions lack these columns
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(tasks)')}
+        for column, definition in (('version', "INTEGER NOT NULL DEFAULT 0"),
+                                   ('versions', "TEXT NOT NULL DEFAULT '{}'"),
+                                   ('dedup_key', "TEXT"),
+                                   ('client', "TEXT"),
+                                   ('requesters', "TEXT NOT NULL DEFAULT '[]'")):
+            if column not in columns:
+                try:
+                    conn.execute(f'ALTER TABLE tasks ADD COLUMN {column} {definition}')
+                except sqlite3.OperationalError:
+                    pass  # Added concurrently by another process
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_dedup_key ON tasks (dedup_key, status)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_client ON tasks (client, status)')
+
+    def _adjust_count(self, conn, status, delta):
+        conn.execute(
+            'INSERT INTO task_counts (status, count) VALUES (?, ?) '
+            'ON CONFLICT(status) DO UPDATE SET count = count + excluded.count',
+            (status, delta)
+        )
+
+    def create_task(self, task_id, task_type, requester=None, **kwargs):
+        """Create (or replace) a task with the standard fields
+
+        ``requester`` identifies the request that created it (see
+        detach_requester); requesters are never part of the task data.
+        """
+        conn = self._transaction()
+        try:
+            self._insert_task(conn, task_id, task_type, kwargs, requester=requester)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self.maybe_evict()
+        return task_id
+
+    def create_or_join_task(self, task_id, task_type, dedup_key, requester=None, **kwargs):
+        """
+        Create a task unless an identical one is already pending or processing
+
+        Requests for the same work share a ``dedup_key``; a request that
+        finds an unfinished task with its key joins that task (counted in
+        its ``attached_requests``, and its ``requester`` recorded) instead
+        of creating a new one. A task being recreated under its own ID
+        (e.g. resumed) never joins itself.
+
+        Returns:
+            Tuple of (task ID to use, True if a new task was created)
+        """
+        conn = self._transaction()
+        try:
+            row = conn.execute(
+                "SELECT id, data, requesters FROM tasks WHERE dedup_key = ? AND id != ? "
+                "AND status IN ('pending', 'processing') LIMIT 1",
+                (dedup_key, task_id)
+            ).fetchone()
+            if row:
+                attached = json.loads(row[1]).get('attached_requests', 1) + 1
+                self._apply_update(conn, row[0], {'attached_requests': attached})
+                if requester:
+                    conn.execute(
+                        'UPDATE tasks SET requesters = ? WHERE id = ?',
+                        (json.dumps(json.loads(row[2]) + [requester]), row[0])
+                    )
+                conn.execute('COMMIT')
+                return row[0], False
+
+            self._insert_task(conn, task_id, task_type, kwargs, dedup_key, requester)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self.maybe_evict()
+        return task_id, True
+
+    def _insert_task(self, conn, task_id, task_type, fields, dedup_key=None, requester=None):
+        task = {
+            'id': task_id,
+            'type': task_type,
+            'status': 'pending',
+            'progress': 0,
+            'output_files': [],
+            'error': None,
+            'current_video': 0,
+            'total_videos': 0,
+            'video_progress': [],
+            **fields
+        }
+        now = time.time()
+
+        previous = conn.execute('SELECT status, version, requesters FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        if previous:
+            self._adjust_count(conn, previous[0], -1)
+
+        # A task replaced without a new requester (e.g. resumed after a restart) keeps its requesters
+        requesters = [requester] if requester else json.loads(previous[2]) if previous else []
+
+        # A replaced task keeps counting up so clients never see its version go back
+        version = previous[1] + 1 if previous else 1
+        versions = {
+            'fields': {key: version for key in task},
+            'videos': [version] * len(task['video_progress'])
+        }
+        conn.execute(
+            'INSERT OR REPLACE INTO tasks '
+            '(id, type, status, data, created_at, updated_at, finished_at, version, versions, dedup_key, client, '
+            'requesters) VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)',
+            (task_id, task_type, task['status'], json.dumps(task), now, now, version, json.dumps(versions), dedup_key,
+             task.get('client'), json.dumps(requesters))
+        )
+        self._adjust_count(conn, task['status'], 1)
+
+    def update_task(self, task_id, **kwargs):
+        """Merge fields into a task atomically (unknown tasks are ignored)
+
+        The task version is bumped only if some field actually changed.
+        """
+        conn = self._transaction()
+        try:
+            self._apply_update(conn, task_id, kwargs)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def mutate_task(self, task_id, mutate):
+        """
+        Atomically update a task from its current state
+
+        Args:
+            task_id: Task to update
+            mutate: Called with the current task inside the transaction;
+                returns the dict of fields to merge
+
+        Returns:
+            The updated task, or None if it does not exist
+        """
+        conn = self._transaction()
+        try:
+            row = conn.execute('SELECT data FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            if row is None:
+                conn.execute('ROLLBACK')
+                return None
+            task = json.loads(row[0])
+            fields = mutate(task)
+            self._apply_update(conn, task_id, fields)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        task.update(fields)
+        return task
+
+    def detach_requester(self, task_id, requester, mutate):
+        """
+        Atomically remove one requester from a task, then update the task
+
+        Args:
+            task_id: Task to update
+            requester: Identifies the request that is leaving the task
+            mutate: Called inside the transaction with the current task and
+                the number of requesters left; returns the dict of fields to
+                merge. Tasks that never recorded a requester count as having
+                none left.
+
+        Returns:
+            Tuple of (updated task or None if it does not exist, False if
+            ``requester`` is not attached to the task)
+        """
+        conn = self._transaction()
+        try:
+            row = conn.execute('SELECT data, requesters FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            if row is None:
+                conn.execute('ROLLBACK')
+                return None, False
+            task = json.loads(row[0])
+            requesters = json.loads(row[1])
+            if requesters:
+                if requester not in requesters:
+                    conn.execute('ROLLBACK')
+                    return task, False
+                requesters.remove(requester)
+                conn.execute('UPDATE tasks SET requesters = ? WHERE id = ?', (json.dumps(requesters), task_id))
+            fields = mutate(task, len(requesters))
+            self._apply_update(conn, task_id, fields)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        task.update(fields)
+        return task, True
+
+    def _apply_update(self, conn, task_id, fields):
+        row = conn.execute(
+            'SELECT status, data, version, versions FROM tasks WHERE id = ?', (task_id,)
+        ).fetchone()
+        if row is None:
+            return
+
+        old_status, data, version, versions = row
+        if old_status == 'cancelled' and 'status' in fields:
+            # Jobs notice cancellation with a delay and may still report an outcome
+            fields = {key: value for key, value in fields.items() if key != 'status'}
+        task = json.loads(data)
+        versions = json.loads(versions)
+        if not self._record_changes(task, fields, versions, version + 1):
+            return
+
+        task.update(fields)
+        new_status = task['status']
+        now = time.time()
+        finished_at = now if new_status in FINISHED_STATUSES else None
+
+        conn.execute(
+            'UPDATE tasks SET status = ?, data = ?, updated_at = ?, finished_at = ?, '
+            'version = ?, versions = ? WHERE id = ?',
+            (new_status, json.dumps(task), now, finished_at, version + 1, json.dumps(versions), task_id)
+        )
+        if new_status != old_status:
+            self._adjust_count(conn, old_status, -1)
+            self._adjust_count(conn, new_status, 1)
+
+    @staticmethod
+    def _record_changes(task, changes, versions, version):
+        """Stamp changed fields and video entries with ``version``; returns True if anything changed"""
+        field_versions = versions.setdefault('fields', {})
+        video_versions = versions.setdefault('videos', [])
+        changed = False
+
+        for key, value in changes.items():
+            if task.get(key) == value:
+                continue
+            changed = True
+            if key != 'video_progress':
+                field_versions[key] = version
+                continue
+
+            old_videos = task.get('video_progress') or []
+            if len(value) < len(old_videos):
+                # The list was replaced rather than extended; resend it whole
+                field_versions[key] = version
+                video_versions[:] = [version] * len(value)
+                continue
+            del video_versions[len(value):]
+            for index, video in enumerate(value):
+                if index >= len(video_versions):
+                    video_versions.append(version)
+                elif index >= len(old_videos) or old_videos[index] != video:
+                    video_versions[index] = version
+
+        return changed
+
+    def get_task(self, task_id):
+        """Return the task (with its current ``version``) or None"""
+        row = self._connection().execute('SELECT data, version FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        if not row:
+            return None
+        task = json.loads(row[0])
+        task['version'] = row[1]
+        return task
+
+    def get_status(self, task_id):
+        """Return only the status of a task (None if it does not exist); cheap enough to poll"""
+        row = self._connection().execute('SELECT status FROM tasks WHERE id = ?', (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def get_task_delta(self, task_id, since):
+        """
+        Return what changed in a task after version ``since``
+
+        The result holds ``id``, ``version``, ``status`` and every field changed since then;
+        changed ``video_progress`` entries are given as
+        ``video_progress_updates`` ({index: entry}) unless the whole list was
+        replaced, in which case ``video_progress`` is included in full.
+        ``output_files`` of a task with per-video entries is left out: it is
+        derived from the entries' ``output_file``, which the client already has.
+        Returns None if the task does not exist.
+        """
+        row = self._connection().execute(
+            'SELECT status, data, version, versions FROM tasks WHERE id = ?', (task_id,)
+        ).fetchone()
+        if not row:
+            return None
+
+        status, data, version, versions = row
+        delta = {'id': task_id, 'version': version, 'status': status}
+        if since >= version:
+            return delta
+
+        task = json.loads(data)
+        versions = json.loads(versions)
+        for key, changed_at in versions.get('fields', {}).items():
+            if changed_at > since and key in task:
+                delta[key] = task[key]
+        if task.get('video_progress'):
+            delta.pop('output_files', None)
+
+        if 'video_progress' not in delta:
+            videos = task.get('video_progress') or []
+            updates = {
+                index: videos[index]
+                for index, changed_at in enumerate(versions.get('videos', []))
+                if changed_at > since and index < len(videos)
+            }
+            if updates:
+                delta['video_progress_updates'] = updates
+
+        return delta
+
+    def set_timeline(self, task_id, index, timeline):
+        """
+        Store the stage timeline of one video of a task
+
+        Timelines are kept out of the task itself, so polling the task does
+        not carry them. Nothing is stored if the task no longer exists.
+
+        Args:
+            task_id: Task the video belongs to
+            index: Index of the video in the task (0 for single-video tasks)
+            timeline: List of stage entries
+        """
+        self._connection().execute(
+            'INSERT INTO task_timelines (task_id, idx, timeline) SELECT ?, ?, ? '
+            'WHERE EXISTS (SELECT 1 FROM tasks WHERE id = ?) '
+            'ON CONFLICT(task_id, idx) DO UPDATE SET timeline = excluded.timeline',
+            (task_id, index, json.dumps(timeline), task_id)
+        )
+
+    def get_timelines(self, task_id, offset=0, limit=None):
+        """Return {index: timeline} for a task's videos with index in [offset, offset + limit)"""
+        end = offset + limit if limit is not None else None
+        rows = self._connection().execute(
+            'SELECT idx, timeline FROM task_timelines WHERE task_id = ? AND idx >= ? AND (? IS NULL OR idx < ?) '
+            'ORDER BY idx', (task_id, offset, end, end)
+        ).fetchall()
+        return {index: json.loads(timeline) for index, timeline in rows}
+
+    def delete_task(self, task_id):
+        conn = self._transaction()
+        try:
+            row = conn.execute('SELECT status FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            if row:
+                conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+                conn.execute('DELETE FROM task_timelines WHERE task_id = ?', (task_id,))
+                self._adjust_count(conn, row[0], -1)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def task_ids_with_status(self, *statuses):
+        """Return IDs of tasks in any of the given statuses (uses the status index)"""
+        placeholders = ', '.join('?' for _ in statuses)
+        rows = self._connection().execute(
+            f'SELECT id FROM tasks WHERE status IN ({placeholders})', statuses
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def count_active(self, client):
+        """Return how many pending or processing tasks a client created"""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM tasks WHERE client = ? AND status IN ('pending', 'processing')", (client,)
+        ).fetchone()[0]
+
+    def count_unfinished_videos(self, client, task_type):
+        """Return how many videos of a client's pending or processing tasks of one type are not finished yet"""
+        return self._connection().execute(
+            "SELECT COALESCE(SUM(COALESCE(json_extract(data, '$.total_videos'), 0) - "
+            "COALESCE(json_extract(data, '$.current_video'), 0)), 0) FROM tasks "
+            "WHERE client = ? AND type = ? AND status IN ('pending', 'processing')", (client, task_type)
+        ).fetchone()[0]
+
+    def count_by_status(self):
+        """Return {status: count} from the counter table"""
+        rows = self._connection().execute('SELECT status, count FROM task_counts WHERE count > 0').fetchall()
+        return dict(rows)
+
+    def maybe_evict(self):
+        """Run an eviction pass if the last one is older than evict_interval"""
+        if time.time() - self._last_eviction >= self.evict_interval:
+            self.evict_expired()
+
+    def evict_expired(self):
+        """Delete finished tasks older than the TTL; returns how many were removed"""
+        self._last_eviction = time.time()
+        cutoff = self._last_eviction - self.ttl
+
+        conn = self._transaction()
+        try:
+            rows = conn.execute(
+                'SELECT status, COUNT(*) FROM tasks WHERE finished_at < ? GROUP BY status', (cutoff,)
+            ).fetchall()
+            conn.execute(
+                'DELETE FROM task_timelines WHERE task_id IN (SELECT id FROM tasks WHERE finished_at < ?)', (cutoff,)
+            )
+            conn.execute('DELETE FROM tasks WHERE finished_at < ?', (cutoff,))
+            for status, count in rows:
+                self._adjust_count(conn, status, -count)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        evicted = sum(count for _, count in rows)
+        if evicted:
+            print(f"Evicted {evicted} finished task(s) older than {self.ttl}s")
+        return evicted
@@ -1,418 +1,1598 @@
-import cv2
-import numpy as np
-from PIL import Image
-import os
-from pptx import Presentation
-from pptx.util import Inches
-import tempfile
-import shutil
-from skimage.metrics import structural_similarity as ssim
-import yt_dlp
-import re
-from urllib.parse import urlparse
-
-class VideoToPPTConverter:
-    def __init__(self, similarity_threshold=0.95, min_frame_interval=30):
-        """
-        Initialize the converter
-        
-        Args:
-            similarity_threshold: Threshold for frame similarity (0-1, higher = more similar)
-            min_frame_interval: Minimum frames between captures to avoid duplicates
-        """
-        self.similarity_threshold = similarity_threshold
-        self.min_frame_interval = min_frame_interval
-        
-    def is_youtube_url(self, url):
-        """
-        Check if the provided string is a YouTube URL
-        
-        Args:
-            url: String to check
-            
-        Returns:
-            Boolean indicating if it's a YouTube URL
-        """
-        youtube_patterns = [
-            r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtu\.be/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/embed/[\w-]+',
-            r'(?:https?://)?(?:www\.)?youtube\.com/v/[\w-]+'
-        ]
-        
-        for pattern in youtube_patterns:
-            if re.match(pattern, url):
-                return True
-        return False
-    
-    def download_youtube_video(self, youtube_url, output_dir="temp_downloads"):
-        """
-        Download YouTube video using yt-dlp
-        
-        Args:
-            youtube_url: YouTube video URL
-            output_dir: Directory to save downloaded video
-            
-        Returns:
-            Path to downloaded video file
-        """
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Configure yt-dlp options
-        ydl_opts = {
-            'format': 'best[height<=720]',  # Download max 720p to save space
-            'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-            'quiet': False,
-            'no_warnings': False,
-        }
-        
-        print(f"Downloading video from: {youtube_url}")
-        
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                # Extract video info
-                info = ydl.extract_info(youtube_url, download=False)
-                video_title = info.get('title', 'video')
-                duration = info.get('duration', 0)
-                
-                print(f"Video: {video_title}")
-                print(f"Duration: {duration//60}:{duration%60:02d}")
-                
-                # Download the video
-                ydl.download([youtube_url])
-                
-                # Find the downloaded file
-                for file in os.listdir(output_dir):
-                    if file.startswith(video_title.replace('/', '_')):
-                        return os.path.join(output_dir, file)
-                
-                # If exact match not found, return the most recent file
-                files = [os.path.join(output_dir, f) for f in os.listdir(output_dir)]
-                if files:
-                    return max(files, key=os.path.getctime)
-                
-        except Exception as e:
-            print(f"Error downloading video: {e}")
-            raise Exception(f"Failed to download YouTube video: {e}")
-        
-    def extract_video_id(self, youtube_url):
-        """
-        Extract video ID from YouTube URL for filename
-        
-        Args:
-            youtube_url: YouTube URL
-            
-        Returns:
-            Video ID string
-        """
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed\/)([0-9A-Za-z_-]{11})',
-            r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, youtube_url)
-            if match:
-                return match.group(1)
-        
-        return "unknown_video"
-        
-    def extract_key_frames(self, video_path, output_dir="temp_frames"):
-        """
-        Extract key frames when significant changes occur
-        
-        Args:
-            video_path: Path to the input video file
-            output_dir: Directory to save extracted frames
-            
-        Returns:
-            List of frame file paths
-        """
-        # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Open video
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise Exception(f"Error opening video file: {video_path}")
-            
-        frame_paths = []
-        prev_frame = None
-        frame_count = 0
-        saved_count = 0
-        last_saved_frame = -self.min_frame_interval
-        
-        print("Extracting key frames...")
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            # Convert to grayscale for comparison
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Check if this is the first frame or significantly different
-            is_key_frame = False
-            
-            if prev_frame is None:
-                is_key_frame = True
-            elif frame_count - last_saved_frame >= self.min_frame_interval:
-                # Calculate similarity with previous saved frame
-                similarity = ssim(prev_frame, gray_frame)
-                if similarity < self.similarity_threshold:
-                    is_key_frame = True
-            
-            if is_key_frame:
-                # Save frame
-                frame_filename = f"frame_{saved_count:04d}.png"
-                frame_path = os.path.join(output_dir, frame_filename)
-                cv2.imwrite(frame_path, frame)
-                frame_paths.append(frame_path)
-                
-                prev_frame = gray_frame.copy()
-                last_saved_frame = frame_count
-                saved_count += 1
-                
-                print(f"Saved frame {saved_count} at {frame_count}/{int(cap.get(cv2.CAP_PROP_FRAME_COUNT))}")
-            
-            frame_count += 1
-            
-            # Optional: Show progress for long videos
-            if frame_count % 100 == 0:
-                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-                progress = (frame_count / total_frames) * 100
-                print(f"Progress: {progress:.1f}% ({frame_count}/{total_frames})")
-        
-        cap.release()
-        print(f"Extracted {len(frame_paths)} key frames")
-        return frame_paths
-    
-    def create_presentation(self, frame_paths, output_ppt="video_presentation.pptx"):
-        """
-        Create PowerPoint presentation from extracted frames
-        
-        Args:
-            frame_paths: List of frame image paths
-            output_ppt: Output PowerPoint file path
-        """
-        print("Creating PowerPoint presentation...")
-        
-        # Create presentation
-        prs = Presentation()
-        
-        # Set slide dimensions (16:9)
-        prs.slide_width = Inches(13.33)
-        prs.slide_height = Inches(7.5)
-        
-        for i, frame_path in enumerate(frame_paths):
-            # Add slide
-            slide_layout = prs.slide_layouts[6]  # Blank layout
-            slide = prs.slides.add_slide(slide_layout)
-            
-            # Add image to slide
-            img = Image.open(frame_path)
-            
-            # Calculate dimensions to fit slide while maintaining aspect ratio
-            slide_width = prs.slide_width
-            slide_height = prs.slide_height
-            
-            img_width, img_height = img.size
-            img_ratio = img_width / img_height
-            slide_ratio = slide_width / slide_height
-            
-            if img_ratio > slide_ratio:
-                # Image is wider than slide ratio
-                width = slide_width
-                height = slide_width / img_ratio
-                left = 0
-                top = (slide_height - height) / 2
-            else:
-                # Image is taller than slide ratio
-                height = slide_height
-                width = slide_height * img_ratio
-                left = (slide_width - width) / 2
-                top = 0
-            
-            # Add image to slide
-            slide.shapes.add_picture(frame_path, left, top, width, height)
-            
-            print(f"Added slide {i+1}/{len(frame_paths)}")
-        
-        # Save presentation
-        prs.save(output_ppt)
-        print(f"Presentation saved as: {output_ppt}")
-        
-        return output_ppt
-    
-    def process_video(self, video_input, output_ppt=None, cleanup_temp=True):
-        """
-        Complete process: download (if URL), extract frames and create PPT
-        
-        Args:
-            video_input: YouTube URL or path to local video file
-            output_ppt: Path for output PowerPoint (if None, saves in script directory)
-            cleanup_temp: Whether to delete temporary files
-        """
-        # Set default output path to script directory if not specified
-        if output_ppt is None:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Create a meaningful filename based on input
-            if self.is_youtube_url(video_input):
-                # Extract video ID from YouTube URL for filename
-                video_id = self.extract_video_id(video_input)
-                output_ppt = os.path.join(script_dir, f"youtube_{video_id}_slides.pptx")
-            else:
-                # Use local video filename
-                video_name = os.path.splitext(os.path.basename(video_input))[0]
-                output_ppt = os.path.join(script_dir, f"{video_name}_slides.pptx")
-        
-        temp_dir = tempfile.mkdtemp(prefix="video_frames_")
-        download_dir = None
-        video_path = video_input
-        
-        try:
-            # Check if input is YouTube URL
-            if self.is_youtube_url(video_input):
-                download_dir = tempfile.mkdtemp(prefix="youtube_download_")
-                video_path = self.download_youtube_video(video_input, download_dir)
-                print(f"Downloaded to: {video_path}")
-            elif not os.path.exists(video_input):
-                raise Exception(f"Video file not found: {video_input}")
-            
-            # Extract key frames
-            frame_paths = self.extract_key_frames(video_path, temp_dir)
-            
-            if not frame_paths:
-                raise Exception("No frames were extracted from the video")
-            
-            # Create presentation
-            self.create_presentation(frame_paths, output_ppt)
-            
-            print(f"Successfully created presentation with {len(frame_paths)} slides")
-            print(f"Saved to: {os.path.abspath(output_ppt)}")
-            
-            return output_ppt
-            
-        finally:
-            # Cleanup temporary files
-            if cleanup_temp:
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
-                    print("Cleaned up temporary frame files")
-                    
-                if download_dir and os.path.exists(download_dir):
-                    shutil.rmtree(download_dir)
-                    print("Cleaned up downloaded video files")
-
-# Usage example and configuration options
-def main():
-    """
-    Main function with usage examples
-    """
-    # Initialize converter with custom settings
-    converter = VideoToPPTConverter(
-        similarity_threshold=0.90,  # Adjust sensitivity (lower = more slides)
-        min_frame_interval=30       # Minimum frames between captures (higher = fewer slides)
-    )
-    
-    # Example inputs - you can use either YouTube URLs or local files
-    examples = [
-        "https://www.youtube.com/watch?v=pFze1OkCx30",  # YouTube URL
-        "https://youtu.be/VIDEO_ID",                     # Short YouTube URL
-        "local_video.mp4"                               # Local file path
-    ]
-    
-    # Choose your input
-    video_input = "https://www.youtube.com/watch?v=8_frhkUWErs"  # Replace with your URL/path
-    # output_ppt will be automatically set to script directory if not specified
-    
-    try:
-        print("Starting video processing...")
-        print(f"Input: {video_input}")
-        
-        # Process video - output_ppt=None means save in script directory
-        output_file = converter.process_video(video_input, output_ppt=None)
-        print(f"Success! Presentation saved as: {output_file}")
-        
-        # Additional processing suggestions
-        print("\nNext steps:")
-        print(f"1. Open {os.path.basename(output_file)} to review the slides")
-        print("2. Use the OCR extractor to get text from slides")
-        print("3. Run: python ppt_ocr_extractor.py")
-        
-    except Exception as e:
-        print(f"Error: {e}")
-        print("\nTroubleshooting tips:")
-        print("1. Check your internet connection for YouTube videos")
-        print("2. Make sure the YouTube URL is valid and accessible")
-        print("3. For local files, ensure the file exists and is readable")
-        print("4. Install required packages: pip install yt-dlp")
-        print("5. Try adjusting similarity_threshold (0.85-0.98)")
-
-# Additional utility functions
-def download_youtube_only(youtube_url, output_dir="downloads"):
-    """
-    Utility function to just download a YouTube video
-    """
-    converter = VideoToPPTConverter()
-    return converter.download_youtube_video(youtube_url, output_dir)
-
-def process_multiple_videos(video_list, output_dir=None):
-    """
-    Process multiple videos (URLs or files) into separate presentations
-    """
-    # If no output directory specified, use script directory
-    if output_dir is None:
-        output_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    os.makedirs(output_dir, exist_ok=True)
-    converter = VideoToPPTConverter(similarity_threshold=0.90, min_frame_interval=30)
-    
-    results = []
-    for i, video_input in enumerate(video_list):
-        try:
-            output_name = f"presentation_{i+1:02d}.pptx"
-            output_path = os.path.join(output_dir, output_name)
-            
-            print(f"\nProcessing {i+1}/{len(video_list)}: {video_input}")
-            converter.process_video(video_input, output_path)
-            
-            results.append({
-                'input': video_input,
-                'output': output_path,
-                'status': 'success'
-            })
-            
-        except Exception as e:
-            print(f"Failed to process {video_input}: {e}")
-            results.append({
-                'input': video_input,
-                'output': None,
-                'status': f'failed: {e}'
-            })
-    
-    return results
-
-if __name__ == "__main__":
-    main()
-
-# Installation requirements:
-"""
-Required packages:
-pip install opencv-python python-pptx pillow scikit-image yt-dlp numpy
-
-Additional notes:
-- yt-dlp is the modern replacement for youtube-dl
-- For older systems, you might need: pip install youtube-dl (less reliable)
-- Make sure you have sufficient disk space for video downloads
-- Some YouTube videos may be restricted by region or privacy settings
-
-Usage examples:
-1. YouTube URL: "https://www.youtube.com/watch?v=VIDEO_ID"
-2. Short URL: "https://youtu.be/VIDEO_ID"  
-3. Local file: "/path/to/video.mp4"
-4. Playlist: Use process_multiple_videos() with list of URLs
+import cv2
+import numpy as np
+from PIL import Image
+import os
+from pptx import Presentation
+from pptx.util import Inches
+import shutil
+import tempfile
+from skimage.metrics import structural_similarity as ssim
+import yt_dlp
+import re
+import sys
+import json
+import argparse
+import threading
+import time
+import cProfile
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from scratch import ScratchLimitExceeded, job_limit_bytes, make_scratch_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: checkpoints are only written by one process there
+    fcntl = None
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported there
+    resource = None
+
+# Seconds a fully enumerated playlist stays cached (keyed by playlist ID)
+PLAYLIST_CACHE_TTL = int(os.environ.get('PLAYLIST_CACHE_TTL', 600))
+
+# Videos downloaded ahead of the extraction workers, and the disk they may use
+PREFETCH_DEPTH = int(os.environ.get('PREFETCH_DEPTH', 2))
+PREFETCH_DISK_BUDGET_MB = int(os.environ.get('PREFETCH_DISK_BUDGET_MB', 2048))
+
+# Write a cProfile profile of every conversion into this directory (off when unset)
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+
+class PlaylistCache:
+    """
+    In-process cache of fully enumerated playlists, keyed by playlist ID
+    
+    Used by converters that are not given a cache shared between processes
+    (see playlist_cache.SharedPlaylistCache for the web app's).
+    """
+    
+    def __init__(self, ttl=PLAYLIST_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, playlist_id):
+        """Return the cached playlist info, or None if not cached or expired"""
+        with self._lock:
+            cached = self._entries.get(playlist_id)
+            if not cached:
+                return None
+            if time.time() - cached['cached_at'] > self.ttl:
+                del self._entries[playlist_id]
+                return None
+            return {**cached['info'], 'entries': list(cached['info']['entries'])}
+    
+    def put(self, playlist_id, info):
+        """Store a playlist's info including all of its entries"""
+        with self._lock:
+            self._entries[playlist_id] = {'cached_at': time.time(), 'info': info}
+
+_playlist_cache = PlaylistCache()
+
+class JobCancelled(Exception):
+    """Raised inside a conversion when its cancel check reports that the job was cancelled"""
+
+class VideoToPPTConverter:
+    def __init__(self, similarity_threshold=0.95, min_frame_interval=30, progress_callback=None,
+                 progress_interval=1.0, cancel_check=None, cancel_interval=0.5, profile_dir=None,
+                 profile_name=None, playlist_cache=None, measure_memory=True):
+        """
+        Initialize the converter
+        
+        Args:
+            similarity_threshold: Threshold for frame similarity (0-1, higher = more similar)
+            min_frame_interval: Minimum frames between captures to avoid duplicates
+            progress_callback: Called with a dict describing download, extraction
+                and assembly progress (see report_progress)
+            progress_interval: Minimum seconds between progress calls per stage
+            cancel_check: Called without arguments while converting; returning
+                True stops the conversion with JobCancelled
+            cancel_interval: Minimum seconds between cancel_check calls
+            profile_dir: Directory for a cProfile dump of each conversion
+                (None = PROFILE_DIR; profiling is off if neither is set)
+            profile_name: Prefix of the profile file names (default: the
+                output file name)
+            playlist_cache: Cache for enumerated playlists with get(playlist_id)
+                and put(playlist_id, info) (default: one per process)
+            measure_memory: Record each stage's peak memory. The peak is
+                per process, so turn this off for converters that run in
+                threads next to others (e.g. concurrent downloads).
+        """
+        self.similarity_threshold = similarity_threshold
+        self.min_frame_interval = min_frame_interval
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self._last_report = {}
+        self.cancel_check = cancel_check
+        self.cancel_interval = cancel_interval
+        self._last_cancel_check = 0
+        # Measurements of the last conversion: download_seconds, download_bytes,
+        # frames_decoded, ssim_calls, key_frames, encode_seconds, frame_bytes
+        # and assemble_seconds
+        self.stats = {}
+        # Stages of the last conversion in order (see timed_stage)
+        self.timeline = []
+        self._timeline_started = None
+        self.profile_dir = profile_dir or PROFILE_DIR
+        self.profile_name = profile_name
+        self.profile_path = None
+        self.playlist_cache = playlist_cache or _playlist_cache
+        self.measure_memory = measure_memory
+    
+    @contextmanager
+    def timed_stage(self, stage, **fields):
+        """
+        Record a stage of the conversion in the timeline
+        
+        The entry holds the stage name, its start (seconds after the first
+        stage), its duration, the peak resident memory of this process
+        during the stage (since process start where the OS cannot reset
+        the peak; None unless measure_memory is on) and any counters the
+        caller adds to the yielded dict. Stages that raise are recorded
+        with interrupted=True.
+        
+        Args:
+            stage: download, probe, extract, encode, assemble, save or cleanup
+            **fields: Initial counters for the entry
+        """
+        if self.measure_memory:
+            _reset_peak_rss()
+        started_at = time.time()
+        if self._timeline_started is None:
+            self._timeline_started = started_at
+        entry = {'stage': stage, **fields}
+        try:
+            yield entry
+        except BaseException:
+            entry['interrupted'] = True
+            raise
+        finally:
+            entry['offset'] = round(started_at - self._timeline_started, 3)
+            entry['seconds'] = round(time.time() - started_at, 3)
+            entry['peak_rss_mb'] = _peak_rss_mb() if self.measure_memory else None
+            self.timeline.append(entry)
+    
+    @contextmanager
+    def profiled(self, output_ppt):
+        """Run the enclosed conversion under cProfile if profiling is on, dumping the profile afterwards"""
+        self.profile_path = None
+        if not self.profile_dir:
+            yield
+            return
+        
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            name = self.profile_name or os.path.splitext(os.path.basename(output_ppt))[0]
+            os.makedirs(self.profile_dir, exist_ok=True)
+            self.profile_path = os.path.join(
+                self.profile_dir, f"{name}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}.prof"
+            )
+            profiler.dump_stats(self.profile_path)
+            print(f"Profile written to: {self.profile_path} (view with python -m pstats)")
+    
+    def report_progress(self, stage, force=False, **fields):
+        """
+        Send a throttled progress update to the progress callback
+        
+        Stages and their fields:
+            download: downloaded_bytes, total_bytes
+            extract: frames_scanned, total_frames, slides_found
+            assemble: slides_written, total_slides
+        
+        Args:
+            stage: Stage name
+            force: Report even if the last report for this stage was recent
+            **fields: Stage-specific counters
+        """
+        if not self.progress_callback:
+            return
+        
+        now = time.time()
+        if not force and now - self._last_report.get(stage, 0) < self.progress_interval:
+            return
+        self._last_report[stage] = now
+        
+        self.progress_callback({'stage': stage, **fields})
+    
+    def is_cancelled(self, force=False):
+        """
+        Ask the cancel check whether the job was cancelled
+        
+        Calls are throttled to one per cancel_interval (the check may hit a
+        database), so this is cheap enough to call for every frame.
+        
+        Args:
+            force: Call the cancel check even if it was called recently
+        """
+        if not self.cancel_check:
+            return False
+        
+        now = time.time()
+        if not force and now - self._last_cancel_check < self.cancel_interval:
+            return False
+        self._last_cancel_check = now
+        
+        return bool(self.cancel_check())
+    
+    def check_cancelled(self, force=False):
+        """Raise JobCancelled if the job was cancelled (see is_cancelled)"""
+        if self.is_cancelled(force):
+            raise JobCancelled("Conversion was cancelled")
+        
+    def is_youtube_url(self, url):
+        """
+        Check if the provided string is a YouTube URL
+        
+        Args:
+            url: String to check
+            
+        Returns:
+            Boolean indicating if it's a YouTube URL
+        """
+        youtube_patterns = [
+            r'(?:https?://)?(?:www\.)?youtube\.com/watch\?v=[\w-]+',
+            r'(?:https?://)?(?:www\.)?youtu\.be/[\w-]+',
+            r'(?:https?://)?(?:www\.)?youtube\.com/embed/[\w-]+',
+            r'(?:https?://)?(?:www\.)?youtube\.com/v/[\w-]+'
+        ]
+        
+        for pattern in youtube_patterns:
+            if re.match(pattern, url):
+                return True
+        return False
+    
+    def is_remote_url(self, url):
+        """
+        Check if the input has to be downloaded (YouTube or any other http(s) URL)
+        
+        Args:
+            url: String to check
+            
+        Returns:
+            Boolean indicating if it's a URL rather than a local path
+        """
+        return self.is_youtube_url(url) or urlparse(url).scheme in ('http', 'https')
+    
+    def download_youtube_video(self, youtube_url, output_dir="temp_downloads"):
+        """
+        Download YouTube video using yt-dlp
+        
+        Args:
+            youtube_url: YouTube video URL (other URLs yt-dlp supports work too)
+            output_dir: Directory to save downloaded video
+            
+        Returns:
+            Path to downloaded video file
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Configure yt-dlp options
+        ydl_opts = {
+            'format': 'best[height<=?720]',  # Download max 720p to save space (any size if unknown)
+            'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
+            'quiet': False,
+            'no_warnings': False,
+            'progress_hooks': [self._download_progress_hook],
+        }
+        if job_limit_bytes():
+            ydl_opts['max_filesize'] = job_limit_bytes()
+        
+        print(f"Downloading video from: {youtube_url}")
+        
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                # Extract video info
+                info = ydl.extract_info(youtube_url, download=False)
+                video_title = info.get('title', 'video')
+                duration = int(info.get('duration') or 0)  # Unknown for some non-YouTube sources
+                
+                print(f"Video: {video_title}")
+                print(f"Duration: {duration//60}:{duration%60:02d}")
+                
+                # Download the video
+                ydl.download([youtube_url])
+                
+                # Find the downloaded file
+                for file in os.listdir(output_dir):
+                    if file.startswith(video_title.replace('/', '_')):
+                        return os.path.join(output_dir, file)
+                
+                # If exact match not found, return the most recent file
+                files = [os.path.join(output_dir, f) for f in os.listdir(output_dir)]
+                if files:
+                    return max(files, key=os.path.getctime)
+                
+        except JobCancelled:
+            raise
+        except Exception as e:
+            print(f"Error downloading video: {e}")
+            raise Exception(f"Failed to download YouTube video: {e}")
+        
+    def probe_video(self, video_input):
+        """
+        Read the details of a video without downloading or decoding it
+        
+        Args:
+            video_input: Video URL or path to local video file
+            
+        Returns:
+            Dict with duration, width, height and filesize (of the format that
+            would be downloaded, for URLs); values may be None
+        """
+        if not self.is_remote_url(video_input):
+            cap = cv2.VideoCapture(video_input)
+            if not cap.isOpened():
+                raise Exception(f"Error opening video file: {video_input}")
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+            details = {
+                'duration': frames / fps if fps and frames > 0 else None,
+                'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None,
+                'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None,
+                'filesize': os.path.getsize(video_input),
+            }
+            cap.release()
+            return details
+        
+        ydl_opts = {
+            'format': 'best[height<=?720]',
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+            'socket_timeout': 10,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(video_input, download=False)
+        return {
+            'duration': info.get('duration'),
+            'width': info.get('width'),
+            'height': info.get('height'),
+            'filesize': info.get('filesize') or info.get('filesize_approx'),
+        }
+        
+    def _download_progress_hook(self, status):
+        # Raising here aborts the download; the caller removes the partial file
+        self.check_cancelled()
+        if status.get('status') not in ('downloading', 'finished'):
+            return
+        downloaded = status.get('downloaded_bytes') or 0
+        self.report_progress(
+            'download',
+            force=status['status'] == 'finished',
+            downloaded_bytes=downloaded,
+            total_bytes=status.get('total_bytes') or status.get('total_bytes_estimate') or downloaded
+        )
+        
+    def extract_video_id(self, youtube_url):
+        """
+        Extract video ID from YouTube URL for filename
+        
+        Args:
+            youtube_url: YouTube URL
+            
+        Returns:
+            Video ID string
+        """
+        patterns = [
+            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
+            r'(?:embed\/)([0-9A-Za-z_-]{11})',
+            r'(?:youtu\.be\/)([0-9A-Za-z_-]{11})'
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, youtube_url)
+            if match:
+                return match.group(1)
+        
+        return "unknown_video"
+        
+    def extract_key_frames(self, video_path, output_dir="temp_frames"):
+        """
+        Extract key frames when significant changes occur
+        
+        Args:
+            video_path: Path to the input video file
+            output_dir: Directory to save extracted frames
+            
+        Returns:
+            List of frame file paths
+        """
+        # Create output directory
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Open video
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Error opening video file: {video_path}")
+            
+        frame_paths = []
+        prev_frame = None
+        frame_count = 0
+        saved_count = 0
+        ssim_calls = 0
+        encode_seconds = 0
+        last_saved_frame = -self.min_frame_interval
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_bytes = 0
+        scratch_limit = job_limit_bytes()
+        
+        print("Extracting key frames...")
+        
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+                
+            # Convert to grayscale for comparison
+            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            
+            # Check if this is the first frame or significantly different
+            is_key_frame = False
+            
+            if prev_frame is None:
+                is_key_frame = True
+            elif frame_count - last_saved_frame >= self.min_frame_interval:
+                # Calculate similarity with previous saved frame
+                similarity = ssim(prev_frame, gray_frame)
+                ssim_calls += 1
+                if similarity < self.similarity_threshold:
+                    is_key_frame = True
+            
+            if is_key_frame:
+                # Save frame
+                frame_filename = f"frame_{saved_count:04d}.png"
+                frame_path = os.path.join(output_dir, frame_filename)
+                encode_started_at = time.time()
+                cv2.imwrite(frame_path, frame)
+                encode_seconds += time.time() - encode_started_at
+                frame_paths.append(frame_path)
+                
+                # Stop before the frames fill the scratch space
+                frame_bytes += os.path.getsize(frame_path)
+                if scratch_limit and frame_bytes > scratch_limit:
+                    cap.release()
+                    raise ScratchLimitExceeded(
+                        f"Extracted frames exceed the scratch limit of {scratch_limit // (1024 * 1024)} MB"
+                    )
+                
+                prev_frame = gray_frame.copy()
+                last_saved_frame = frame_count
+                saved_count += 1
+                
+                print(f"Saved frame {saved_count} at {frame_count}/{total_frames}")
+            
+            frame_count += 1
+            if self.is_cancelled():
+                cap.release()
+                raise JobCancelled("Conversion was cancelled")
+            self.report_progress(
+                'extract',
+                frames_scanned=frame_count,
+                total_frames=total_frames,
+                slides_found=saved_count
+            )
+            
+            # Optional: Show progress for long videos
+            if frame_count % 100 == 0 and total_frames:
+                progress = (frame_count / total_frames) * 100
+                print(f"Progress: {progress:.1f}% ({frame_count}/{total_frames})")
+        
+        cap.release()
+        self.stats.update(
+            frames_decoded=frame_count,
+            ssim_calls=ssim_calls,
+            key_frames=saved_count,
+            encode_seconds=encode_seconds,
+            frame_bytes=frame_bytes
+        )
+        self.report_progress(
+            'extract',
+            force=True,
+            frames_scanned=frame_count,
+            total_frames=max(total_frames, frame_count),
+            slides_found=saved_count
+        )
+        print(f"Extracted {len(frame_paths)} key frames")
+        return frame_paths
+    
+    def create_presentation(self, frame_paths, output_ppt="video_presentation.pptx"):
+        """
+        Create PowerPoint presentation from extracted frames
+        
+        Args:
+            frame_paths: List of frame image paths
+            output_ppt: Output PowerPoint file path
+        """
+        print("Creating PowerPoint presentation...")
+        started_at = time.time()
+        
+        # Create presentation
+        prs = Presentation()
+        
+        # Set slide dimensions (16:9)
+        prs.slide_width = Inches(13.33)
+        prs.slide_height = Inches(7.5)
+        
+        with self.timed_stage('assemble', slides=len(frame_paths)):
+            for i, frame_path in enumerate(frame_paths):
+                self.check_cancelled()
+                
+                # Add slide
+                slide_layout = prs.slide_layouts[6]  # Blank layout
+                slide = prs.slides.add_slide(slide_layout)
+                
+                # Add image to slide
+                img = Image.open(frame_path)
+                
+                # Calculate dimensions to fit slide while maintaining aspect ratio
+                slide_width = prs.slide_width
+                slide_height = prs.slide_height
+                
+                img_width, img_height = img.size
+                img_ratio = img_width / img_height
+                slide_ratio = slide_width / slide_height
+                
+                if img_ratio > slide_ratio:
+                    # Image is wider than slide ratio
+                    width = slide_width
+                    height = slide_width / img_ratio
+                    left = 0
+                    top = (slide_height - height) / 2
+                else:
+                    # Image is taller than slide ratio
+                    height = slide_height
+                    width = slide_height * img_ratio
+                    left = (slide_width - width) / 2
+                    top = 0
+                
+                # Add image to slide
+                slide.shapes.add_picture(frame_path, left, top, width, height)
+                
+                print(f"Added slide {i+1}/{len(frame_paths)}")
+                self.report_progress(
+                    'assemble',
+                    force=i + 1 == len(frame_paths),
+                    slides_written=i + 1,
+                    total_slides=len(frame_paths)
+                )
+        
+        # Save presentation
+        with self.timed_stage('save') as stage:
+            prs.save(output_ppt)
+            stage['bytes'] = os.path.getsize(output_ppt)
+        self.stats['assemble_seconds'] = time.time() - started_at
+        print(f"Presentation saved as: {output_ppt}")
+        
+        return output_ppt
+    
+    def process_video(self, video_input, output_ppt=None, cleanup_temp=True, downloaded=None):
+        """
+        Complete process: download (if URL), extract frames and create PPT
+        
+        Args:
+            video_input: YouTube URL or path to local video file
+            output_ppt: Path for output PowerPoint (if None, saves in script directory)
+            cleanup_temp: Whether to delete temporary files
+            downloaded: Result of download_ahead() for this input, if it was
+                already fetched (its download stage joins the timeline)
+            
+        Returns:
+            Path to the saved presentation. The stage timeline of the
+            conversion is in self.timeline, its counters in self.stats and
+            the profile (if profiling is on) at self.profile_path.
+        """
+        # Set default output path to script directory if not specified
+        if output_ppt is None:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            
+            # Create a meaningful filename based on input
+            if self.is_youtube_url(video_input):
+                # Extract video ID from YouTube URL for filename
+                video_id = self.extract_video_id(video_input)
+                output_ppt = os.path.join(script_dir, f"youtube_{video_id}_slides.pptx")
+            else:
+                # Use local video filename
+                video_name = os.path.splitext(os.path.basename(video_input))[0]
+                output_ppt = os.path.join(script_dir, f"{video_name}_slides.pptx")
+        
+        self.stats = dict(downloaded['stats']) if downloaded else {}
+        self.timeline = list(downloaded['timeline']) if downloaded else []
+        self._timeline_started = downloaded['started_at'] if downloaded else None
+        with self.profiled(output_ppt):
+            self.check_cancelled(force=True)
+            if downloaded:
+                video_path, download_dir = downloaded['video_path'], downloaded['download_dir']
+            else:
+                video_path, download_dir = self.fetch_video(video_input)
+            
+            try:
+                return self.convert_video_file(video_path, output_ppt, cleanup_temp)
+                
+            finally:
+                # Cleanup downloaded video
+                if cleanup_temp and download_dir and os.path.exists(download_dir):
+                    with self.timed_stage('cleanup'):
+                        shutil.rmtree(download_dir)
+                    print("Cleaned up downloaded video files")
+    
+    def fetch_video(self, video_input):
+        """
+        Make a video available locally, downloading it first if it is a URL
+        
+        Args:
+            video_input: YouTube (or other yt-dlp supported) URL or path to local video file
+            
+        Returns:
+            Tuple of (local video path, download directory or None for local files)
+        """
+        if self.is_remote_url(video_input):
+            download_dir = make_scratch_dir('youtube_download')
+            started_at = time.time()
+            try:
+                with self.timed_stage('download') as stage:
+                    video_path = self.download_youtube_video(video_input, download_dir)
+                    if video_path:
+                        stage['bytes'] = os.path.getsize(video_path)
+            except Exception:
+                shutil.rmtree(download_dir, ignore_errors=True)
+                raise
+            if not video_path:
+                shutil.rmtree(download_dir, ignore_errors=True)
+                raise Exception(f"No video file was downloaded for: {video_input} "
+                                f"(videos larger than the scratch limit are skipped)")
+            self.stats.update(download_seconds=time.time() - started_at, download_bytes=os.path.getsize(video_path))
+            print(f"Downloaded to: {video_path}")
+            return video_path, download_dir
+        
+        if not os.path.exists(video_input):
+            raise Exception(f"Video file not found: {video_input}")
+        return video_input, None
+    
+    def download_ahead(self, video_input):
+        """
+        Fetch a video now for a later process_video() call
+        
+        Args:
+            video_input: YouTube (or other yt-dlp supported) URL or path to local video file
+            
+        Returns:
+            Dict with video_path, download_dir (None for local files), bytes
+            (downloaded), started_at, stats and timeline, to be passed to
+            process_video(downloaded=...); the caller must remove
+            download_dir if the video is never processed
+        """
+        self.stats = {}
+        self.timeline = []
+        self._timeline_started = started_at = time.time()
+        video_path, download_dir = self.fetch_video(video_input)
+        return {
+            'video_path': video_path,
+            'download_dir': download_dir,
+            'bytes': self.stats.get('download_bytes', 0),
+            'started_at': started_at,
+            'stats': self.stats,
+            'timeline': self.timeline,
+        }
+    
+    def convert_video_file(self, video_path, output_ppt, cleanup_temp=True):
+        """
+        Extract key frames from a local video file and build the presentation
+        
+        Args:
+            video_path: Path to a local video file
+            output_ppt: Output PowerPoint file path
+            cleanup_temp: Whether to delete the extracted frame images
+            
+        Returns:
+            Path to the saved presentation
+        """
+        temp_dir = make_scratch_dir('video_frames')
+        
+        try:
+            # Duration, resolution and size, for the timeline
+            with self.timed_stage('probe') as stage:
+                stage.update(self.probe_video(video_path))
+            
+            # Extract key frames
+            with self.timed_stage('extract') as stage:
+                frame_paths = self.extract_key_frames(video_path, temp_dir)
+                stage.update(
+                    frames=self.stats['frames_decoded'],
+                    ssim_calls=self.stats['ssim_calls'],
+                    key_frames=self.stats['key_frames']
+                )
+            
+            # Key frames are PNG-encoded during extraction; their share is reported separately
+            self.timeline.append({
+                'stage': 'encode',
+                'within': 'extract',
+                'offset': stage['offset'],
+                'seconds': round(self.stats['encode_seconds'], 3),
+                'peak_rss_mb': stage['peak_rss_mb'],
+                'frames': self.stats['key_frames'],
+                'bytes': self.stats['frame_bytes'],
+            })
+            
+            if not frame_paths:
+                raise Exception("No frames were extracted from the video")
+            
+            # Create presentation
+            self.create_presentation(frame_paths, output_ppt)
+            
+            print(f"Successfully created presentation with {len(frame_paths)} slides")
+            print(f"Saved to: {os.path.abspath(output_ppt)}")
+            
+            return output_ppt
+            
+        finally:
+            # Cleanup temporary files
+            if cleanup_temp and os.path.exists(temp_dir):
+                with self.timed_stage('cleanup'):
+                    shutil.rmtree(temp_dir)
+                print("Cleaned up temporary frame files")
+    
+    def extract_playlist_id(self, playlist_url):
+        """
+        Extract playlist ID from a YouTube playlist URL for cache keys
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            
+        Returns:
+            Playlist ID string (the URL itself if no list= parameter is found)
+        """
+        query = parse_qs(urlparse(playlist_url).query)
+        if query.get('list'):
+            return query['list'][0]
+        return playlist_url
+    
+    def get_cached_playlist_info(self, playlist_url):
+        """
+        Return playlist info from the cache without touching the network
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            
+        Returns:
+            Playlist info dictionary, or None if not cached or expired
+        """
+        return self.playlist_cache.get(self.extract_playlist_id(playlist_url))
+    
+    def iter_playlist_entries(self, playlist_url, playlist_meta=None):
+        """
+        Lazily enumerate playlist entries with flat extraction
+        
+        Entries are yielded as YouTube's continuation pages arrive, so callers can
+        start working on the first videos before the whole playlist is listed. A
+        complete enumeration is stored in the playlist cache.
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            playlist_meta: Optional dict filled with id, title, uploader and
+                video_count as soon as the first page is known, and from_cache
+            
+        Yields:
+            Entry dicts with id, title, url and duration
+        """
+        if playlist_meta is None:
+            playlist_meta = {}
+        
+        cached = self.get_cached_playlist_info(playlist_url)
+        if cached:
+            playlist_meta.update({k: v for k, v in cached.items() if k != 'entries'}, from_cache=True)
+            yield from cached['entries']
+            return
+        playlist_meta['from_cache'] = False
+        
+        # Flat extraction only lists the entries; it never resolves each video
+        ydl_opts = {
+            'extract_flat': 'in_playlist',
+            'skip_download': True,
+            'quiet': True,
+            'no_warnings': True,
+        }
+        
+        entries = []
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                # process=False keeps the entries as a lazy page-by-page generator
+                info = ydl.extract_info(playlist_url, download=False, process=False)
+                while info.get('_type') in ('url', 'url_transparent'):
+                    info = ydl.extract_info(info['url'], download=False, process=False)
+                
+                playlist_meta.update({
+                    'id': info.get('id'),
+                    'title': info.get('title', 'Playlist'),
+                    'uploader': info.get('uploader') or info.get('channel') or 'Unknown',
+                    'video_count': info.get('playlist_count'),
+                })
+                
+                for entry in info.get('entries') or []:
+                    if not entry or not entry.get('id'):
+                        continue
+                    url = entry.get('url') or ''
+                    if not url.startswith('http'):
+                        url = f"https://www.youtube.com/watch?v={entry['id']}"
+                    entry = {
+                        'id': entry['id'],
+                        'title': entry.get('title') or entry['id'],
+                        'url': url,
+                        'duration': entry.get('duration'),
+                    }
+                    entries.append(entry)
+                    yield entry
+        except Exception as e:
+            raise Exception(f"Failed to read playlist: {e}")
+        
+        playlist_meta['video_count'] = len(entries)
+        self.playlist_cache.put(
+            self.extract_playlist_id(playlist_url),
+            {**{k: v for k, v in playlist_meta.items() if k != 'from_cache'}, 'entries': entries}
+        )
+    
+    def get_playlist_info(self, playlist_url, offset=0, limit=None):
+        """
+        Enumerate a YouTube playlist without fetching per-video metadata
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            offset: Index of the first entry to return
+            limit: Maximum number of entries to return (None = all). Only the
+                pages needed to fill the request are fetched.
+            
+        Returns:
+            Dictionary with playlist id, title, uploader, video_count and entries
+        """
+        playlist_meta = {}
+        entries = self.iter_playlist_entries(playlist_url, playlist_meta)
+        if limit is not None:
+            entries = islice(entries, offset, offset + limit)
+        else:
+            entries = islice(entries, offset, None)
+        entries = list(entries)
+        
+        return {
+            'id': playlist_meta.get('id'),
+            'title': playlist_meta.get('title', 'Playlist'),
+            'uploader': playlist_meta.get('uploader', 'Unknown'),
+            'video_count': playlist_meta.get('video_count') or offset + len(entries),
+            'entries': entries,
+        }
+    
+    def process_playlist(self, playlist_url, output_dir, max_videos=None, cleanup_temp=True,
+                         progress_callback=None, info_callback=None, max_downloads=3, max_workers=None,
+                         prefetch_depth=None, disk_budget_mb=None, checkpoint_path=None,
+                         conversion_progress=None):
+        """
+        Convert every video of a playlist into its own presentation
+        
+        Downloads run in a small thread pool while frame extraction and deck
+        assembly run in a separate process pool, so network and CPU work overlap.
+        Entries are streamed into the pipeline while the playlist is still being
+        enumerated.
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            output_dir: Directory for the generated presentations
+            max_videos: Maximum number of videos to process (None = all)
+            cleanup_temp: Whether to delete temporary files
+            progress_callback: Called with a dict for every per-video status change
+            info_callback: Called once with the playlist info when it is known
+            max_downloads: Number of concurrent downloads
+            max_workers: Number of extraction processes (None = CPU count)
+            prefetch_depth: Videos to download ahead of the workers (None = PREFETCH_DEPTH)
+            disk_budget_mb: Disk budget for prefetched videos (None = PREFETCH_DISK_BUDGET_MB)
+            checkpoint_path: JSON file recording finished videos; videos already
+                recorded there with the same settings are skipped
+            conversion_progress: Picklable callable receiving (index, progress dict)
+                from inside the extraction processes
+            
+        Returns:
+            Dictionary with playlist details, processed_videos, failed_videos and
+            pipeline metrics
+        """
+        checkpoint = None
+        if checkpoint_path:
+            checkpoint = self.open_checkpoint(checkpoint_path)
+            if checkpoint.completed:
+                print(f"Resuming from checkpoint: {len(checkpoint.completed)} videos already done")
+        playlist_meta = {}
+        
+        def on_progress(event):
+            if checkpoint and event['status'] == 'completed' and not event.get('resumed'):
+                checkpoint.mark_completed(event['input'], event['index'], event['title'], event['output_path'])
+            if progress_callback:
+                progress_callback(event)
+        
+        def total_hint():
+            count = playlist_meta.get('video_count')
+            if count and max_videos:
+                return min(count, max_videos)
+            return count
+        
+        metrics = {}
+        processed, failed = self.run_pipeline(
+            self.plan_playlist(playlist_url, output_dir, max_videos, checkpoint, info_callback, playlist_meta),
+            cleanup_temp=cleanup_temp,
+            progress_callback=on_progress,
+            max_downloads=max_downloads,
+            max_workers=max_workers,
+            total_hint=total_hint,
+            prefetch_depth=prefetch_depth,
+            disk_budget_mb=disk_budget_mb,
+            metrics=metrics,
+            conversion_progress=conversion_progress
+        )
+        
+        return {
+            'playlist_id': playlist_meta.get('id'),
+            'playlist_title': playlist_meta.get('title'),
+            'total_videos': len(processed) + len(failed),
+            'processed_videos': processed,
+            'failed_videos': failed,
+            'metrics': metrics,
+        }
+    
+    def open_checkpoint(self, checkpoint_path):
+        """Open the playlist checkpoint for this converter's settings"""
+        return PlaylistCheckpoint(checkpoint_path, {
+            'similarity_threshold': self.similarity_threshold,
+            'min_frame_interval': self.min_frame_interval,
+        })
+    
+    def plan_playlist(self, playlist_url, output_dir, max_videos=None, checkpoint=None, info_callback=None,
+                      playlist_meta=None):
+        """
+        Generate one job per playlist video as the playlist is enumerated
+        
+        Args:
+            playlist_url: YouTube playlist URL
+            output_dir: Directory for the generated presentations
+            max_videos: Maximum number of videos (None = all)
+            checkpoint: Optional PlaylistCheckpoint; videos recorded there are
+                yielded with resumed=True and their existing output_path
+            info_callback: Called once with the playlist info when it is known
+            playlist_meta: Optional dict filled with the playlist details
+            
+        Yields:
+            Job dicts with index, title, input, output_path and duration (see run_pipeline)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        
+        if playlist_meta is None:
+            playlist_meta = {}
+        entries = self.iter_playlist_entries(playlist_url, playlist_meta)
+        if max_videos:
+            entries = islice(entries, max_videos)
+        
+        for i, entry in enumerate(entries):
+            self.check_cancelled()
+            if i == 0:
+                print(f"Playlist: {playlist_meta.get('title')} ({playlist_meta.get('video_count') or '?'} videos)")
+                if info_callback:
+                    info_callback(dict(playlist_meta))
+            output_name = numbered_output_name(i, entry['title'])
+            job = {
+                'index': i,
+                'title': entry['title'],
+                'input': entry['url'],
+                'output_path': os.path.join(output_dir, output_name),
+                'duration': entry.get('duration'),
+            }
+            done = checkpoint.get(entry['url']) if checkpoint else None
+            if done:
+                job['output_path'] = done['output_path']
+                job['resumed'] = True
+            yield job
+    
+    def run_pipeline(self, jobs, cleanup_temp=True, progress_callback=None, max_downloads=3,
+                     max_workers=None, total_hint=None, prefetch_depth=None, disk_budget_mb=None,
+                     metrics=None, conversion_progress=None):
+        """
+        Run download and conversion for many videos concurrently
+        
+        Downloads are started just far enough ahead of the extraction workers to
+        keep them busy: enough to feed every idle worker plus ``prefetch_depth``
+        extra videos, as long as the downloaded-but-unconverted videos stay under
+        ``disk_budget_mb``.
+        
+        The converter's cancel_check is polled while the pipeline waits; once
+        it reports a cancellation, JobCancelled is raised and the conversions
+        still running in the extraction processes stop at their next check.
+        
+        Args:
+            jobs: Iterable of dicts with index, title, input (URL or path) and
+                output_path. It is consumed lazily as download slots free up.
+                Jobs flagged 'resumed' are reported as completed without work.
+            cleanup_temp: Whether to delete temporary files
+            progress_callback: Called with a dict for every per-video status change
+            max_downloads: Number of concurrent downloads
+            max_workers: Number of extraction processes (None = CPU count)
+            total_hint: Callable returning the expected job count, if known
+            prefetch_depth: Videos to download ahead of the workers (None = PREFETCH_DEPTH)
+            disk_budget_mb: Disk budget for prefetched videos (None = PREFETCH_DISK_BUDGET_MB)
+            metrics: Optional dict filled with network/CPU utilization figures
+            conversion_progress: Picklable callable receiving (index, progress dict)
+                from inside the extraction processes
+            
+        Returns:
+            Tuple of (processed jobs, failed jobs) in input order
+        """
+        processed = []
+        failed = []
+        seen_jobs = []
+        ready = []  # downloaded, waiting for an extraction worker
+        job_iter = iter(jobs)
+        exhausted = False
+        
+        max_downloads = max(1, max_downloads)
+        max_workers = max(1, max_workers or os.cpu_count() or 1)
+        prefetch_depth = PREFETCH_DEPTH if prefetch_depth is None else max(0, prefetch_depth)
+        disk_budget = (PREFETCH_DISK_BUDGET_MB if disk_budget_mb is None else disk_budget_mb) * 1024 * 1024
+        
+        download_pool = ThreadPoolExecutor(max_workers=max_downloads)
+        cpu_pool = None
+        pending = {}
+        tracker = _UtilizationTracker()
+        
+        # The extraction processes cannot call cancel_check; they watch for this
+        # marker file instead, which is created whenever the pipeline ends early
+        cancel_dir = tempfile.mkdtemp(prefix='pipeline_cancel_')
+        cancel_marker = os.path.join(cancel_dir, 'cancelled')
+        
+        def current_total():
+            if exhausted:
+                return len(seen_jobs)
+            hint = total_hint() if total_hint else None
+            return max(hint or 0, len(seen_jobs))
+        
+        def notify(job, status, **extra):
+            if progress_callback:
+                progress_callback({
+                    'index': job['index'],
+                    'title': job['title'],
+                    'input': job['input'],
+                    'status': status,
+                    'total': current_total(),
+                    'completed': len(processed),
+                    'failed': len(failed),
+                    **extra
+                })
+        
+        def count_stage(name):
+            return sum(1 for stage, _ in pending.values() if stage == name)
+        
+        def prefetched_bytes():
+            jobs_on_disk = ready + [job for stage, job in pending.values() if stage == 'convert']
+            return sum(job.get('video_bytes', 0) for job in jobs_on_disk)
+        
+        def fill_downloads():
+            nonlocal exhausted
+            downloading = count_stage('download')
+            while not exhausted and downloading < max_downloads:
+                converting = count_stage('convert')
+                buffered = downloading + len(ready)
+                if buffered >= (max_workers - converting) + prefetch_depth:
+                    break
+                if buffered + converting > 0 and prefetched_bytes() >= disk_budget:
+                    break
+                try:
+                    job = next(job_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    # Keep whatever was enumerated before the listing broke
+                    if not seen_jobs:
+                        raise
+                    print(f"Stopped reading inputs early: {e}")
+                    exhausted = True
+                    break
+                seen_jobs.append(job)
+                if job.get('resumed'):
+                    # Finished in an earlier run; nothing to download or extract
+                    processed.append({
+                        'index': job['index'],
+                        'title': job['title'],
+                        'input': job['input'],
+                        'output_path': job['output_path'],
+                        'resumed': True,
+                    })
+                    notify(job, 'completed', output_path=job['output_path'], resumed=True)
+                    continue
+                job['started_at'] = time.time()
+                notify(job, 'pending')
+                pending[download_pool.submit(self._download_in_thread, job['input'])] = ('download', job)
+                tracker.start('network')
+                downloading += 1
+        
+        def start_conversions():
+            nonlocal cpu_pool
+            while ready and count_stage('convert') < max_workers:
+                job = ready.pop(0)
+                if cpu_pool is None:
+                    cpu_pool = ProcessPoolExecutor(max_workers=max_workers)
+                conversion = cpu_pool.submit(
+                    _convert_video_file,
+                    self.similarity_threshold,
+                    self.min_frame_interval,
+                    job['video_path'],
+                    job['output_path'],
+                    cleanup_temp,
+                    partial(conversion_progress, job['index']) if conversion_progress else None,
+                    self.profile_dir,
+                    job['downloaded'],
+                    partial(os.path.exists, cancel_marker)
+                )
+                pending[conversion] = ('convert', job)
+                tracker.start('cpu')
+                notify(job, 'processing')
+        
+        try:
+            fill_downloads()
+            
+            while pending:
+                done, _ = wait(pending, timeout=self.cancel_interval if self.cancel_check else None,
+                               return_when=FIRST_COMPLETED)
+                self.check_cancelled(force=True)
+                
+                for future in done:
+                    stage, job = pending.pop(future)
+                    tracker.stop('network' if stage == 'download' else 'cpu')
+                    
+                    try:
+                        result = future.result()
+                    except JobCancelled:
+                        raise
+                    except Exception as e:
+                        print(f"Failed to process {job['input']}: {e}")
+                        self._cleanup_download(job, cleanup_temp)
+                        duration = round(time.time() - job['started_at'], 2)
+                        failed.append({
+                            'index': job['index'],
+                            'title': job['title'],
+                            'input': job['input'],
+                            'error': str(e),
+                            'duration': duration,
+                        })
+                        notify(job, 'failed', error=str(e), duration=duration)
+                        continue
+                    
+                    if stage == 'download':
+                        job['downloaded'] = result
+                        job['video_path'], job['download_dir'] = result['video_path'], result['download_dir']
+                        if job['download_dir']:
+                            job['video_bytes'] = os.path.getsize(job['video_path'])
+                            tracker.add_bytes(job['video_bytes'])
+                        ready.append(job)
+                    else:
+                        self._cleanup_download(job, cleanup_temp)
+                        duration = round(time.time() - job['started_at'], 2)
+                        processed.append({
+                            'index': job['index'],
+                            'title': job['title'],
+                            'input': job['input'],
+                            'output_path': job['output_path'],
+                            'duration': duration,
+                            'timeline': result,
+                        })
+                        notify(job, 'completed', output_path=job['output_path'], duration=duration, timeline=result)
+                
+                start_conversions()
+                fill_downloads()
+        finally:
+            # Nothing is running after a normal finish; otherwise stop what still is
+            open(cancel_marker, 'w').close()
+            download_pool.shutdown(wait=True, cancel_futures=True)
+            if cpu_pool is not None:
+                cpu_pool.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(cancel_dir, ignore_errors=True)
+            for job in seen_jobs:
+                self._cleanup_download(job, cleanup_temp)
+            
+            if metrics is not None:
+                metrics.update(tracker.summary(max_workers))
+                metrics['prefetch_depth'] = prefetch_depth
+        
+        processed.sort(key=lambda item: item['index'])
+        failed.sort(key=lambda item: item['index'])
+        return processed, failed
+    
+    def _download_in_thread(self, video_input):
+        """Download a pipeline input on a converter of its own, so concurrent downloads keep separate timelines"""
+        downloader = VideoToPPTConverter(
+            self.similarity_threshold,
+            self.min_frame_interval,
+            cancel_check=self.cancel_check,
+            measure_memory=False
+        )
+        return downloader.download_ahead(video_input)
+    
+    def _cleanup_download(self, job, cleanup_temp):
+        download_dir = job.pop('download_dir', None)
+        if cleanup_temp and download_dir and os.path.exists(download_dir):
+            shutil.rmtree(download_dir, ignore_errors=True)
+
+
+def _safe_filename(name, max_length=60):
+    """Turn a video title into a filesystem-safe filename fragment"""
+    cleaned = re.sub(r'[^\w\-]+', '_', name).strip('_')
+    return cleaned[:max_length] or "video"
+
+
+def numbered_output_name(index, title):
+    """Filename of the deck for the video at a 0-based position in a playlist or batch"""
+    return f"{index + 1:03d}_{_safe_filename(title)}.pptx"
+
+
+class PlaylistCheckpoint:
+    """
+    Per-video completion record stored as JSON next to a playlist's outputs
+    
+    Every finished video is written to disk immediately (atomically), so a job
+    killed midway can be restarted and skip the videos it already converted.
+    """
+    
+    def __init__(self, path, params):
+        """
+        Load an existing checkpoint, if any
+        
+        Args:
+            path: Checkpoint JSON file path
+            params: Conversion settings; entries made with other settings are ignored
+        """
+        self.path = path
+        self.params = params
+        self.completed = {}
+        
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.completed = json.load(f).get('completed', {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable checkpoint {path}: {e}")
+    
+    def get(self, key):
+        """Return the record for a finished video if it is still valid, else None"""
+        entry = self.completed.get(key)
+        if not entry or entry.get('params') != self.params:
+            return None
+        if not os.path.exists(entry['output_path']):
+            return None
+        return entry
+    
+    def mark_completed(self, key, index, title, output_path):
+        """Record a finished video and flush the checkpoint to disk
+        
+        Safe to call from several processes working on the same playlist:
+        the file is re-read and rewritten under an exclusive lock.
+        """
+        with open(f"{self.path}.lock", 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path) as f:
+                        self.completed.update(json.load(f).get('completed', {}))
+                except (OSError, ValueError):
+                    pass
+            
+            self.completed[key] = {
+                'index': index,
+                'title': title,
+                'output_path': output_path,
+                'params': self.params,
+                'completed_at': time.time(),
+            }
+            
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({'completed': self.completed}, f)
+            os.replace(temp_path, self.path)
+
+
+class _UtilizationTracker:
+    """Track how long the network and CPU stages are busy, and how much they overlap"""
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.last_change = self.started_at
+        self.active = {'network': 0, 'cpu': 0}
+        self.busy = {'network': 0.0, 'cpu': 0.0, 'overlap': 0.0, 'cpu_worker_seconds': 0.0}
+        self.bytes_downloaded = 0
+    
+    def _advance(self):
+        now = time.time()
+        elapsed = now - self.last_change
+        self.last_change = now
+        
+        if self.active['network']:
+            self.busy['network'] += elapsed
+        if self.active['cpu']:
+            self.busy['cpu'] += elapsed
+            self.busy['cpu_worker_seconds'] += elapsed * self.active['cpu']
+        if self.active['network'] and self.active['cpu']:
+            self.busy['overlap'] += elapsed
+    
+    def start(self, stage):
+        self._advance()
+        self.active[stage] += 1
+    
+    def stop(self, stage):
+        self._advance()
+        self.active[stage] -= 1
+    
+    def add_bytes(self, count):
+        self.bytes_downloaded += count
+    
+    def summary(self, max_workers):
+        self._advance()
+        wall_time = max(self.last_change - self.started_at, 1e-9)
+        return {
+            'wall_time': round(wall_time, 2),
+            'network_busy_time': round(self.busy['network'], 2),
+            'cpu_busy_time': round(self.busy['cpu'], 2),
+            'overlap_time': round(self.busy['overlap'], 2),
+            'network_utilization': round(self.busy['network'] / wall_time, 3),
+            'cpu_utilization': round(self.busy['cpu_worker_seconds'] / (wall_time * max_workers), 3),
+            'bytes_downloaded': self.bytes_downloaded,
+        }
+
+
+def _convert_video_file(similarity_threshold, min_frame_interval, video_path, output_ppt, cleanup_temp=True,
+                        progress_callback=None, profile_dir=None, downloaded=None, cancel_check=None):
+    """Process pool entry point: convert one downloaded video into a presentation
+    
+    ``downloaded`` is the download_ahead() result for the video; its
+    download stage starts the returned timeline. ``cancel_check`` must be
+    picklable (see run_pipeline's cancel marker).
+    
+    Returns:
+        The conversion's stage timeline
+    """
+    converter = VideoToPPTConverter(
+        similarity_threshold=similarity_threshold,
+        min_frame_interval=min_frame_interval,
+        progress_callback=progress_callback,
+        cancel_check=cancel_check,
+        profile_dir=profile_dir
+    )
+    if downloaded:
+        converter.stats = dict(downloaded['stats'])
+        converter.timeline = list(downloaded['timeline'])
+        converter._timeline_started = downloaded['started_at']
+    with converter.profiled(output_ppt):
+        converter.convert_video_file(video_path, output_ppt, cleanup_temp)
+    return converter.timeline
+
+# Command line entry point
+def main(argv=None):
+    """
+    Convert videos (URLs, local files or list files) from the command line
+    
+    Each finished item is written to stdout as one JSON line, followed by a
+    final summary line. Progress messages go to stderr.
+    
+    Examples:
+        python video_to_ppt_converter.py https://youtu.be/VIDEO_ID
+        python video_to_ppt_converter.py recordings/*.mp4 --jobs 8 -o decks/
+        python video_to_ppt_converter.py @archive_list.txt --jobs 4
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert videos into PowerPoint presentations of their key frames"
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help="YouTube URLs, video files, or list files (@list.txt or *.txt, one input per line)")
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help="Directory for the presentations (default: script directory)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Number of conversion processes (default: CPU count)")
+    parser.add_argument('-t', '--threshold', type=float, default=0.90,
+                        help="Similarity threshold, lower = more slides (default: 0.90)")
+    parser.add_argument('-i', '--interval', type=int, default=30,
+                        help="Minimum frames between slides (default: 30)")
+    parser.add_argument('--prefetch', type=int, default=None,
+                        help=f"Videos to download ahead of the workers (default: {PREFETCH_DEPTH})")
+    parser.add_argument('--profile-dir', default=None,
+                        help="Write a cProfile profile of every conversion to this directory")
+    args = parser.parse_args(argv)
+    
+    video_list = _expand_inputs(args.inputs)
+    if not video_list:
+        parser.error("no inputs to convert")
+    
+    # Keep stdout for JSON lines only: point fd 1 (inherited by the worker
+    # processes) at stderr so every progress print lands there instead
+    sys.stdout.flush()
+    results_stream = os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    
+    def emit(record):
+        results_stream.write(json.dumps(record) + "\n")
+    
+    started_at = time.time()
+    metrics = {}
+    results = process_multiple_videos(
+        video_list,
+        output_dir=args.output_dir,
+        max_workers=args.jobs,
+        prefetch_depth=args.prefetch,
+        similarity_threshold=args.threshold,
+        min_frame_interval=args.interval,
+        metrics=metrics,
+        result_callback=emit,
+        profile_dir=args.profile_dir
+    )
+    
+    succeeded = sum(1 for result in results if result['status'] == 'success')
+    emit({'summary': {
+        'total': len(results),
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded,
+        'wall_time': round(time.time() - started_at, 2),
+        'item_time': round(sum(result.get('duration') or 0 for result in results), 2),
+        'pipeline': metrics,
+    }})
+    results_stream.close()
+    
+    return 0 if succeeded == len(results) else 1
+
+def _reset_peak_rss():
+    """Restart this process's peak memory tracking where the OS allows it (Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB since the last reset (or since it started)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _expand_inputs(inputs):
+    """Expand list files (@file or *.txt) into their lines, keeping order"""
+    video_list = []
+    for item in inputs:
+        list_path = None
+        if item.startswith('@'):
+            list_path = item[1:]
+        elif item.lower().endswith('.txt') and os.path.isfile(item):
+            list_path = item
+        
+        if list_path is None:
+            video_list.append(item)
+            continue
+        
+        with open(list_path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    video_list.append(line)
+    return video_list
+
+# Additional utility functions
+def download_youtube_only(youtube_url, output_dir="downloads"):
+    """
+    Utility function to just download a YouTube video
+    """
+    converter = VideoToPPTConverter()
+    return converter.download_youtube_video(youtube_url, output_dir)
+
+def process_multiple_videos(video_list, output_dir=None, max_workers=None, prefetch_depth=None,
+                            disk_budget_mb=None, metrics=None, similarity_threshold=0.90,
+                            min_frame_interval=30, result_callback=None, profile_dir=None):
+    """
+    Process multiple videos (URLs or files) into separate presentations
+    
+    Videos go through the same concurrent pipeline as playlists: conversions run
+    in a pool of max_workers processes and the next download overlaps with
+    extraction of the current one. result_callback, if given, receives each
+    item's result as soon as it finishes; successful results include the
+    item's stage timeline. With profile_dir (or PROFILE_DIR) set, a cProfile
+    dump of every conversion is written there.
+    """
+    # If no output directory specified, use script directory
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    os.makedirs(output_dir, exist_ok=True)
+    converter = VideoToPPTConverter(
+        similarity_threshold=similarity_threshold,
+        min_frame_interval=min_frame_interval,
+        profile_dir=profile_dir
+    )
+    
+    jobs = []
+    for i, video_input in enumerate(video_list):
+        output_name = f"presentation_{i+1:02d}.pptx"
+        jobs.append({
+            'index': i,
+            'title': video_input,
+            'input': video_input,
+            'output_path': os.path.join(output_dir, output_name),
+        })
+    
+    def make_result(item):
+        if 'error' in item:
+            return {
+                'input': item['input'],
+                'output': None,
+                'status': f"failed: {item['error']}",
+                'duration': item.get('duration')
+            }
+        return {
+            'input': item['input'],
+            'output': item['output_path'],
+            'status': 'success',
+            'duration': item.get('duration'),
+            'timeline': item.get('timeline')
+        }
+    
+    def on_progress(event):
+        if event['status'] == 'processing':
+            print(f"\nProcessing {event['index']+1}/{len(video_list)}: {event['title']}")
+        elif result_callback and event['status'] in ('completed', 'failed'):
+            result_callback(make_result(event))
+    
+    processed, failed = converter.run_pipeline(
+        jobs,
+        progress_callback=on_progress,
+        max_workers=max_workers,
+        prefetch_depth=prefetch_depth,
+        disk_budget_mb=disk_budget_mb,
+        metrics=metrics
+    )
+    
+    results = [None] * len(jobs)
+    for item in processed + failed:
+        results[item['index']] = make_result(item)
+    
+    return results
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# Installation requirements:
+"""
+Required packages:
+pip install opencv-python python-pptx pillow scikit-image yt-dlp numpy
+
+Additional notes:
+- yt-dlp is the modern replacement for youtube-dl
+- For older systems, you might need: pip install youtube-dl (less reliable)
+- Make sure you have sufficient disk space for video downloads
+- Some YouTube videos may be restricted by region or privacy settings
+
+Usage examples:
+Command line:
+python video_to_ppt_converter.py INPUT [INPUT ...] [--jobs N] [-o OUTPUT_DIR]
+
+1. YouTube URL: "https://www.youtube.com/watch?v=VIDEO_ID"
+2. Short URL: "https://youtu.be/VIDEO_ID"  
+3. Local file: "/path/to/video.mp4"
+4. Playlist: Use converter.process_playlist(playlist_url, output_dir)
+5. Many videos: Use process_multiple_videos() with list of URLs
 """
\ No newline at end of file
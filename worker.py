@@ -0,0 +1,63 @@
+# worker.py - Runs conversion jobs apart from the web tier: python worker.py [--workers N]
+#
+# Claims jobs from the queue in the shared task database (TASK_DB_PATH) and
+# writes results to the shared outputs/ directory, so any number of workers
+# on any number of hosts can serve the same web tier (started with
+# WEB_RUNS_JOBS=0). The first SIGTERM/SIGINT stops claiming jobs and waits for
+# the running ones; a second one exits at once, and the interrupted jobs are
+# retried by another worker once their leases expire.
+import os
+import sys
+import signal
+import argparse
+import threading
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run queued video conversion jobs')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Jobs to run at once on this host (default: JOB_WORKERS or CPU count)')
+    args = parser.parse_args()
+
+    import simple_web_app
+    from scratch import sweep_scratch
+
+    job_executor = simple_web_app.job_executor
+    # Jobs run here, so estimates are judged against this host even with WEB_RUNS_JOBS=0
+    job_executor.reject_oversized = True
+    if args.workers:
+        job_executor.max_workers = args.workers
+
+    os.makedirs('outputs', exist_ok=True)
+    sweep_scratch()
+    requeued, dropped = job_executor.reclaim()
+    if requeued or dropped:
+        print(f"Found {requeued + dropped} interrupted job(s), {requeued} will be retried")
+
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        if stop.is_set():
+            print("Exiting without waiting for running jobs")
+            os._exit(1)
+        print("Stopping: no new jobs will be claimed, waiting for running jobs (signal again to exit now)")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    job_executor.start()
+    simple_web_app.output_retention.start()
+    simple_web_app.start_sweeper()
+    print(f"Worker {os.getpid()} running up to {job_executor.max_workers} job(s) at once")
+
+    while not stop.wait(1):
+        pass
+
+    job_executor.shutdown(wait=True)
+    print("All running jobs finished")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())